@@ -3,13 +3,22 @@ import sys
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
+import astrbot.api.message_components as Comp
 from astrbot.core import AstrBotConfig
 from .utils.command.main import CommandUtils
+from .utils.media.browser import is_chromium_installed
 from .utils.decorators import in_enabled_groups, requires_enabled
 from .utils.db import DbUtils
 from cachetools import TTLCache
 
 
+def image_result(event: AstrMessageEvent, image: bytes | str):
+    """构造图片消息，渲染出的 PNG 数据直接发送，不经过文件"""
+    if isinstance(image, bytes):
+        return event.chain_result([Comp.Image.fromBytes(image)])
+    return event.image_result(image)
+
+
 # TODO: 1. 区块回档
 # TODO: 2. 大模型自动生成命令，适配carpet
 # TODO: 3. MCDR命令
@@ -30,13 +39,33 @@ class McAdminPlugin(Star):
         self.config = config
         # 连接数据库
         self.db_util = DbUtils()
-        self.command_utils = CommandUtils(config, self.db_util.get_conn())
+        self.command_utils = CommandUtils(config, self.db_util.get_db())
         self.task_temp = TTLCache(maxsize=50, ttl=300)
+        self._warm_up_task = None
 
     async def initialize(self):
         """可选择实现异步的插件初始化方法，当实例化该插件类之后会自动调用该方法。"""
-        # 检查并安装 Playwright Chromium
-        await self._ensure_playwright_installed()
+        browser_manager = self.command_utils.image_utils.browser_manager
+        # 直接检查 Playwright 安装目录，已安装时不再启动安装子进程
+        if is_chromium_installed():
+            logger.info("Playwright Chromium 已安装")
+        else:
+            # 安装放到后台执行，不阻塞插件加载，安装完成前图片命令会排队等待
+            browser_manager.wait_for_install(
+                asyncio.create_task(self._ensure_playwright_installed())
+            )
+
+        # 后台预热浏览器，避免重启后第一次出图时冷启动
+        if self.config.get("enable_browser_prewarm", True):
+            self._warm_up_task = asyncio.create_task(self._warm_up_browser())
+
+    async def _warm_up_browser(self):
+        """启动浏览器并预先创建渲染页面"""
+        try:
+            await self.command_utils.image_utils.browser_manager.warm_up()
+            logger.info("浏览器预热完成")
+        except Exception as e:
+            logger.warning(f"浏览器预热失败，将在第一次出图时启动: {e}")
 
     async def _ensure_playwright_installed(self):
         """确保 Playwright Chromium 已安装
@@ -102,7 +131,7 @@ class McAdminPlugin(Star):
         msg = event.message_str
         result = await self.command_utils.mc(msg, event)
         if result["type"] == "image":
-            yield event.image_result(result["msg"])
+            yield image_result(event, result["msg"])
         else:
             yield event.plain_result(result["msg"])
 
@@ -112,7 +141,7 @@ class McAdminPlugin(Star):
         msg = event.message_str
         result = await self.command_utils.loc(msg, event)
         if result["type"] == "image":
-            yield event.image_result(result["msg"])
+            yield image_result(event, result["msg"])
         else:
             yield event.plain_result(result["msg"])
 
@@ -120,7 +149,7 @@ class McAdminPlugin(Star):
     @in_enabled_groups()
     async def list_players(self, event: AstrMessageEvent):
         result = await self.command_utils.list_players()
-        yield event.image_result(result)
+        yield image_result(event, result)
 
     @filter.command("原图")
     @in_enabled_groups()
@@ -157,11 +186,11 @@ class McAdminPlugin(Star):
         if result["type"] == "text":
             yield event.plain_result(result["msg"])
         elif result["type"] == "image":
-            yield event.image_result(result["msg"])
+            yield image_result(event, result["msg"])
         elif result["type"] == "image_list":
             assert isinstance(result["msg"], list)
             for img in result["msg"]:
-                yield event.image_result(img)
+                yield image_result(event, img)
 
     @filter.command("zz")
     @in_enabled_groups()
@@ -171,11 +200,18 @@ class McAdminPlugin(Star):
         if res["type"] == "text":
             yield event.plain_result(res["msg"])
         elif res["type"] == "image":
-            yield event.image_result(res["msg"])
+            yield image_result(event, res["msg"])
 
     async def terminate(self):
         """可选择实现异步的插件销毁方法，当插件被卸载/停用时会调用。"""
+        # 预热还没完成时先取消，避免关闭后又启动浏览器
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
         # 关闭 browser 实例（使用 ImageUtils 的，TaskUtils 只是转发）
         await self.command_utils.image_utils.close_browser()
-        # 关闭数据库连接
-        self.db_util.close()
+        # 关闭 RCON 连接池
+        await self.command_utils.close()
+        # 关闭珍珠炮计算线程池/进程池
+        self.command_utils.pearl_calculator_util.close()
+        # 关闭数据库连接（等待进行中的读写完成）
+        await self.db_util.close()
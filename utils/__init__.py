@@ -15,6 +15,8 @@ from .command.helpers import (
     send_command,
     parse_list_players,
     get_whitelist,
+    reload_whitelist,
+    invalidate_whitelist,
     split_players_by_whitelist,
     split_players_by_prefix,
 )
@@ -35,6 +37,8 @@ __all__ = [
     "send_command",
     "parse_list_players",
     "get_whitelist",
+    "reload_whitelist",
+    "invalidate_whitelist",
     "split_players_by_whitelist",
     "split_players_by_prefix",
     "DbUtils",
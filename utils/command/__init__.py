@@ -8,6 +8,8 @@ from .helpers import (
     send_command,
     parse_list_players,
     get_whitelist,
+    reload_whitelist,
+    invalidate_whitelist,
     split_players_by_whitelist,
     split_players_by_prefix,
 )
@@ -22,6 +24,8 @@ __all__ = [
     "send_command",
     "parse_list_players",
     "get_whitelist",
+    "reload_whitelist",
+    "invalidate_whitelist",
     "split_players_by_whitelist",
     "split_players_by_prefix",
 ]
@@ -1,12 +1,15 @@
+import asyncio
 import re
-from ..rcon import rcon_send
+import time
+from ..rcon import rcon_send, RconConnectionError
 from typing import Optional, List, Dict, Tuple
 from astrbot.api import logger
-from rcon.exceptions import EmptyResponse
 
 
 # 常量
 PERMISSION_DENIED = '我才不听你的呢'
+# 白名单快照有效期（秒），游戏内直接添加的白名单最多延迟这么久被识别
+WHITELIST_CACHE_TTL = 60
 
 # 预编译正则
 LOC_ADD_RE = re.compile(r'^loc add\s+([\w\\s]+?)\s+([012])\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)$')
@@ -45,26 +48,106 @@ def parse_list_players(res: str) -> List[str]:
         return []
 
 
-async def get_whitelist(servers: List[Dict]) -> List[str]:
-    """获取白名单"""
+async def _fetch_whitelist(servers: List[Dict]) -> Optional[List[str]]:
+    """通过 RCON 查询白名单，所有服务器都查询失败时返回 None"""
     wl = None
     for server in servers:
         try:
             wl = await send_command(server, 'whitelist list')
             break
-        except EmptyResponse:
+        except RconConnectionError:
             logger.error(f"服务器 {server['name']} 连接失败，请检查配置是否正确，并且检查服务器是否已开启RCON服务")
             continue
         except Exception as e:
             logger.error(f"服务器 {server['name']} 白名单查询失败: {e}")
             continue
-    if wl == 'There are no whitelisted players' or wl is None:
+    if wl is None:
+        return None
+    if wl == 'There are no whitelisted players':
         return []
     players_start = wl.find(':') + 1
     players_str = wl[players_start:].strip()
     return [player.strip() for player in players_str.split(',') if player.strip()]
 
 
+class WhitelistSnapshot:
+    """白名单快照缓存
+
+    - 快照在 TTL 内直接返回，不再查询 RCON
+    - 同一时间只有一个刷新请求，并发调用共享同一次查询结果
+    - 白名单变更后调用 invalidate()，之后的调用重新查询；失效前发出的查询结果不会写入缓存
+    """
+
+    def __init__(self, ttl: float = WHITELIST_CACHE_TTL):
+        self.ttl = ttl
+        self._players: Optional[List[str]] = None
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(self, servers: List[Dict]) -> List[str]:
+        if self._players is not None and time.monotonic() - self._fetched_at < self.ttl:
+            return list(self._players)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(servers, self._generation))
+        # shield：某个调用被取消时不影响其他等待同一次查询的调用
+        players = await asyncio.shield(self._refresh_task)
+        return list(players)
+
+    async def _refresh(self, servers: List[Dict], generation: int) -> List[str]:
+        players = await _fetch_whitelist(servers)
+        if players is None:
+            # 查询失败不缓存，下次调用重新查询
+            return []
+        if generation == self._generation:
+            self._players = players
+            self._fetched_at = time.monotonic()
+        return players
+
+    async def reload(self, servers: List[Dict]) -> Optional[List[str]]:
+        """丢弃快照并重新查询，查询失败时返回 None（与白名单为空区分）"""
+        self.invalidate()
+        players = await _fetch_whitelist(servers)
+        if players is not None:
+            self._players = players
+            self._fetched_at = time.monotonic()
+            return list(players)
+        return None
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._players = None
+        self._refresh_task = None
+
+
+# 服务器列表 -> 白名单快照
+_whitelist_snapshots: Dict[Tuple, WhitelistSnapshot] = {}
+
+
+def _whitelist_snapshot(servers: List[Dict]) -> WhitelistSnapshot:
+    key = tuple((s.get('host'), str(s.get('port'))) for s in servers)
+    snapshot = _whitelist_snapshots.get(key)
+    if snapshot is None:
+        snapshot = WhitelistSnapshot()
+        _whitelist_snapshots[key] = snapshot
+    return snapshot
+
+
+async def get_whitelist(servers: List[Dict]) -> List[str]:
+    """获取白名单（使用共享的快照缓存）"""
+    return await _whitelist_snapshot(servers).get(servers)
+
+
+async def reload_whitelist(servers: List[Dict]) -> Optional[List[str]]:
+    """不使用快照重新查询白名单，所有服务器都查询失败时返回 None"""
+    return await _whitelist_snapshot(servers).reload(servers)
+
+
+def invalidate_whitelist(servers: List[Dict]) -> None:
+    """白名单发生变更后使快照失效"""
+    _whitelist_snapshot(servers).invalidate()
+
+
 def split_players_by_whitelist(players: List[str], whitelist_list: List[str]) -> Tuple[List[str], List[str]]:
     """根据白名单分割玩家列表"""
     whitelist_set = set(whitelist_list)
@@ -1,7 +1,6 @@
 import asyncio
 import json
 import re
-import sqlite3
 from typing import Optional, List, Dict, Tuple, TypedDict
 
 from astrbot.api import logger
@@ -22,12 +21,14 @@ from ..command.helpers import (
     split_players_by_prefix,
 )
 from ..config_utils import ConfigUtils
+from ..db.database import AsyncDatabase
 from ..loc.main import LocUtils
 from ..loc.vo import Loc
 from ..media.image import ImageUtils
+from ..rcon import configure_rcon_pools, close_rcon_pools
 from ..message import MessageUtils
 from ..task import TaskUtils
-from ..whitelist.main import WhitelistUtils
+from ..whitelist.main import WhitelistUtils, INIT_DONE, INIT_UNAVAILABLE
 from ..pearl_calculator import PearlCalculatorUtils
 
 
@@ -36,14 +37,14 @@ class TaskResponse(TypedDict):
     """任务命令响应结构"""
 
     type: str  # "text" | "image" | "image_list"
-    msg: str | list[str]  # 当 type 为 "image_list" 时，msg 为图片 URL 列表
+    msg: str | bytes | list[bytes]  # type 为 "image" 时为 PNG 数据，为 "image_list" 时为 PNG 数据列表
 
 
 class McResponse(TypedDict):
     """mc 命令响应结构"""
 
     type: str  # "text" | "image"
-    msg: str
+    msg: str | bytes  # type 为 "image" 时为 PNG 数据
 
 
 # ==================== 常量定义 ====================
@@ -66,27 +67,36 @@ MATERIAL_UNIT_MAP = {
 class CommandUtils:
     """Minecraft 服务器命令工具类"""
 
-    def __init__(self, config: AstrBotConfig, conn: sqlite3.Connection):
+    def __init__(self, config: AstrBotConfig, db: AsyncDatabase):
         """初始化命令工具"""
         # 工具类初始化
         self.config_utils = ConfigUtils(config)
         self.message = MessageUtils()
         self.image_utils = ImageUtils(self.config_utils)
-        self.loc_utils = LocUtils(conn)  # 使用数据库存储
-        self.task_utils = TaskUtils(self.config_utils, conn, self.image_utils)
+        self.loc_utils = LocUtils(db)  # 使用数据库存储
+        self.task_utils = TaskUtils(self.config_utils, db, self.image_utils)
         self.pearl_calculator_util = PearlCalculatorUtils(config)
 
         # 服务器与连接池
         self.servers = self.config_utils.get_server_list()
+        configure_rcon_pools(
+            pool_size=self.config_utils.rcon_pool_size,
+            max_concurrency=self.config_utils.rcon_max_concurrency,
+        )
 
         # 白名单工具
         self.whitelist_utils = WhitelistUtils(
-            conn, self.servers, self.config_utils.get_bot_prefix()
+            db, self.servers, self.config_utils.get_bot_prefix()
         )
 
         # 常量
         self.PERMISSION_DENIED = PERMISSION_DENIED
 
+    async def close(self):
+        """关闭 RCON 连接池和白名单接口客户端"""
+        await close_rcon_pools()
+        await self.whitelist_utils.close()
+
     # ==================== MC 命令处理 ====================
     async def mc(self, msg: str, event: AstrMessageEvent) -> McResponse:
         """处理 MC 相关命令"""
@@ -120,8 +130,8 @@ class CommandUtils:
                     servers_status[name] = status
 
             # 生成状态图片
-            image_path = await self.image_utils.generate_status_image(servers_status)
-            return {"type": "image", "msg": image_path}
+            image = await self.image_utils.generate_status_image(servers_status)
+            return {"type": "image", "msg": image}
 
         if msg.startswith("mc reset"):
             if not event.is_admin():
@@ -129,8 +139,13 @@ class CommandUtils:
             parts = msg.split()
             command = " ".join(parts[2:])
             if command == "wldb":
-                await self.whitelist_utils.initialize()
-                return {"type": "text", "msg": "白名单数据库重载成功喵~"}
+                result = await self.whitelist_utils.initialize()
+                if result == INIT_UNAVAILABLE:
+                    return {"type": "text", "msg": "白名单数据库重载失败喵~，无法获取服务器白名单，请检查RCON连接"}
+                done, total = self.whitelist_utils.init_progress
+                if result != INIT_DONE:
+                    return {"type": "text", "msg": f"白名单数据库重载未完成喵~（{done}/{total}），请查看日志"}
+                return {"type": "text", "msg": f"白名单数据库重载成功喵~（{done}/{total}）"}
 
         arr = msg.split(" ")
 
@@ -147,59 +162,53 @@ class CommandUtils:
             return {"type": "text", "msg": send_result}
 
         help_data = self.message.get_help_data()
-        help_image_path = await self.image_utils.generate_help_image(help_data)
-        return {"type": "image", "msg": help_image_path}
+        help_image = await self.image_utils.generate_help_image(help_data)
+        return {"type": "image", "msg": help_image}
 
     # ==================== 玩家列表 ====================
-    async def list_players(self) -> str:
+    async def list_players(self) -> bytes:
         """获取所有服务器的玩家列表并生成图片"""
         bot_prefix = self.config_utils.get_bot_prefix()
 
-        async def process_server(
-            server: Dict,
-        ) -> Optional[Tuple[str, Dict[str, List[str]]]]:
-            """处理单个服务器的玩家列表"""
+        async def fetch_players(server: Dict) -> Optional[Tuple[str, List[str]]]:
+            """获取单个服务器的在线玩家"""
             try:
                 res = await send_command(server, "list")
             except Exception:
                 return None
+            return server["name"], parse_list_players(res)
 
-            players = parse_list_players(res)
-            if not players:
-                return server["name"], {"bot_players": [], "real_players": []}
+        # 并发获取所有服务器的玩家
+        tasks = [fetch_players(s) for s in self.servers]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        online: List[Tuple[str, List[str]]] = [
+            r for r in results if isinstance(r, tuple) and len(r) == 2
+        ]
+
+        # 根据配置选择分类方式
+        classification: Dict[str, bool] = {}
+        if self.config_utils.enable_whitelist_compare:
+            # 所有服务器的玩家一次批量判断是否为真人玩家
+            classification = await self.whitelist_utils.classify_players(
+                p for _, players in online for p in players
+            )
 
-            # 根据配置选择分类方式
+        # 汇总结果
+        servers_players: Dict[str, Dict[str, List[str]]] = {}
+        for name, players in online:
             if self.config_utils.enable_whitelist_compare:
-                # 使用白名单工具判断是否为真人玩家
-                bot_players: List[str] = []
-                real_players: List[str] = []
-                for p in players:
-                    if await self.whitelist_utils.is_real_player(p):
-                        real_players.append(p)
-                    else:
-                        bot_players.append(p)
+                real_players = [p for p in players if classification.get(p)]
+                bot_players = [p for p in players if not classification.get(p)]
             else:
                 bot_players, real_players = split_players_by_prefix(players, bot_prefix)
-
-            return server["name"], {
+            servers_players[name] = {
                 "bot_players": bot_players,
                 "real_players": real_players,
             }
 
-        # 并发处理所有服务器
-        tasks = [process_server(s) for s in self.servers]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 汇总结果
-        servers_players: Dict[str, Dict[str, List[str]]] = {}
-        for r in results:
-            if isinstance(r, tuple) and len(r) == 2:
-                name, data = r
-                servers_players[name] = data
-
         # 生成图片
-        image_path = await self.image_utils.generate_list_image(servers_players)
-        return image_path
+        image = await self.image_utils.generate_list_image(servers_players)
+        return image
 
     # ==================== 工具方法 ====================
     def validate_coordinates(self, coordinates: str) -> Tuple[bool, str]:
@@ -259,8 +268,8 @@ class CommandUtils:
             return {"type": "text", "msg": "没有白名单喵~"}
 
         sorted_wl_list = sorted(wl_list, key=lambda name: name.casefold())
-        image_path = await self.image_utils.generate_whitelist_image(sorted_wl_list)
-        return {"type": "image", "msg": image_path}
+        image = await self.image_utils.generate_whitelist_image(sorted_wl_list)
+        return {"type": "image", "msg": image}
 
     # async def _handle_wl_operation(self, operation: str, player_name: str) -> str:
     #     """处理白名单添加/移除操作"""
@@ -294,34 +303,32 @@ class CommandUtils:
         """
         # 列出所有位置
         if msg.startswith("loc list"):
-            return {"type": "text", "msg": self.loc_utils.list_loc()}
+            return {"type": "text", "msg": await self.loc_utils.list_loc()}
 
         # 添加位置
         if msg.startswith("loc add"):
-            return {"type": "text", "msg": self._handle_loc_add(msg)}
+            return {"type": "text", "msg": await self._handle_loc_add(msg)}
 
         # 删除位置
         if msg.startswith("loc remove"):
             parts = msg.split(" ")
             if len(parts) != 3:
                 return {"type": "text", "msg": "是/loc remove <项目名字>喵"}
-            return {"type": "text", "msg": self.loc_utils.remove_loc(parts[2])}
+            return {"type": "text", "msg": await self.loc_utils.remove_loc(parts[2])}
 
         # 修改位置
         if msg.startswith("loc set"):
-            return {"type": "text", "msg": self._handle_loc_set(msg)}
+            return {"type": "text", "msg": await self._handle_loc_set(msg)}
 
         # 查看位置详情
         if msg.startswith("loc "):
-            return {"type": "text", "msg": self._handle_loc_query(msg)}
+            return {"type": "text", "msg": await self._handle_loc_query(msg)}
 
         help_data = self.message.get_loc_help_data()
-        help_image_path = await self.image_utils.generate_help_image(
-            help_data, filename="loc_help.png"
-        )
-        return {"type": "image", "msg": help_image_path}
+        help_image = await self.image_utils.generate_help_image(help_data)
+        return {"type": "image", "msg": help_image}
 
-    def _handle_loc_add(self, msg: str) -> str:
+    async def _handle_loc_add(self, msg: str) -> str:
         """处理位置添加"""
         match = LOC_ADD_RE.match(msg)
         if not match:
@@ -337,9 +344,9 @@ class CommandUtils:
 
         # 创建并添加 Loc 对象
         loc = Loc(name=name, dimension=int(dimension), location=coordinates)
-        return self.loc_utils.add_loc(loc)
+        return await self.loc_utils.add_loc(loc)
 
-    def _handle_loc_set(self, msg: str) -> str:
+    async def _handle_loc_set(self, msg: str) -> str:
         """处理位置修改"""
         match = LOC_SET_RE.match(msg)
         if not match:
@@ -354,22 +361,22 @@ class CommandUtils:
             return error_msg
 
         # 检查位置是否存在
-        loc = self.loc_utils.get_loc_by_name(name)
+        loc = await self.loc_utils.get_loc_by_name(name)
         if loc is None:
             return f'没找到"{name}"喵~\n可以使用/loc list查看列表'
 
         # 更新位置信息
         loc.set_location(dimension=int(dimension), location=coordinates)
-        return self.loc_utils.set_loc(loc)
+        return await self.loc_utils.set_loc(loc)
 
-    def _handle_loc_query(self, msg: str) -> str:
+    async def _handle_loc_query(self, msg: str) -> str:
         """处理位置查询"""
         parts = msg.split(" ")
         if len(parts) != 2:
             return self.message.get_loc_help_message()
 
         loc_name = parts[1]
-        loc = self.loc_utils.get_loc_by_name(loc_name)
+        loc = await self.loc_utils.get_loc_by_name(loc_name)
         if not loc:
             return f'没找到"{loc_name}"喵~\n可以使用/loc list查看列表'
 
@@ -409,42 +416,40 @@ class CommandUtils:
         """
         # 添加工程
         if msg.startswith("task add"):
-            return self._handle_task_add(msg, event, task_temp)
+            return await self._handle_task_add(msg, event, task_temp)
 
         # 删除工程
         if msg.startswith("task remove"):
             parts = msg.split(" ")
             if len(parts) != 3:
                 return {"type": "text", "msg": "是/task remove <项目名字>喵~"}
-            return {"type": "text", "msg": self.task_utils.remove_task(parts[2], event)}
+            return {"type": "text", "msg": await self.task_utils.remove_task(parts[2], event)}
 
         # 工程列表
         if msg.startswith("task list"):
-            return {"type": "text", "msg": self.task_utils.get_task_list()}
+            return {"type": "text", "msg": await self.task_utils.get_task_list()}
 
         # 修改工程
         if msg.startswith("task set"):
-            return self._handle_task_set(msg, event)
+            return await self._handle_task_set(msg, event)
 
         # 认领材料
         if msg.startswith("task claim"):
-            return self._handle_task_claim(msg, event)
+            return await self._handle_task_claim(msg, event)
 
         # 提交材料
         if msg.startswith("task commit"):
-            return self._handle_task_commit(msg)
+            return await self._handle_task_commit(msg)
 
         # 查看工程详情
         if msg.startswith("task"):
             return await self._handle_task_query(msg)
 
         help_data = self.message.get_task_help_data()
-        help_image_path = await self.image_utils.generate_help_image(
-            help_data, filename="task_help.png"
-        )
-        return {"type": "image", "msg": help_image_path}
+        help_image = await self.image_utils.generate_help_image(help_data)
+        return {"type": "image", "msg": help_image}
 
-    def _handle_task_add(
+    async def _handle_task_add(
         self, msg: str, event: AstrMessageEvent, task_temp: TTLCache
     ) -> TaskResponse:
         """处理任务添加"""
@@ -466,7 +471,7 @@ class CommandUtils:
             return {"type": "text", "msg": error_msg}
 
         # 校验是否重名
-        task = self.task_utils.get_task_by_name(name)
+        task = await self.task_utils.get_task_by_name(name)
         if task["code"] == 200:
             return {"type": "text", "msg": f"已经有{name}了喵~"}
 
@@ -494,7 +499,7 @@ class CommandUtils:
             location,
         )
 
-    def _handle_task_set(self, msg: str, event: AstrMessageEvent) -> TaskResponse:
+    async def _handle_task_set(self, msg: str, event: AstrMessageEvent) -> TaskResponse:
         """处理任务修改"""
         parts = msg.split(" ")
         if len(parts) != 8:
@@ -513,12 +518,12 @@ class CommandUtils:
 
         return {
             "type": "text",
-            "msg": self.task_utils.set_task(
+            "msg": await self.task_utils.set_task(
                 location, dimension, original_name, name, event
             ),
         }
 
-    def _handle_task_claim(self, msg: str, event: AstrMessageEvent) -> TaskResponse:
+    async def _handle_task_claim(self, msg: str, event: AstrMessageEvent) -> TaskResponse:
         """处理材料认领"""
         parts = msg.split(" ")
         if len(parts) != 4:
@@ -527,10 +532,10 @@ class CommandUtils:
         task_name, material_number = parts[2], parts[3]
         return {
             "type": "text",
-            "msg": self.task_utils.update_material(task_name, material_number, event),
+            "msg": await self.task_utils.update_material(task_name, material_number, event),
         }
 
-    def _handle_task_commit(self, msg: str) -> TaskResponse:
+    async def _handle_task_commit(self, msg: str) -> TaskResponse:
         """处理材料提交"""
         parts = msg.split(" ", 5)
         if len(parts) < 6:
@@ -572,7 +577,7 @@ class CommandUtils:
 
         return {
             "type": "text",
-            "msg": self.task_utils.commit_material(
+            "msg": await self.task_utils.commit_material(
                 task_name, material_number, location, individual, stack, shulker
             ),
         }
@@ -584,51 +589,47 @@ class CommandUtils:
         # task 不带参数返回帮助
         if len(parts) != 2:
             help_data = self.message.get_task_help_data()
-            help_image_path = await self.image_utils.generate_help_image(
-                help_data, filename="task_help.png"
-            )
-            return {"type": "image", "msg": help_image_path}
+            help_image = await self.image_utils.generate_help_image(help_data)
+            return {"type": "image", "msg": help_image}
 
         # task 带名称返回工程详情（图片）
         task_name = parts[1]
-        task = self.task_utils.get_task_by_name(task_name)
+        task = await self.task_utils.get_task_by_name(task_name)
         if task["code"] != 200:
             return {"type": "text", "msg": f"没找到{task_name}喵~"}
 
-        materia = self.task_utils.get_material_list_by_task_id(task["msg"][0][0])
+        materia = await self.task_utils.get_material_list_by_task_id(task["msg"][0][0])
         material_list = materia["msg"]
         material_count = len(material_list)
 
         # 根据配置决定生成方式
         if self.config_utils.enable_big_task_image:
             # 生成一张大图，所有列并列显示
-            url = await self.task_utils.render(
+            image = await self.task_utils.render(
                 task["msg"], material_list, use_big_image=True
             )
-            return {"type": "image", "msg": url}
+            return {"type": "image", "msg": image}
         else:
             # 生成多张图片，每200种材料一张
             if material_count <= 200:
                 # 200种材料或更少，返回单张图片
-                url = await self.task_utils.render(
+                image = await self.task_utils.render(
                     task["msg"], material_list, use_big_image=False
                 )
-                return {"type": "image", "msg": url}
+                return {"type": "image", "msg": image}
             else:
                 # 超过200种材料，每200种分割成一张图片
-                image_urls = []
+                images = []
                 # 每200种材料生成一张图片
-                for idx, i in enumerate(range(0, material_count, 200), start=1):
+                for i in range(0, material_count, 200):
                     chunk = material_list[i : i + 200]
-                    # 为每张图片生成唯一的文件名
-                    filename = f"task_{idx}.png"
-                    url = await self.task_utils.render(
-                        task["msg"], chunk, filename=filename, use_big_image=False
+                    image = await self.task_utils.render(
+                        task["msg"], chunk, use_big_image=False
                     )
-                    image_urls.append(url)
+                    images.append(image)
 
                 # 返回图片列表
-                return {"type": "image_list", "msg": image_urls}
+                return {"type": "image_list", "msg": images}
 
     def _create_task_cache(
         self,
@@ -699,7 +700,7 @@ class CommandUtils:
 
         # 调用任务工具处理材料文件
         session_id = f"{event.get_group_id()}_{event.get_sender_id()}"
-        return self.task_utils.task_material(
+        return await self.task_utils.task_material(
             ret["url"], filename, session_id, task_temp
         )
 
@@ -726,7 +727,12 @@ class CommandUtils:
             return {"type": "text", "msg": "是 /zz <X目标坐标> <Z目标坐标> 喵～"}
 
         res = await self.pearl_calculator_util.pearl_calculator(x, z)
+        stats = self.pearl_calculator_util.cache_stats()
+        logger.debug(
+            f"/zz 结果缓存：命中 {stats['hits']}，未命中 {stats['misses']}，"
+            f"命中率 {stats['hit_rate']:.1%}，{stats['size']}/{stats['maxsize']} 条"
+        )
         if res.get("msg") != "success":
             return {"type": "text", "msg": res.get("msg", "")}
-        image_path = await self.image_utils.generate_zz_image(res.get("data", {}))
-        return {"type": "image", "msg": image_path}
+        image = await self.image_utils.generate_zz_image(res.get("data", {}))
+        return {"type": "image", "msg": image}
@@ -1,6 +1,4 @@
 import os
-from pathlib import Path
-from urllib.request import pathname2url
 
 from astrbot.core import AstrBotConfig
 
@@ -29,6 +27,10 @@ class ConfigUtils:
                 "password": server_info[3]
             })
 
+        # 每个服务器的 RCON 长连接数和最大并发命令数
+        self.rcon_pool_size = config.get('rcon_pool_size')
+        self.rcon_max_concurrency = config.get('rcon_max_concurrency')
+
         # 是否开启白名单比对
         self.enable_whitelist_compare = config.get('enable_whitelist_compare')
 
@@ -38,6 +40,21 @@ class ConfigUtils:
         # 是否开启task大图
         self.enable_big_task_image = config.get('enable_big_task_image')
 
+        # 截图页面池大小（同时渲染的最大页面数）
+        self.browser_page_pool_size = config.get('browser_page_pool_size')
+
+        # 单个页面渲染多少次后回收
+        self.browser_page_max_renders = config.get('browser_page_max_renders')
+
+        # 渲染图片磁盘缓存上限（MB），0 表示关闭
+        self.image_cache_size_mb = config.get('image_cache_size_mb')
+
+        # 材料图标是否内联为 data URI
+        self.enable_icon_data_uri = config.get('enable_icon_data_uri')
+
+        # 使用 Pillow 轻量渲染的模板（status / list）
+        self.raster_templates = config.get('raster_templates')
+
         # 背景图文件夹路径
         self.background_image_path = None
         if config.get('background_image_path') == '' or config.get('background_image_path') is None:
@@ -69,28 +86,6 @@ class ConfigUtils:
         return os.path.dirname(os.path.dirname(current_file_path))
 
 
-    def get_font(self):
-        """获取字体URL（跨平台支持 Windows/Linux/Mac）
-        
-        Returns:
-            str: 字体文件的 file:// URL
-            
-        支持平台：
-            - Windows: 转换为 file:///C:/path/to/font.ttf
-            - Linux/Mac: 转换为 file:///path/to/font.ttf
-        """
-        plugin_path = self.get_plugin_path()
-        font_path = os.path.join(plugin_path, 'template', 'font', 'jiyinghuipianheyuan.ttf')
-        
-        # 转换为绝对路径
-        abs_path = os.path.abspath(font_path)
-        # 使用 Path 对象确保跨平台兼容
-        path_obj = Path(abs_path)
-        # 转换为 POSIX 风格路径（使用正斜杠）
-        posix_path = path_obj.as_posix()
-        # 使用 pathname2url 进行 URL 编码（处理特殊字符和空格）
-        url_path = pathname2url(posix_path)
-        # 构建 file:// URL
-        file_url = f"file:///{url_path}"
-        
-        return file_url
\ No newline at end of file
+    def get_font_path(self) -> str:
+        """获取字体文件路径"""
+        return os.path.join(self.get_plugin_path(), 'template', 'font', 'jiyinghuipianheyuan.ttf')
@@ -1,8 +1,7 @@
 from .main import DbUtils
+from .database import AsyncDatabase
 
 __all__ = [
     "DbUtils",
+    "AsyncDatabase",
 ]
-
-
-
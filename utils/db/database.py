@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Sequence, TypeVar
+
+# 只读连接数量
+DEFAULT_READ_CONNECTIONS = 2
+# 页缓存大小（KB）
+CACHE_SIZE_KB = 8192
+# 数据库被锁定时的等待时间（毫秒）
+BUSY_TIMEOUT_MS = 5000
+
+T = TypeVar("T")
+
+
+class AsyncDatabase:
+    """异步数据库访问层
+
+    - 所有写操作在同一个写线程中按提交顺序执行，每次调用一个事务，成功提交、失败回滚
+    - 读操作在只读连接池中执行（WAL 模式下读写互不阻塞），写操作返回后立即可以读到
+    - 每个线程使用自己的连接，事件循环中只等待结果，不再执行 SQL
+    """
+
+    def __init__(self, path: str, read_connections: int = DEFAULT_READ_CONNECTIONS):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(
+            max_workers=max(1, read_connections), thread_name_prefix="db-reader"
+        )
+        self._closed = False
+
+    # ==================== 连接管理 ====================
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        """获取当前线程的连接，首次使用时创建"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 关闭时需要在其他线程中关闭连接
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            if readonly:
+                conn.execute("PRAGMA query_only=1")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, executor: ThreadPoolExecutor, fn: Callable[..., T], *args) -> T:
+        if self._closed:
+            raise sqlite3.ProgrammingError("数据库已关闭")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+    # ==================== 读 ====================
+
+    def _fetch(self, sql: str, params: Sequence, one: bool):
+        cursor = self._connection(readonly=True).execute(sql, params)
+        try:
+            return cursor.fetchone() if one else cursor.fetchall()
+        finally:
+            cursor.close()
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[tuple]:
+        return await self._run(self._readers, self._fetch, sql, params, True)
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        return await self._run(self._readers, self._fetch, sql, params, False)
+
+    async def read(self, fn: Callable[..., T], *args) -> T:
+        """在只读连接上执行 fn(conn, *args)，用于一次完成多条查询"""
+        return await self._run(self._readers, lambda: fn(self._connection(readonly=True), *args))
+
+    # ==================== 写 ====================
+
+    def _transaction(self, fn: Callable[..., T], *args) -> T:
+        conn = self._connection(readonly=False)
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+            return result
+        except BaseException:
+            conn.rollback()
+            raise
+
+    async def transaction(self, fn: Callable[..., T], *args) -> T:
+        """在写线程中执行 fn(conn, *args)，作为一个事务提交，出错时回滚并抛出异常"""
+        return await self._run(self._writer, self._transaction, fn, *args)
+
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        """执行一条写 SQL，返回影响的行数"""
+        return await self.transaction(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """批量执行写 SQL，返回影响的行数"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        return await self.transaction(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    # ==================== 关闭 ====================
+
+    def _optimize(self):
+        # 根据查询情况更新统计信息，帮助查询优化器选择索引
+        try:
+            self._connection(readonly=False).execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+
+    async def close(self):
+        """等待进行中的操作完成后关闭所有连接"""
+        if self._closed:
+            return
+        await self._run(self._writer, self._optimize)
+        self._closed = True
+        await asyncio.to_thread(self._shutdown)
+
+    def _shutdown(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
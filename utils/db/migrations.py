@@ -0,0 +1,97 @@
+import sqlite3
+
+from astrbot.core import logger
+
+# 数据库迁移：(版本号, 说明, SQL 列表)
+# 当前版本记录在 PRAGMA user_version 中，只执行比当前版本新的迁移；
+# 新增表或索引时在末尾追加新版本，不要修改已发布的迁移
+MIGRATIONS = [
+    (1, "创建数据表", [
+        '''
+        CREATE TABLE IF NOT EXISTS "task" (
+            "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            "name" TEXT NOT NULL,
+            "location" TEXT NOT NULL,
+            "dimension" TEXT NOT NULL,
+            "create_user" TEXT NOT NULL,
+            "create_user_id" TEXT NOT NULL
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "material" (
+          "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+          "name" TEXT,
+          "name_id" text,
+          "total" integer,
+          "recipient" TEXT,
+          "commit_count" integer,
+          "number" INTEGER,
+          "task_id" INTEGER,
+          "location" TEXT
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "location" (
+          "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+          "name" TEXT NOT NULL UNIQUE,
+          "overworld" TEXT,
+          "nether" TEXT,
+          "end" TEXT
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "user_profile" (
+          "username" TEXT,
+          "uuid" TEXT
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "plugin_state" (
+          "name" TEXT NOT NULL PRIMARY KEY,
+          "value" TEXT
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "player_verdict" (
+          "username" TEXT NOT NULL PRIMARY KEY,
+          "is_real" INTEGER NOT NULL,
+          "reason" TEXT,
+          "expires_at" REAL NOT NULL
+        );
+        ''',
+    ]),
+    (2, "添加索引，工程名唯一", [
+        # 旧版本可能存在重名工程，保留最早的一个，其余改名为 "名称#id"
+        '''
+        UPDATE "task" SET "name" = "name" || '#' || "id"
+        WHERE "id" NOT IN (SELECT MIN("id") FROM "task" GROUP BY "name");
+        ''',
+        'CREATE UNIQUE INDEX IF NOT EXISTS "idx_task_name" ON "task" ("name");',
+        # (task_id, number) 同时覆盖只按 task_id 查询的情况
+        'CREATE INDEX IF NOT EXISTS "idx_material_task_number" ON "material" ("task_id", "number");',
+        'CREATE INDEX IF NOT EXISTS "idx_user_profile_username" ON "user_profile" ("username");',
+        'CREATE INDEX IF NOT EXISTS "idx_user_profile_uuid" ON "user_profile" ("uuid");',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """执行未应用的迁移，每个版本在单独的事务中执行，返回迁移后的版本号"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        try:
+            conn.execute("BEGIN")
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+        logger.info(f"数据库已升级到版本 {target}：{description}")
+    return version
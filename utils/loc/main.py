@@ -2,21 +2,22 @@ import sqlite3
 from typing import Optional, List
 from astrbot.api import logger
 
+from ..db.database import AsyncDatabase
 from ..loc.vo import Loc
 
 
 class LocUtils:
     """位置管理工具类，使用数据库存储位置数据"""
     
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, db: AsyncDatabase):
         """初始化位置管理工具"""
-        self.conn = conn
+        self.db = db
 
-    def add_loc(self, loc: Loc) -> str:
+    async def add_loc(self, loc: Loc) -> str:
         """添加新位置"""
         try:
             # 检查是否已存在同名位置
-            if self.get_loc_by_name(loc.name) is not None:
+            if await self.get_loc_by_name(loc.name) is not None:
                 return f'已经有"{loc.name}"了喵'
             
             # 插入新位置
@@ -24,40 +25,36 @@ class LocUtils:
             INSERT INTO location (name, overworld, nether, end) 
             VALUES (?, ?, ?, ?)
             """
-            self.conn.execute(sql, (loc.name, loc.overworld, loc.nether, loc.end))
-            self.conn.commit()
+            await self.db.execute(sql, (loc.name, loc.overworld, loc.nether, loc.end))
             
             return f'已添加"{loc.name}"喵~'
         except sqlite3.IntegrityError:
             return f'已经有"{loc.name}"了喵'
         except Exception as e:
             logger.error(f"添加位置失败: {e}")
-            self.conn.rollback()
             return f"呜哇！添加失败了喵！\n{e}"
 
-    def remove_loc(self, name: str) -> str:
+    async def remove_loc(self, name: str) -> str:
         """删除位置"""
         try:
             # 检查位置是否存在
-            if self.get_loc_by_name(name) is None:
+            if await self.get_loc_by_name(name) is None:
                 return f'没找到"{name}"喵~'
             
             # 删除位置
             sql = "DELETE FROM location WHERE name = ?"
-            self.conn.execute(sql, (name,))
-            self.conn.commit()
+            await self.db.execute(sql, (name,))
             
             return f'已将"{name}"移除喵！'
         except Exception as e:
             logger.error(f"删除位置失败: {e}")
-            self.conn.rollback()
             return f"呜哇！删除失败了喵！\n{e}"
     
-    def get_loc_by_name(self, name: str) -> Optional[Loc]:
+    async def get_loc_by_name(self, name: str) -> Optional[Loc]:
         """根据名称获取位置"""
         try:
             sql = "SELECT id, name, overworld, nether, end FROM location WHERE name = ?"
-            result = self.conn.execute(sql, (name,)).fetchone()
+            result = await self.db.fetchone(sql, (name,))
             
             if result:
                 # result = (id, name, overworld, nether, end)
@@ -72,11 +69,11 @@ class LocUtils:
             logger.error(f"查询位置失败: {e}")
             return None
 
-    def get_all_locations(self) -> List[Loc]:
+    async def get_all_locations(self) -> List[Loc]:
         """获取所有位置列表"""
         try:
             sql = "SELECT id, name, overworld, nether, end FROM location ORDER BY name"
-            results = self.conn.execute(sql).fetchall()
+            results = await self.db.fetchall(sql)
             
             locations = []
             for row in results:
@@ -91,9 +88,9 @@ class LocUtils:
             logger.error(f"查询位置列表失败: {e}")
             return []
 
-    def list_loc(self) -> str:
+    async def list_loc(self) -> str:
         """列出所有位置名称"""
-        locations = self.get_all_locations()
+        locations = await self.get_all_locations()
         
         if not locations:
             return "暂无位置记录喵~"
@@ -103,11 +100,11 @@ class LocUtils:
             result += f"- {loc.name}\n"
         return result.strip()
 
-    def set_loc(self, loc: Loc) -> str:
+    async def set_loc(self, loc: Loc) -> str:
         """更新位置信息"""
         try:
             # 检查位置是否存在
-            if self.get_loc_by_name(loc.name) is None:
+            if await self.get_loc_by_name(loc.name) is None:
                 return f'没找到"{loc.name}"喵~'
             
             # 更新位置信息
@@ -116,11 +113,9 @@ class LocUtils:
             SET overworld = ?, nether = ?, end = ?
             WHERE name = ?
             """
-            self.conn.execute(sql, (loc.overworld, loc.nether, loc.end, loc.name))
-            self.conn.commit()
+            await self.db.execute(sql, (loc.overworld, loc.nether, loc.end, loc.name))
             
             return f'已更新"{loc.name}"喵~'
         except Exception as e:
             logger.error(f"更新位置失败: {e}")
-            self.conn.rollback()
             return f"呜哇！更新失败了喵！\n{e}"
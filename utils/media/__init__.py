@@ -1,9 +1,11 @@
 from .image import ImageUtils
 from .browser import BrowserManager
+from .image_cache import ImageCache
 
 __all__ = [
     "ImageUtils",
     "BrowserManager",
+    "ImageCache",
 ]
 
 
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from astrbot.api import logger
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow 未安装时直接使用原图
+    Image = None
+
+# 支持的图片格式
+SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
+
+# 缩放后高度按该步长向上取整，避免每个截图高度都生成一张缩略图
+VARIANT_HEIGHT_STEP = 512
+# 缩略图 JPEG 质量
+VARIANT_QUALITY = 85
+
+
+class BackgroundImageManager:
+    """背景图管理器
+
+    - 目录修改时间变化时才重新扫描文件列表，不再每次渲染都 listdir
+    - 为渲染生成缩小后的 JPEG 缩略图（按 background-size: cover 计算尺寸），缓存在 cache_dir
+    - 缩略图在后台线程中生成，生成完成前渲染使用原图，不阻塞事件循环
+    """
+
+    def __init__(self, directory: str, cache_dir: str):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self._files: list[str] = []
+        self._dir_mtime: Optional[float] = None
+        # 缩略图索引：(原图路径, 原图修改时间, 宽, 高) -> 缩略图路径
+        self._variants: dict[tuple, str] = {}
+        self._pending: set[tuple] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ==================== 文件索引 ====================
+
+    def _refresh(self):
+        """目录修改时间变化时重新扫描"""
+        try:
+            mtime = os.stat(self.directory).st_mtime
+        except OSError:
+            self._files, self._dir_mtime = [], None
+            return
+        if mtime == self._dir_mtime:
+            return
+        self._files = [
+            name for name in os.listdir(self.directory)
+            if os.path.splitext(name)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS
+        ]
+        self._dir_mtime = mtime
+        logger.debug(f"背景图目录已重新索引，共 {len(self._files)} 张图片")
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.directory)
+
+    def list_images(self) -> list[str]:
+        """获取背景图文件名列表"""
+        self._refresh()
+        return list(self._files)
+
+    def random_image(self) -> str:
+        """随机选择一张背景图，返回原图路径，没有图片时返回空字符串"""
+        self._refresh()
+        if not self._files:
+            return ''
+        return os.path.join(self.directory, random.choice(self._files))
+
+    # ==================== 缩略图 ====================
+
+    def variant(self, path: str, width: int, height: Optional[int] = None) -> str:
+        """获取适合 width x height 截图的背景图路径
+
+        缩略图已生成时返回缩略图，否则返回原图并在后台生成缩略图
+        """
+        if Image is None:
+            return path
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return path
+        if height:
+            height = -(-height // VARIANT_HEIGHT_STEP) * VARIANT_HEIGHT_STEP
+        key = (path, mtime, width, height or 0)
+        with self._lock:
+            variant_path = self._variants.get(key)
+            if variant_path is not None:
+                return variant_path
+            if key in self._pending:
+                return path
+            self._pending.add(key)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background-variant")
+        self._executor.submit(self._build_variant, key)
+        return path
+
+    def _variant_path(self, key: tuple) -> str:
+        path, mtime, width, height = key
+        digest = hashlib.sha1(f"{os.path.abspath(path)}\0{mtime}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}_{width}x{height}.jpg")
+
+    def _build_variant(self, key: tuple):
+        path, _, width, height = key
+        variant_path = self._variant_path(key)
+        try:
+            if not os.path.exists(variant_path):
+                with Image.open(path) as img:
+                    # cover 模式下图片需要同时铺满宽和高
+                    scale = width / img.width
+                    if height:
+                        scale = max(scale, height / img.height)
+                    if scale >= 1:
+                        # 原图不比截图大，不需要缩略图
+                        variant_path = path
+                    else:
+                        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+                        resized = img.convert('RGB').resize(size, Image.LANCZOS)
+                        os.makedirs(self.cache_dir, exist_ok=True)
+                        tmp_path = f"{variant_path}.tmp"
+                        resized.save(tmp_path, 'JPEG', quality=VARIANT_QUALITY, optimize=True)
+                        os.replace(tmp_path, variant_path)
+            with self._lock:
+                self._variants[key] = variant_path
+        except Exception as e:
+            logger.warning(f"生成背景缩略图失败 {path}: {e}")
+            with self._lock:
+                # 失败后固定使用原图，避免反复重试
+                self._variants[key] = path
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
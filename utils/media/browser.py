@@ -1,52 +1,230 @@
 import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Optional
 from playwright.async_api import async_playwright
 from astrbot.api import logger
 
 
+# 页面池默认大小（同时渲染的最大页面数）
+DEFAULT_PAGE_POOL_SIZE = 2
+# 单个页面渲染多少次后回收重建，防止 Chromium 内存持续增长
+DEFAULT_PAGE_MAX_RENDERS = 50
+
+
+# headless 模式启动 Chromium 需要的浏览器
+CHROMIUM_BROWSER_NAMES = ('chromium', 'chromium-headless-shell')
+
+
+def _playwright_registry_dir(package_dir: str) -> str:
+    """Playwright 浏览器安装目录，与 Playwright registry 的查找规则一致"""
+    env_path = os.environ.get('PLAYWRIGHT_BROWSERS_PATH')
+    if env_path == '0':
+        return os.path.join(package_dir, 'driver', 'package', '.local-browsers')
+    if env_path:
+        return os.path.abspath(env_path)
+    if sys.platform == 'darwin':
+        cache_dir = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    elif sys.platform == 'win32':
+        cache_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_dir, 'ms-playwright')
+
+
+def is_chromium_installed() -> Optional[bool]:
+    """不启动子进程，直接根据 Playwright 的 browsers.json 检查 Chromium 是否已安装
+
+    Returns:
+        True 已安装，False 未安装，None 无法判断（例如 Playwright 目录结构变化）
+    """
+    try:
+        import playwright
+        package_dir = os.path.dirname(playwright.__file__)
+        with open(os.path.join(package_dir, 'driver', 'package', 'browsers.json'), 'r', encoding='utf-8') as f:
+            browsers = json.load(f).get('browsers', [])
+    except Exception as e:
+        logger.debug(f"读取 Playwright 浏览器列表失败: {e}")
+        return None
+
+    registry_dir = _playwright_registry_dir(package_dir)
+    required = [b for b in browsers if b.get('name') in CHROMIUM_BROWSER_NAMES]
+    if not required:
+        return None
+    for browser in required:
+        directory = os.path.join(registry_dir, f"{browser['name'].replace('-', '_')}-{browser['revision']}")
+        if not os.path.exists(os.path.join(directory, 'INSTALLATION_COMPLETE')):
+            return False
+    return True
+
+
+class _PooledPage:
+    """页面池中的页面，每个页面使用独立的 context，回收时一起关闭"""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.renders = 0
+
+    def is_healthy(self) -> bool:
+        return not self.page.is_closed()
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception as e:
+            logger.debug(f"关闭页面失败: {e}")
+
+
 class BrowserManager:
-    """Browser 管理器，用于统一管理 Playwright browser 实例"""
-    
-    def __init__(self):
+    """Browser 管理器，用于统一管理 Playwright browser 实例和可复用的页面池"""
+
+    def __init__(self, pool_size: int = DEFAULT_PAGE_POOL_SIZE, max_renders: int = DEFAULT_PAGE_MAX_RENDERS, routes: list = None):
+        """
+        Args:
+            pool_size: 页面池大小，也是同时渲染的最大页面数
+            max_renders: 单个页面渲染多少次后回收
+            routes: [(url 匹配模式, 处理函数)]，注册到每个新建的 context 上
+        """
         # 懒加载的 browser 实例
         self._playwright = None
         self._browser = None
         self._browser_lock = None
-    
+        # 页面池
+        self.pool_size = max(1, pool_size or DEFAULT_PAGE_POOL_SIZE)
+        self.max_renders = max(1, max_renders or DEFAULT_PAGE_MAX_RENDERS)
+        self._idle_pages: list[_PooledPage] = []
+        self._semaphore = None
+        self._routes = routes or []
+        # 后台安装浏览器的任务，安装完成前渲染请求排队等待
+        self._install_task: Optional[asyncio.Task] = None
+
     def _get_lock(self):
         """获取或创建浏览器锁"""
         if self._browser_lock is None:
             self._browser_lock = asyncio.Lock()
         return self._browser_lock
-    
+
+    def _get_semaphore(self):
+        """获取或创建并发渲染信号量"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+        return self._semaphore
+
+    def wait_for_install(self, task: asyncio.Task):
+        """设置浏览器安装任务，安装完成前启动浏览器的请求都会等待"""
+        self._install_task = task
+
+    def _is_connected(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
     async def ensure_browser(self):
-        """确保 browser 已初始化（懒加载）"""
+        """确保 browser 已初始化（懒加载），已连接时不等待锁"""
+        if self._is_connected():
+            return
+        if self._install_task is not None and not self._install_task.done():
+            logger.info("Playwright Chromium 正在安装，渲染请求排队等待...")
+            # shield：某个请求被取消时不影响安装本身
+            await asyncio.shield(self._install_task)
         lock = self._get_lock()
         async with lock:
-            if self._browser is None or not self._browser.is_connected():
-                try:
+            if self._is_connected():
+                return
+            # 浏览器断开后旧页面全部失效
+            self._idle_pages.clear()
+            try:
+                if self._playwright is None:
                     self._playwright = await async_playwright().start()
-                    self._browser = await self._playwright.chromium.launch()
-                except Exception as e:
-                    logger.error(f"初始化 browser 失败: {e}")
-                    raise
-    
+                self._browser = await self._playwright.chromium.launch()
+            except Exception as e:
+                logger.error(f"初始化 browser 失败: {e}")
+                raise
+
+    async def warm_up(self, count: int = None):
+        """预先创建页面放入页面池"""
+        await self.ensure_browser()
+        count = self.pool_size if count is None else min(count, self.pool_size)
+        while len(self._idle_pages) < count:
+            self._idle_pages.append(await self._new_page())
+
+    async def _new_page(self) -> _PooledPage:
+        context = await self.browser.new_context()
+        for pattern, handler in self._routes:
+            await context.route(pattern, handler)
+        page = await context.new_page()
+        return _PooledPage(context, page)
+
+    async def _acquire_page(self) -> _PooledPage:
+        await self.ensure_browser()
+        while self._idle_pages:
+            pooled = self._idle_pages.pop()
+            if pooled.is_healthy():
+                return pooled
+            await pooled.close()
+        return await self._new_page()
+
+    async def _release_page(self, pooled: _PooledPage, broken: bool):
+        pooled.renders += 1
+        if (
+            broken
+            or pooled.renders >= self.max_renders
+            or not pooled.is_healthy()
+            or not self._is_connected()
+            or len(self._idle_pages) >= self.pool_size
+        ):
+            await pooled.close()
+            return
+        self._idle_pages.append(pooled)
+
+    @asynccontextmanager
+    async def page(self, width: int, height: int, timeout: float):
+        """从页面池借出一个页面，最多同时借出 pool_size 个
+
+        Args:
+            width: viewport 宽度
+            height: viewport 高度
+            timeout: 页面默认超时（毫秒）
+        """
+        async with self._get_semaphore():
+            pooled = await self._acquire_page()
+            broken = False
+            try:
+                await pooled.page.set_viewport_size({'width': width, 'height': height})
+                pooled.page.set_default_timeout(timeout)
+                yield pooled.page
+            except BaseException:
+                # 渲染出错的页面状态不可信，直接回收
+                broken = True
+                raise
+            finally:
+                await self._release_page(pooled, broken)
+
     async def close(self):
-        """关闭 browser 实例"""
+        """关闭页面池和 browser 实例"""
         lock = self._get_lock()
         async with lock:
+            idle_pages, self._idle_pages = self._idle_pages, []
+            for pooled in idle_pages:
+                await pooled.close()
             if self._browser and self._browser.is_connected():
                 try:
                     await self._browser.close()
                 except Exception as e:
                     logger.error(f"关闭 browser 失败: {e}")
+            self._browser = None
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.error(f"关闭 playwright 失败: {e}")
                 finally:
-                    self._browser = None
                     self._playwright = None
-    
+
     @property
     def browser(self):
         """获取 browser 实例（需先调用 ensure_browser）"""
         if self._browser is None:
             raise RuntimeError("Browser 未初始化，请先调用 ensure_browser()")
         return self._browser
-
@@ -0,0 +1,80 @@
+import base64
+import mimetypes
+import os
+from typing import Optional
+
+from cachetools import LRUCache
+from astrbot.api import logger
+
+# 支持的图标扩展名（按优先级排序）
+ICON_EXTENSIONS = ['.png', '.gif', '.jpg', '.jpeg']
+
+# data URI 缓存的图标数量上限
+DEFAULT_DATA_URI_CACHE_SIZE = 2048
+
+
+class ItemIconIndex:
+    """物品图标索引
+
+    - 启动时扫描一次图标目录，之后按材料 ID 直接查字典
+    - 每次渲染前调用 refresh()，目录修改时间变化时才重新扫描
+    - 可选把图标内联为 data URI 并缓存，渲染时不需要浏览器再逐个读取图标文件
+    """
+
+    def __init__(self, directory: str, use_data_uri: bool = True, cache_size: int = DEFAULT_DATA_URI_CACHE_SIZE):
+        self.directory = directory
+        self.use_data_uri = use_data_uri
+        # 文件名（不含扩展名）-> 图标路径
+        self._icons: dict[str, str] = {}
+        self._dir_mtime: Optional[float] = None
+        self._data_uris = LRUCache(maxsize=max(1, cache_size))
+        self.refresh()
+
+    def refresh(self):
+        """目录修改时间变化时重新扫描"""
+        try:
+            mtime = os.stat(self.directory).st_mtime
+        except OSError:
+            self._icons, self._dir_mtime = {}, None
+            return
+        if mtime == self._dir_mtime:
+            return
+        icons = {}
+        priority = {ext: i for i, ext in enumerate(ICON_EXTENSIONS)}
+        for name in os.listdir(self.directory):
+            base, ext = os.path.splitext(name)
+            ext = ext.lower()
+            if ext not in priority:
+                continue
+            current = icons.get(base)
+            if current is None or priority[ext] < priority[os.path.splitext(current)[1].lower()]:
+                icons[base] = name
+        self._icons = {base: os.path.join(self.directory, name) for base, name in icons.items()}
+        self._dir_mtime = mtime
+        self._data_uris.clear()
+        logger.debug(f"物品图标目录已重新索引，共 {len(self._icons)} 个图标")
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    def find(self, material_name_id: str) -> str:
+        """根据材料ID查找图标路径，找不到返回空字符串
+
+        Args:
+            material_name_id: 材料ID，格式如 minecraft:white_stained_glass
+        """
+        if not material_name_id:
+            return ''
+        # 将 minecraft:white_stained_glass 转换为 minecraft_white_stained_glass
+        return self._icons.get(material_name_id.lower().strip().replace(':', '_'), '')
+
+    def data_uri(self, path: str) -> str:
+        """读取图标并转换为 data URI，结果缓存"""
+        uri = self._data_uris.get(path)
+        if uri is None:
+            with open(path, 'rb') as f:
+                encoded = base64.b64encode(f.read()).decode('ascii')
+            mime = mimetypes.guess_type(path)[0] or 'image/png'
+            uri = f"data:{mime};base64,{encoded}"
+            self._data_uris[path] = uri
+        return uri
@@ -1,15 +1,19 @@
-import time
+import asyncio
 from pathlib import Path
 import os
 import json
-import random
 import math
+import mimetypes
 import re
-from urllib.parse import urljoin
-from urllib.request import pathname2url
-from jinja2 import FileSystemLoader, Environment
+from functools import lru_cache
+from urllib.parse import quote, unquote, urlsplit
+from jinja2 import FileSystemLoader, FileSystemBytecodeCache, Environment
 from ..config_utils import ConfigUtils
 from .browser import BrowserManager
+from .image_cache import ImageCache, DEFAULT_IMAGE_CACHE_SIZE_MB
+from .background import BackgroundImageManager
+from .icon_index import ItemIconIndex
+from .raster import PillowRenderer, RASTER_TEMPLATES
 from astrbot.api import logger
 
 
@@ -55,32 +59,52 @@ MATERIAL_MIN_HEIGHT = 960  # 最小截图高度
 ITEMS_PER_STACK = 64  # 每组物品数量
 ITEMS_PER_BOX = 1728  # 每箱物品数量 (64 * 27)
 
-# 支持的图片格式
-SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-
 # 默认背景颜色
 DEFAULT_BACKGROUND_COLOR = "#43454A"
 
+# 模板中本地资源（字体、图标、背景图）使用的虚拟域名，由页面路由转发到本地文件
+RESOURCE_ORIGIN = "http://mc-admin.local"
+
 
 # ==================== 工具函数 ====================
 
-def path_to_file_url(file_path: str) -> str:
-    """将文件路径转换为 file:// URL（跨平台支持）
-        
+def path_to_resource_url(file_path: str) -> str:
+    """将本地文件路径转换为资源 URL（跨平台支持）
+
     支持平台：
-        - Windows: C:\\path\\to\\file -> file:///C:/path/to/file
-        - Linux/Mac: /path/to/file -> file:///path/to/file
+        - Windows: C:\\path\\to\\file -> http://mc-admin.local/C%3A/path/to/file
+        - Linux/Mac: /path/to/file -> http://mc-admin.local/path/to/file
     """
-    # 转换为绝对路径
-    abs_path = os.path.abspath(file_path)
-    # 使用 Path 对象确保跨平台兼容
-    path_obj = Path(abs_path)
-    # 转换为 POSIX 风格路径（使用正斜杠）
-    posix_path = path_obj.as_posix()
-    # 使用 pathname2url 进行 URL 编码（处理特殊字符和空格）
-    url_path = pathname2url(posix_path)
-    # 构建 file:// URL
-    return f"file:///{url_path}"
+    # 转换为 POSIX 风格的绝对路径（使用正斜杠）
+    posix_path = Path(os.path.abspath(file_path)).as_posix()
+    if not posix_path.startswith('/'):
+        posix_path = '/' + posix_path
+    # URL 编码（处理特殊字符和空格）
+    return f"{RESOURCE_ORIGIN}{quote(posix_path)}"
+
+
+def resource_url_to_path(url: str) -> str:
+    """将资源 URL 还原为本地文件路径，path_to_resource_url 的逆操作"""
+    path = unquote(urlsplit(url).path)
+    # Windows 盘符路径去掉开头的 /
+    if re.match(r'^/[A-Za-z]:/', path):
+        path = path[1:]
+    return os.path.normpath(path)
+
+
+@lru_cache(maxsize=None)
+def get_template_environment(template_dir: str, bytecode_cache_dir: str) -> Environment:
+    """获取共享的 Jinja2 Environment，同一模板目录只创建一次
+
+    模板编译结果缓存在内存中，编译出的字节码缓存在 bytecode_cache_dir，
+    auto_reload 只在模板文件修改时间变化时重新编译
+    """
+    os.makedirs(bytecode_cache_dir, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+        auto_reload=True,
+    )
 
 
 # ==================== 类定义 ====================
@@ -97,9 +121,50 @@ class ImageUtils:
         self.template_dir = os.path.join(self.config_utils.get_plugin_path(), 'template')
         self.enable_background_image = self.config_utils.enable_background_image
         self.background_image_dir = self.config_utils.background_image_path
+        # 背景图索引和渲染用的缩略图
+        self.background_manager = BackgroundImageManager(
+            self.background_image_dir, os.path.join(self.output, 'background_cache')
+        )
         
-        # 使用 BrowserManager 管理 browser 实例
-        self.browser_manager = BrowserManager()
+        # 共享的模板环境，启动时预编译全部模板
+        self.template_env = get_template_environment(
+            self.template_dir, os.path.join(self.output, 'jinja_cache')
+        )
+        self._precompile_templates()
+        
+        # 页面只允许读取插件目录和背景图目录下的文件
+        self.resource_roots = [
+            os.path.realpath(self.config_utils.get_plugin_path()),
+            os.path.realpath(self.background_image_dir),
+        ]
+        
+        # 使用 BrowserManager 管理 browser 实例和页面池
+        self.browser_manager = BrowserManager(
+            pool_size=self.config_utils.browser_page_pool_size,
+            max_renders=self.config_utils.browser_page_max_renders,
+            routes=[(f"{RESOURCE_ORIGIN}/**", self._serve_resource)]
+        )
+        
+        # 物品图标索引，材料图标按需内联为 data URI
+        self.icon_index = ItemIconIndex(
+            os.path.join(self.output, "item_icon"),
+            use_data_uri=self.config_utils.enable_icon_data_uri is not False
+        )
+        
+        # 使用 Pillow 直接绘制、不经过浏览器的模板
+        self.rasterizer = PillowRenderer(self.config_utils.get_font_path())
+        self.raster_templates = {
+            name for name in (self.config_utils.raster_templates or []) if name in RASTER_TEMPLATES
+        }
+        if self.raster_templates and not self.rasterizer.available():
+            logger.warning("未安装 Pillow，轻量渲染不可用，将使用浏览器渲染")
+        
+        # 渲染结果缓存，相同模板和数据直接返回已生成的图片
+        cache_size = self.config_utils.image_cache_size_mb
+        self.image_cache = ImageCache(
+            os.path.join(self.output, 'image_cache'),
+            DEFAULT_IMAGE_CACHE_SIZE_MB if cache_size is None else cache_size
+        )
         
         # 记录最后使用的背景图片路径
         self._background_image = None
@@ -113,51 +178,49 @@ class ImageUtils:
     async def close_browser(self):
         """关闭 browser 实例"""
         await self.browser_manager.close()
+        self.background_manager.close()
     
-    async def generate_list_image(self, servers_data=None):
+    async def generate_list_image(self, servers_data=None) -> bytes:
         """生成在线玩家列表图片
 
         Returns:
-            str: 生成的图片文件路径
+            bytes: PNG 图片数据
         """
-        output_path = Path(os.path.join(self.template_dir, 'img.png'))
-        output_path.parent.mkdir(exist_ok=True)
-
-        # 渲染 HTML 模板
-        html_content = self.render_list_template(servers_data)
-        
         # 计算截图高度
         height = self._calculate_list_screenshot_height(servers_data)
         
-        # 截图
-        path = await self._take_screenshot(html_content, height, 'list.png')
+        if self._use_raster('list'):
+            return await self._render_raster(self.rasterizer.render_list, servers_data, height)
         
-        return path
+        # 渲染 HTML 模板
+        html_content = self.render_list_template(servers_data, height=height)
+        
+        # 截图
+        return await self._render_cached('list.html', html_content, height)
 
-    async def generate_whitelist_image(self, whitelist_players: list[str], filename: str = 'whitelist.png') -> str:
+    async def generate_whitelist_image(self, whitelist_players: list[str]) -> bytes:
         """生成白名单图片（栅格布局）"""
         players = whitelist_players or []
-        html_content = self.render_whitelist_template(players)
         height = self._calculate_whitelist_screenshot_height(players)
-        return await self._take_screenshot(html_content, height, filename)
+        html_content = self.render_whitelist_template(players, height=height)
+        return await self._render_cached('whitelist.html', html_content, height)
 
-    async def generate_help_image(self, help_data: dict, filename: str = 'help.png') -> str:
+    async def generate_help_image(self, help_data: dict) -> bytes:
         """生成帮助信息图片"""
-        html_content = self.render_help_template(help_data)
         height = self._calculate_help_screenshot_height(help_data)
-        return await self._take_screenshot(html_content, height, filename)
+        html_content = self.render_help_template(help_data, height=height)
+        return await self._render_cached('help.html', html_content, height)
     
-    async def generate_materia_image(self, task_data: dict, materia_list: list, filename: str = 'task.png', use_big_image: bool = True) -> str:
+    async def generate_materia_image(self, task_data: dict, materia_list: list, use_big_image: bool = True) -> bytes:
         """生成材料列表图片
 
         Args:
             task_data: 任务数据
             materia_list: 材料列表
-            filename: 输出文件名
             use_big_image: 是否使用大图模式（并列显示多列），默认为 True
 
         Returns:
-            str: 生成的图片文件路径
+            bytes: PNG 图片数据
         """
         # 准备数据
         task_data_with_materia = task_data.copy()
@@ -172,46 +235,56 @@ class ImageUtils:
         width = self._calculate_materia_screenshot_width(material_count, use_big_image)
 
         # 渲染 HTML 模板
-        html_content = self.render_materia_template(task_data_with_materia)
+        html_content = self.render_materia_template(task_data_with_materia, width=width, height=height)
 
         # 截图（大图模式使用 full_page=True，传统模式使用 full_page=False）
-        path = await self._take_screenshot(html_content, height, filename, width, full_page=use_big_image)
-
-        return path
+        return await self._render_cached('MateriaList.html', html_content, height, width, full_page=use_big_image)
 
-    async def generate_zz_image(self, zz_data: dict, filename: str = 'zz.png') -> str:
+    async def generate_zz_image(self, zz_data: dict) -> bytes:
         """生成珍珠炮计算结果图片"""
         processed_data = self._process_zz_data(zz_data)
         height = self._calculate_zz_screenshot_height(processed_data)
-        html_content = self.render_zz_template(processed_data)
-        return await self._take_screenshot(html_content, height, filename)
+        html_content = self.render_zz_template(processed_data, height=height)
+        return await self._render_cached('zz.html', html_content, height)
 
-    async def generate_status_image(self, servers_status: dict, filename: str = 'status.png') -> str:
+    async def generate_status_image(self, servers_status: dict) -> bytes:
         """生成服务器状态图片
 
         Args:
             servers_status: 服务器状态字典，格式为 {server_name: is_online}
-            filename: 输出文件名
 
         Returns:
-            str: 生成的图片文件路径
+            bytes: PNG 图片数据
         """
-        html_content = self.render_status_template(servers_status)
         height = self._calculate_status_screenshot_height(servers_status)
-        return await self._take_screenshot(html_content, height, filename)
+        if self._use_raster('status'):
+            return await self._render_raster(self.rasterizer.render_status, servers_status, height)
+        html_content = self.render_status_template(servers_status, height=height)
+        return await self._render_cached('status.html', html_content, height)
     
     # ==================== 模板渲染方法 ====================
+
+    def _precompile_templates(self):
+        """预编译模板目录中的全部 HTML 模板，避免首次渲染时编译"""
+        try:
+            names = self.template_env.list_templates(extensions=['html'])
+        except OSError as e:
+            logger.warning(f"读取模板目录失败: {e}")
+            return
+        for name in names:
+            try:
+                self.template_env.get_template(name)
+            except Exception as e:
+                logger.error(f"预编译模板 {name} 失败: {e}")
     
-    def render_list_template(self, servers_data=None):
+    def render_list_template(self, servers_data=None, height: int = None):
         """渲染玩家列表 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("list.html")
+        template = self.template_env.get_template("list.html")
         
         # 准备背景样式
-        background_image_style = self._get_background_image_style()
+        background_image_style = self._get_background_image_style(height=height)
         # 获取字体
-        font = self.config_utils.get_font()
+        font = self._get_font_url()
         # 准备服务器数据（直接传递字典，不需要转 JSON）
         servers_data = servers_data or {}
         
@@ -223,9 +296,13 @@ class ImageUtils:
         
         return html_content
     
-    def _get_background_image_style(self) -> str:
+    def _get_background_image_style(self, width: int = SCREENSHOT_WIDTH, height: int = None) -> str:
         """获取背景图片样式（跨平台支持）
         
+        Args:
+            width: 截图宽度
+            height: 截图高度，用于选择合适尺寸的缩略图
+            
         Returns:
             str: CSS 背景样式字符串
         """
@@ -241,9 +318,11 @@ class ImageUtils:
             return f"background: {DEFAULT_BACKGROUND_COLOR};"
         
         try:
+            # 渲染使用缩小后的背景图，/原图 仍然返回原图
+            render_path = self.background_manager.variant(background_image_path, width, height)
             # 使用跨平台路径转换函数
-            file_url = path_to_file_url(background_image_path)
-            return f"background-image: url('{file_url}');"
+            resource_url = path_to_resource_url(render_path)
+            return f"background-image: url('{resource_url}');"
         except Exception as e:
             logger.error(f"创建背景样式失败: {e}")
             return f"background: {DEFAULT_BACKGROUND_COLOR};"
@@ -259,22 +338,19 @@ class ImageUtils:
                 logger.debug("已禁用背景图片，不获取随机背景图")
                 return ''
             
-            if not os.path.exists(self.background_image_dir):
+            if not self.background_manager.exists():
                 logger.warning(f"背景图片目录不存在: {self.background_image_dir}")
                 return ''
             
-            # 获取所有图片文件
-            image_files = self._get_image_files(self.background_image_dir)
+            # 从索引中随机选择（目录变化时才重新扫描）
+            image_path = self.background_manager.random_image()
             
-            if not image_files:
+            if not image_path:
                 logger.debug(f"背景图片目录中没有找到图片文件: {self.background_image_dir}")
                 return ''
             
-            # 随机选择并保存路径
-            random_image = random.choice(image_files)
-            logger.debug(f"选择的背景图片: {random_image}")
-            
-            image_path = os.path.join(self.background_image_dir, random_image)
+            # 保存路径
+            logger.debug(f"选择的背景图片: {image_path}")
             self._background_image = image_path
             return image_path
             
@@ -282,26 +358,19 @@ class ImageUtils:
             logger.error(f"获取随机背景图片失败: {str(e)}")
             return ''
     
-    def _get_image_files(self, directory: str) -> list:
-        """获取目录中的所有图片文件"""
-        image_files = []
-        for file in os.listdir(directory):
-            file_ext = os.path.splitext(file)[1].lower()
-            if file_ext in SUPPORTED_IMAGE_EXTENSIONS:
-                image_files.append(file)
-        return image_files
+    def _get_font_url(self) -> str:
+        """获取字体资源 URL"""
+        return path_to_resource_url(self.config_utils.get_font_path())
     
     # ==================== MateriaList 模板渲染方法 ====================
     
-    def render_materia_template(self, task_data: dict) -> str:
+    def render_materia_template(self, task_data: dict, width: int = SCREENSHOT_WIDTH, height: int = None) -> str:
         """渲染材料列表 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("MateriaList.html")
+        template = self.template_env.get_template("MateriaList.html")
         
         # 使用统一的背景样式获取方法
-        background_image_style = self._get_background_image_style()
-        font = self.config_utils.get_font()
+        background_image_style = self._get_background_image_style(width, height)
+        font = self._get_font_url()
         
         html_content = template.render({
             "data": task_data,
@@ -311,14 +380,12 @@ class ImageUtils:
         
         return html_content
 
-    def render_zz_template(self, zz_data: dict) -> str:
+    def render_zz_template(self, zz_data: dict, height: int = None) -> str:
         """渲染珍珠炮计算结果 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("zz.html")
+        template = self.template_env.get_template("zz.html")
 
-        background_image_style = self._get_background_image_style()
-        font = self.config_utils.get_font()
+        background_image_style = self._get_background_image_style(height=height)
+        font = self._get_font_url()
 
         return template.render({
             "data": zz_data,
@@ -326,14 +393,12 @@ class ImageUtils:
             "font": font
         })
 
-    def render_whitelist_template(self, whitelist_players: list[str]) -> str:
+    def render_whitelist_template(self, whitelist_players: list[str], height: int = None) -> str:
         """渲染白名单 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("whitelist.html")
+        template = self.template_env.get_template("whitelist.html")
 
-        background_image_style = self._get_background_image_style()
-        font = self.config_utils.get_font()
+        background_image_style = self._get_background_image_style(height=height)
+        font = self._get_font_url()
 
         return template.render({
             "players": whitelist_players,
@@ -342,14 +407,12 @@ class ImageUtils:
             "font": font
         })
 
-    def render_status_template(self, servers_status: dict) -> str:
+    def render_status_template(self, servers_status: dict, height: int = None) -> str:
         """渲染服务器状态 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("status.html")
+        template = self.template_env.get_template("status.html")
 
-        background_image_style = self._get_background_image_style()
-        font = self.config_utils.get_font()
+        background_image_style = self._get_background_image_style(height=height)
+        font = self._get_font_url()
 
         return template.render({
             "servers_status": servers_status,
@@ -357,14 +420,12 @@ class ImageUtils:
             "font": font
         })
 
-    def render_help_template(self, help_data: dict) -> str:
+    def render_help_template(self, help_data: dict, height: int = None) -> str:
         """渲染帮助 HTML 模板"""
-        templates_dir = os.path.join(self.config_utils.get_plugin_path(), "template")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("help.html")
+        template = self.template_env.get_template("help.html")
 
-        background_image_style = self._get_background_image_style()
-        font = self.config_utils.get_font()
+        background_image_style = self._get_background_image_style(height=height)
+        font = self._get_font_url()
 
         items = help_data.get("items", []) if help_data else []
         title = help_data.get("title", "Minecraft 插件帮助") if help_data else "Minecraft 插件帮助"
@@ -378,40 +439,30 @@ class ImageUtils:
         })
     
     def _get_material_image_url(self, material_name_id: str) -> str:
-        """根据材料ID获取本地图片文件URL
+        """根据材料ID获取图标URL
         
         Args:
             material_name_id: 材料ID，格式如 minecraft:white_stained_glass
             
         Returns:
-            str: 图片文件的 file:// URL，如果找不到则返回空字符串
+            str: 图标的 data URI 或资源 URL，如果找不到则返回空字符串
         """
         if not material_name_id:
             return ''
         
-        # 将 minecraft:white_stained_glass 转换为 minecraft_white_stained_glass
-        file_name_base = material_name_id.lower().strip().replace(':', '_')
-        
-        # item_icon 目录路径
-        item_icon_dir = os.path.join(self.output, "item_icon")
-        
-        # 支持的图片扩展名（按优先级排序）
-        supported_extensions = ['.png', '.gif', '.jpg', '.jpeg']
-        
-        # 尝试查找文件
-        for ext in supported_extensions:
-            file_path = os.path.join(item_icon_dir, f"{file_name_base}{ext}")
-            if os.path.exists(file_path):
-                # 转换为 file:// URL
-                try:
-                    return path_to_file_url(file_path)
-                except Exception as e:
-                    logger.warning(f"转换图片路径失败 {file_path}: {e}")
-                    return ''
-        
-        # 如果找不到文件，记录警告
-        logger.debug(f"未找到材料图标文件: {material_name_id} (查找路径: {file_name_base})")
-        return ''
+        file_path = self.icon_index.find(material_name_id)
+        if not file_path:
+            logger.debug(f"未找到材料图标文件: {material_name_id}")
+            return ''
+        
+        try:
+            if self.icon_index.use_data_uri:
+                return self.icon_index.data_uri(file_path)
+            # 转换为资源 URL
+            return path_to_resource_url(file_path)
+        except Exception as e:
+            logger.warning(f"转换图片路径失败 {file_path}: {e}")
+            return ''
     
     def _process_materia_list(self, materia_list: list) -> list:
         """处理材料列表数据"""
@@ -424,6 +475,9 @@ class ImageUtils:
             remaining_items = max(0, (total - commit_count)) % ITEMS_PER_BOX
             return round(remaining_items / ITEMS_PER_STACK, 2)
         
+        # 图标目录有变化时重新索引，之后每行只查字典
+        self.icon_index.refresh()
+        
         res = []
         for materia in materia_list:
             total = int(materia[3])
@@ -650,45 +704,80 @@ class ImageUtils:
         return max(HELP_MIN_HEIGHT, content_height)
     
     # ==================== 截图方法 ====================
+
+    async def _render_cached(self, template_name: str, html_content: str, height: int, width: int = SCREENSHOT_WIDTH, full_page: bool = False) -> bytes:
+        """优先从缓存获取图片，未命中时渲染并写入缓存
+
+        渲染后的 HTML 已包含输入数据和选中的背景图，再加上模板修改时间作为缓存键
+        """
+        try:
+            template_mtime = os.path.getmtime(os.path.join(self.template_dir, template_name))
+        except OSError:
+            template_mtime = 0.0
+        key = self.image_cache.make_key(template_name, template_mtime, html_content, width, height, full_page)
+        cached = await self.image_cache.get(key)
+        if cached is not None:
+            return cached
+        data = await self._render_png(html_content, height, width, full_page)
+        await self.image_cache.put(key, data)
+        return data
     
-    async def _take_screenshot(self, html_content: str, height: int, filename: str, width: int = SCREENSHOT_WIDTH, full_page: bool = False) -> str:
-        """使用 playwright 截图（统一截图方法）"""
-        path = os.path.join(self.output, filename)
-        # 创建临时 HTML 文件以支持本地资源加载
-        temp_html_path = os.path.join(self.output, f'temp_{filename}.html')
+    def _use_raster(self, template: str) -> bool:
+        """该模板是否使用 Pillow 轻量渲染"""
+        return template in self.raster_templates and self.rasterizer.available()
+
+    async def _render_raster(self, draw, data, height: int, width: int = SCREENSHOT_WIDTH) -> bytes:
+        """在线程中用 Pillow 绘制图片，不经过浏览器"""
+        background_path = None
+        if self.enable_background_image:
+            background_path = self.get_random_background_image() or None
+            if background_path:
+                background_path = self.background_manager.variant(background_path, width, height)
+        return await asyncio.to_thread(draw, data, width, height, background_path, DEFAULT_BACKGROUND_COLOR)
+
+    async def _render_png(self, html_content: str, height: int, width: int = SCREENSHOT_WIDTH, full_page: bool = False) -> bytes:
+        """使用 playwright 在内存中渲染 HTML 并截图（统一截图方法）
 
-        await self.browser_manager.ensure_browser()
+        Returns:
+            bytes: PNG 图片数据
+        """
         # 设置 viewport
         viewport_height = 2000 if full_page else height
-        page = await self.browser_manager.browser.new_page(viewport={
-            'width': width,
-            'height': viewport_height
-        })
-        
+
         # 根据图片大小动态计算超时时间（宽度越大，超时时间越长）
         # 基础超时30秒，每增加1200px宽度增加30秒
         timeout = 30000 + (width // 1200) * 30000
-        # 设置页面超时
-        page.set_default_timeout(timeout)
-        
-        try:
-            # 将 HTML 写入临时文件
-            with open(temp_html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # 使用跨平台路径转换函数构建 file:// URL
-            file_url = path_to_file_url(temp_html_path)
-            
-            await page.goto(file_url, wait_until='load', timeout=timeout)
+
+        # 从页面池借用页面，渲染完成后归还复用
+        async with self.browser_manager.page(width, viewport_height, timeout) as page:
+            # 直接设置页面内容，本地资源由 _serve_resource 提供
+            await page.set_content(html_content, wait_until='load', timeout=timeout)
             # 根据参数决定是否使用全页截图
-            await page.screenshot(path=path, full_page=full_page, timeout=timeout)
-        finally:
-            await page.close()
-            # 删除临时 HTML 文件
+            return await page.screenshot(full_page=full_page, timeout=timeout)
+
+    def _resolve_resource(self, url: str):
+        """将资源 URL 解析为允许访问的本地文件路径，不允许时返回 None"""
+        path = os.path.realpath(resource_url_to_path(url))
+        for root in self.resource_roots:
             try:
-                if os.path.exists(temp_html_path):
-                    os.remove(temp_html_path)
-            except Exception as e:
-                logger.warning(f'删除临时文件失败: {e}')
-        
-        return path
+                if os.path.commonpath([path, root]) == root:
+                    return path if os.path.isfile(path) else None
+            except ValueError:
+                # Windows 下不同盘符无法比较
+                continue
+        return None
+
+    async def _serve_resource(self, route):
+        """页面路由：把资源 URL 映射到本地字体、图标、背景图文件"""
+        path = self._resolve_resource(route.request.url)
+        if path is None:
+            logger.debug(f"拒绝或未找到页面资源: {route.request.url}")
+            await route.fulfill(status=404)
+            return
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        await route.fulfill(
+            path=path,
+            content_type=content_type,
+            # set_content 的页面来源为 about:blank，字体属于跨域加载，需要 CORS 头
+            headers={'Access-Control-Allow-Origin': '*'}
+        )
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import os
+from typing import Optional
+
+from cachetools import LRUCache
+from astrbot.api import logger
+
+# 默认磁盘缓存上限（MB）
+DEFAULT_IMAGE_CACHE_SIZE_MB = 64
+
+
+class _DiskIndex(LRUCache):
+    """磁盘缓存索引：key -> 文件大小，按字节数限制总量，淘汰时删除对应文件"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        super().__init__(maxsize=max_bytes, getsizeof=lambda size: max(1, size))
+        self.cache_dir = cache_dir
+
+    def popitem(self):
+        key, size = super().popitem()
+        try:
+            os.remove(os.path.join(self.cache_dir, f"{key}.png"))
+        except OSError as e:
+            logger.debug(f"删除图片缓存失败: {e}")
+        return key, size
+
+
+class ImageCache:
+    """渲染结果图片缓存
+
+    - 按 (模板名, 模板修改时间, 渲染后的 HTML, 尺寸) 的哈希缓存 PNG，HTML 中已经包含输入数据和背景图
+    - PNG 保存在磁盘上，按总字节数 LRU 淘汰，重启后按文件修改时间恢复顺序
+    - 只在事件循环线程中修改索引，文件读写放到线程中执行
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: int = DEFAULT_IMAGE_CACHE_SIZE_MB):
+        self.cache_dir = cache_dir
+        self.enabled = max_size_mb > 0
+        self._index = _DiskIndex(cache_dir, max(1, max_size_mb) * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self._load_index()
+
+    def _load_index(self):
+        """扫描缓存目录，按修改时间从旧到新恢复 LRU 顺序"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.png'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+            for _, key, size in sorted(entries):
+                self._index[key] = size
+        except OSError as e:
+            logger.warning(f"加载图片缓存目录失败: {e}")
+
+    @staticmethod
+    def make_key(template_name: str, template_mtime: float, html_content: str, width: int, height: int, full_page: bool) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{template_name}\0{template_mtime}\0{width}x{height}\0{full_page}\0".encode('utf-8'))
+        digest.update(html_content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            data = f.read()
+        # 更新修改时间，重启后仍能保持 LRU 顺序
+        os.utime(path)
+        return data
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """获取缓存的 PNG，未命中返回 None"""
+        if not self.enabled or self._index.get(key) is None:
+            self.misses += 1
+            return None
+        try:
+            data = await asyncio.to_thread(self._read, self._path(key))
+        except OSError:
+            # 文件被外部删除
+            self._index.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    async def put(self, key: str, data: bytes):
+        if not self.enabled or len(data) > self._index.maxsize:
+            return
+        try:
+            await asyncio.to_thread(self._write, self._path(key), data)
+        except OSError as e:
+            logger.warning(f"写入图片缓存失败: {e}")
+            return
+        self._index[key] = len(data)
+
+    def clear(self):
+        """清空缓存（逐个淘汰以删除磁盘文件）"""
+        while self._index:
+            self._index.popitem()
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._index),
+            "bytes": self._index.currsize,
+            "max_bytes": self._index.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,301 @@
+import io
+from typing import Optional
+
+from astrbot.api import logger
+
+try:
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+except ImportError:
+    # Pillow 未安装时不可用，回退到浏览器渲染
+    Image = None
+
+# 可以用 Pillow 直接绘制的模板
+RASTER_TEMPLATES = ('status', 'list')
+
+# 与 status.html / list.html 中的样式保持一致
+PAGE_PADDING = 36
+TITLE_SIZE = 43
+TITLE_MARGIN = 36
+CARD_RADIUS = 16
+CARD_FILL = (255, 255, 255, 38)
+CARD_BORDER = (255, 255, 255, 51)
+CARD_BLUR = 10
+BACKGROUND_DIM = (0, 0, 0, 51)
+BACKGROUND_BLUR = 2
+TEXT_COLOR = (255, 255, 255, 255)
+MUTED_COLOR = (255, 255, 255, 178)
+SHADOW_COLOR = (0, 0, 0, 77)
+ONLINE_COLOR = (74, 222, 128, 255)
+OFFLINE_COLOR = (248, 113, 113, 255)
+BOT_COLOR = (251, 191, 36, 255)
+
+# status.html
+STATUS_CARD_WIDTH = 350
+STATUS_CARD_GAP = 20
+STATUS_CARD_PADDING = (36, 28)
+STATUS_NAME_SIZE = 28
+STATUS_TEXT_SIZE = 24
+STATUS_DOT_SIZE = 16
+
+# list.html
+LIST_CARD_PADDING = 36
+LIST_CARD_MARGIN = 29
+LIST_NAME_SIZE = 32
+LIST_NAME_MARGIN = 22
+LIST_SECTION_SIZE = 25
+LIST_SECTION_MARGIN = 29
+LIST_SECTION_TITLE_MARGIN = 14
+LIST_PLAYER_SIZE = 22
+LIST_PLAYER_GAP = 11
+LIST_PLAYER_PADDING = (14, 7)
+LIST_AVATAR_SIZE = 22
+
+
+class PillowRenderer:
+    """不依赖浏览器的轻量渲染器，用 Pillow 按模板样式直接绘制状态图和玩家列表图
+
+    头像需要联网获取，这里用占位方块代替
+    """
+
+    def __init__(self, font_path: str):
+        self.font_path = font_path
+        self._fonts: dict[int, object] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    # ==================== 基础绘制 ====================
+
+    def _font(self, size: int):
+        font = self._fonts.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype(self.font_path, size)
+            except OSError:
+                if not self._fonts:
+                    logger.warning(f"加载字体失败，使用默认字体: {self.font_path}")
+                try:
+                    font = ImageFont.load_default(size)
+                except TypeError:
+                    # Pillow 10.1 之前 load_default 不支持字号，只有固定大小的位图字体
+                    font = ImageFont.load_default()
+            self._fonts[size] = font
+        return font
+
+    def _text_width(self, text: str, size: int) -> int:
+        return int(self._font(size).getlength(text))
+
+    @staticmethod
+    def _line_height(size: int) -> int:
+        return round(size * 1.2)
+
+    def _fit(self, text: str, size: int, max_width: int) -> str:
+        """文字过长时截断并加省略号"""
+        if self._text_width(text, size) <= max_width:
+            return text
+        while text and self._text_width(text + '…', size) > max_width:
+            text = text[:-1]
+        return text + '…'
+
+    def _text(self, draw, xy, text: str, size: int, fill, bold: bool = False, shadow: int = 1):
+        """绘制带阴影的文字，xy 为文字行框左上角"""
+        font = self._font(size)
+        x, y = xy
+        # 文字在行框中垂直居中
+        y += (self._line_height(size) - size) // 2
+        stroke = 1 if bold else 0
+        if shadow:
+            draw.text((x, y + shadow), text, font=font, fill=SHADOW_COLOR, stroke_width=stroke, stroke_fill=SHADOW_COLOR)
+        draw.text((x, y), text, font=font, fill=fill, stroke_width=stroke, stroke_fill=fill)
+
+    def _centered_text(self, draw, left: int, right: int, y: int, text: str, size: int, fill, bold: bool = False):
+        text = self._fit(text, size, right - left)
+        x = left + (right - left - self._text_width(text, size)) // 2
+        self._text(draw, (x, y), text, size, fill, bold)
+
+    def _background(self, width: int, height: int, background_path: Optional[str], default_color: str):
+        """按 background-size: cover 铺满背景，并叠加半透明遮罩"""
+        canvas = None
+        if background_path:
+            try:
+                with Image.open(background_path) as img:
+                    # JPEG 直接按接近目标的尺寸解码，减少解码量
+                    img.draft('RGB', (width, height))
+                    img = img.convert('RGB')
+                    scale = max(width / img.width, height / img.height)
+                    size = (max(width, round(img.width * scale)), max(height, round(img.height * scale)))
+                    img = img.resize(size, Image.BILINEAR)
+                    left = (size[0] - width) // 2
+                    top = (size[1] - height) // 2
+                    canvas = img.crop((left, top, left + width, top + height)).convert('RGBA')
+                    canvas = canvas.filter(ImageFilter.GaussianBlur(BACKGROUND_BLUR))
+            except Exception as e:
+                logger.warning(f"加载背景图失败 {background_path}: {e}")
+        if canvas is None:
+            canvas = Image.new('RGBA', (width, height), default_color)
+        return Image.alpha_composite(canvas, Image.new('RGBA', (width, height), BACKGROUND_DIM))
+
+    @staticmethod
+    def _card(canvas, box, radius: int, fill, border, blur: int):
+        """绘制毛玻璃卡片，只在卡片所在区域内处理"""
+        left, top, right, bottom = (int(v) for v in box)
+        size = (right - left, bottom - top)
+        local_box = (0, 0, size[0] - 1, size[1] - 1)
+        if blur:
+            mask = Image.new('L', size, 0)
+            ImageDraw.Draw(mask).rounded_rectangle(local_box, radius=radius, fill=255)
+            blurred = canvas.crop((left, top, right, bottom)).filter(ImageFilter.GaussianBlur(blur))
+            canvas.paste(blurred, (left, top), mask)
+        overlay = Image.new('RGBA', size, (0, 0, 0, 0))
+        ImageDraw.Draw(overlay).rounded_rectangle(local_box, radius=radius, fill=fill, outline=border, width=1)
+        canvas.alpha_composite(overlay, (left, top))
+
+    @staticmethod
+    def _to_png(canvas) -> bytes:
+        buffer = io.BytesIO()
+        # 低压缩等级：编码耗时远小于默认等级，图片只用于发送
+        canvas.convert('RGB').save(buffer, 'PNG', compress_level=1)
+        return buffer.getvalue()
+
+    # ==================== status ====================
+
+    def render_status(self, servers_status: dict, width: int, min_height: int,
+                      background_path: Optional[str], default_color: str) -> bytes:
+        """绘制服务器状态图（对应 status.html）"""
+        content_width = width - PAGE_PADDING * 2
+        per_row = max(1, (content_width + STATUS_CARD_GAP) // (STATUS_CARD_WIDTH + STATUS_CARD_GAP))
+        pad_x, pad_y = STATUS_CARD_PADDING
+        card_height = (
+            pad_y * 2 + self._line_height(STATUS_NAME_SIZE) + 16
+            + 12 + self._line_height(STATUS_TEXT_SIZE)
+        )
+        items = list((servers_status or {}).items())
+        rows = [items[i:i + per_row] for i in range(0, len(items), per_row)]
+
+        top = PAGE_PADDING + self._line_height(TITLE_SIZE) + TITLE_MARGIN
+        body_height = len(rows) * card_height + max(0, len(rows) - 1) * STATUS_CARD_GAP if rows else 120
+        height = max(min_height, top + body_height + PAGE_PADDING)
+
+        canvas = self._background(width, height, background_path, default_color)
+        draw = ImageDraw.Draw(canvas)
+        self._centered_text(draw, 0, width, PAGE_PADDING, "Minecraft 服务器状态", TITLE_SIZE, TEXT_COLOR, bold=True)
+
+        if not rows:
+            self._centered_text(draw, 0, width, top + 40, "暂无服务器状态信息", 25, MUTED_COLOR)
+            return self._to_png(canvas)
+
+        y = top
+        for row in rows:
+            row_width = len(row) * STATUS_CARD_WIDTH + (len(row) - 1) * STATUS_CARD_GAP
+            x = (width - row_width) // 2
+            for server_name, is_online in row:
+                self._card(canvas, (x, y, x + STATUS_CARD_WIDTH, y + card_height), CARD_RADIUS, CARD_FILL, CARD_BORDER, CARD_BLUR)
+                draw = ImageDraw.Draw(canvas)
+                self._centered_text(draw, x + pad_x, x + STATUS_CARD_WIDTH - pad_x, y + pad_y,
+                                    str(server_name), STATUS_NAME_SIZE, TEXT_COLOR, bold=True)
+
+                color = ONLINE_COLOR if is_online else OFFLINE_COLOR
+                label = '在线' if is_online else '离线'
+                line_y = y + pad_y + self._line_height(STATUS_NAME_SIZE) + 16 + 12
+                text_height = self._line_height(STATUS_TEXT_SIZE)
+                group_width = STATUS_DOT_SIZE + 12 + self._text_width(label, STATUS_TEXT_SIZE)
+                dot_x = x + (STATUS_CARD_WIDTH - group_width) // 2
+                dot_y = line_y + (text_height - STATUS_DOT_SIZE) // 2
+                draw.ellipse((dot_x, dot_y, dot_x + STATUS_DOT_SIZE, dot_y + STATUS_DOT_SIZE), fill=color)
+                self._text(draw, (dot_x + STATUS_DOT_SIZE + 12, line_y), label, STATUS_TEXT_SIZE, color, bold=True)
+                x += STATUS_CARD_WIDTH + STATUS_CARD_GAP
+            y += card_height + STATUS_CARD_GAP
+
+        return self._to_png(canvas)
+
+    # ==================== list ====================
+
+    def _layout_players(self, players: list, max_width: int) -> list:
+        """按 flex-wrap 排列玩家卡片，返回 [(x, 行号, 卡片宽, 名字)]"""
+        pad_x, _ = LIST_PLAYER_PADDING
+        layout = []
+        x, line = 0, 0
+        for player in players:
+            name = self._fit(str(player), LIST_PLAYER_SIZE, max_width - pad_x * 2 - LIST_AVATAR_SIZE - 7)
+            card_width = pad_x * 2 + LIST_AVATAR_SIZE + 7 + self._text_width(name, LIST_PLAYER_SIZE)
+            if x and x + card_width > max_width:
+                x, line = 0, line + 1
+            layout.append((x, line, card_width, name))
+            x += card_width + LIST_PLAYER_GAP
+        return layout
+
+    def _player_card_height(self) -> int:
+        return LIST_PLAYER_PADDING[1] * 2 + self._line_height(LIST_PLAYER_SIZE)
+
+    def _section_height(self, layout: list) -> int:
+        title = self._line_height(LIST_SECTION_SIZE) + LIST_SECTION_TITLE_MARGIN
+        if not layout:
+            return title + self._line_height(25)
+        lines = layout[-1][1] + 1
+        return title + lines * self._player_card_height() + (lines - 1) * LIST_PLAYER_GAP
+
+    def render_list(self, servers_data: dict, width: int, min_height: int,
+                    background_path: Optional[str], default_color: str) -> bytes:
+        """绘制在线玩家列表图（对应 list.html）"""
+        card_left = PAGE_PADDING
+        card_right = width - PAGE_PADDING
+        inner_width = card_right - card_left - LIST_CARD_PADDING * 2
+
+        sections_title = (("real_players", "玩家", ONLINE_COLOR, "没有玩家在线"),
+                          ("bot_players", "假人", BOT_COLOR, "没有假人在线"))
+        cards = []
+        for server_name, data in (servers_data or {}).items():
+            sections = []
+            for key, label, color, empty_text in sections_title:
+                players = data.get(key, [])
+                sections.append((f"{label} ({len(players)})", color, empty_text, self._layout_players(players, inner_width)))
+            card_height = (
+                LIST_CARD_PADDING * 2 + self._line_height(LIST_NAME_SIZE) + LIST_NAME_MARGIN
+                + sum(self._section_height(s[3]) for s in sections) + LIST_SECTION_MARGIN * len(sections)
+            )
+            cards.append((str(server_name), sections, card_height))
+
+        top = PAGE_PADDING + self._line_height(TITLE_SIZE) + TITLE_MARGIN
+        body_height = sum(c[2] + LIST_CARD_MARGIN for c in cards) if cards else self._line_height(25)
+        height = max(min_height, top + body_height + PAGE_PADDING)
+
+        canvas = self._background(width, height, background_path, default_color)
+        draw = ImageDraw.Draw(canvas)
+        self._centered_text(draw, 0, width, PAGE_PADDING, "Minecraft 在线玩家列表", TITLE_SIZE, TEXT_COLOR, bold=True)
+
+        if not cards:
+            self._centered_text(draw, 0, width, top, "暂无服务器数据", 25, MUTED_COLOR)
+            return self._to_png(canvas)
+
+        y = top
+        player_height = self._player_card_height()
+        for server_name, sections, card_height in cards:
+            self._card(canvas, (card_left, y, card_right, y + card_height), CARD_RADIUS, CARD_FILL, CARD_BORDER, CARD_BLUR)
+            draw = ImageDraw.Draw(canvas)
+            inner_left = card_left + LIST_CARD_PADDING
+            section_y = y + LIST_CARD_PADDING
+            self._centered_text(draw, inner_left, card_right - LIST_CARD_PADDING, section_y,
+                                server_name, LIST_NAME_SIZE, TEXT_COLOR, bold=True)
+            section_y += self._line_height(LIST_NAME_SIZE) + LIST_NAME_MARGIN
+
+            for title, color, empty_text, layout in sections:
+                self._text(draw, (inner_left + 14, section_y), title, LIST_SECTION_SIZE, color, bold=True, shadow=0)
+                list_y = section_y + self._line_height(LIST_SECTION_SIZE) + LIST_SECTION_TITLE_MARGIN
+                if not layout:
+                    self._centered_text(draw, inner_left, inner_left + inner_width, list_y, empty_text, 25, MUTED_COLOR)
+                for x, line, card_width, name in layout:
+                    px = inner_left + x
+                    py = list_y + line * (player_height + LIST_PLAYER_GAP)
+                    self._card(canvas, (px, py, px + card_width, py + player_height), 6,
+                               (255, 255, 255, 51), (255, 255, 255, 38), 0)
+                    draw = ImageDraw.Draw(canvas)
+                    pad_x, pad_y = LIST_PLAYER_PADDING
+                    avatar_y = py + (player_height - LIST_AVATAR_SIZE) // 2
+                    draw.rounded_rectangle((px + pad_x, avatar_y, px + pad_x + LIST_AVATAR_SIZE, avatar_y + LIST_AVATAR_SIZE),
+                                           radius=3, fill=(102, 102, 102, 255), outline=(255, 255, 255, 77))
+                    self._text(draw, (px + pad_x + LIST_AVATAR_SIZE + 7, py + pad_y), name, LIST_PLAYER_SIZE, TEXT_COLOR)
+                section_y += self._section_height(layout) + LIST_SECTION_MARGIN
+            y += card_height + LIST_CARD_MARGIN
+
+        return self._to_png(canvas)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Closed-form evaluator consistency check
+
+Replays a fixed-seed corpus of TNT-free flights for every pearl version and checks:
+
+    _find_best_hit_without_collisions (2D, via find_best_tick) against the previous
+    exhaustive per-tick scan: same tick, distance, position and motion, bit for bit,
+    including the earliest-tick tie-break;
+
+    evaluate_ticks against the iterative simulation (run) at every tick, within a
+    small relative tolerance (the iterative path accumulates rounding tick by tick).
+
+Run with:
+    python utils/pearl_calculator/analytic_check.py
+    python utils/pearl_calculator/analytic_check.py --flights 20000 --seed 7
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pearl_calculator_core import Space3D, PearlVersion
+from pearl_calculator_core.calculation.analytic import evaluate_ticks
+from pearl_calculator_core.calculation.inputs import GeneralData
+from pearl_calculator_core.calculation.simulation import (
+    SimResult, _ensure_no_collision_factors, _find_best_hit_without_collisions, run
+)
+from pearl_calculator_core.physics.constants.constants import FLOAT_PRECISION_EPSILON
+
+# evaluate_ticks 与逐 tick 模拟之间允许的相对误差
+TRAJECTORY_TOLERANCE = 1e-9
+# 与迭代模拟比较的 tick 上限，逐 tick 模拟较慢
+TRAJECTORY_TICKS = 300
+
+
+def exhaustive_best_hit(
+    data: GeneralData,
+    destination: Space3D,
+    ticks: List[int],
+    offset: Space3D,
+    version: PearlVersion,
+    max_distance_sq: float
+) -> Optional[SimResult]:
+    """find_best_tick 之前的实现：逐个计算所有 tick 的水平距离"""
+    pos, motion = data.pearl_position, data.pearl_motion
+    factors = _ensure_no_collision_factors(version, ticks[-1])
+    best_result: Optional[SimResult] = None
+    for tick in ticks:
+        pos_factor, vel_factor, grav_factor, vel_y_gravity = factors[tick]
+        cur_x = pos.x + (motion.x * pos_factor) + offset.x
+        cur_z = pos.z + (motion.z * pos_factor) + offset.z
+        cur_y = pos.y + (motion.y * pos_factor) - grav_factor + offset.y
+        dx = cur_x - destination.x
+        dz = cur_z - destination.z
+        dist_sq = dx * dx + dz * dz
+        if dist_sq > max_distance_sq:
+            continue
+        result = SimResult(
+            tick=tick,
+            position=Space3D(cur_x, cur_y, cur_z),
+            motion=Space3D(motion.x * vel_factor, (motion.y * vel_factor) - vel_y_gravity, motion.z * vel_factor),
+            distance=math.sqrt(dist_sq)
+        )
+        if best_result is None or result.distance < best_result.distance or (
+            abs(result.distance - best_result.distance) < FLOAT_PRECISION_EPSILON
+            and result.tick < best_result.tick
+        ):
+            best_result = result
+    return best_result
+
+
+def random_flight(rng: random.Random, version: PearlVersion):
+    """返回 (data, offset, destination, ticks, max_distance_sq)"""
+    position = Space3D(rng.uniform(-3e4, 3e4), rng.uniform(0.0, 300.0), rng.uniform(-3e4, 3e4))
+    offset = Space3D(rng.choice([0.0, 0.5, rng.uniform(-1.0, 1.0)]), 0.0, rng.choice([0.0, 0.5, rng.uniform(-1.0, 1.0)]))
+
+    kind = rng.random()
+    if kind < 0.05:
+        # 没有水平速度：所有 tick 距离相同，检查取最早 tick
+        motion = Space3D(0.0, rng.uniform(-1.0, 1.0), 0.0)
+    elif kind < 0.15:
+        # 沿坐标轴飞行
+        speed = rng.uniform(-80.0, 80.0)
+        motion = Space3D(speed, rng.uniform(-1.0, 1.0), 0.0) if rng.random() < 0.5 else Space3D(0.0, 0.0, speed)
+    else:
+        scale = 10 ** rng.uniform(-3, 2)
+        motion = Space3D(rng.uniform(-1.0, 1.0) * scale, rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0) * scale)
+
+    max_tick = rng.choice([10, 100, 1000, 10000])
+    if rng.random() < 0.5:
+        low = rng.randint(1, max_tick)
+        ticks = list(range(low, rng.randint(low, max_tick) + 1))
+    else:
+        ticks = sorted(rng.sample(range(1, max_tick + 1), rng.randint(1, min(max_tick, 200))))
+
+    aim = rng.random()
+    if aim < 0.6:
+        # 目标在轨迹附近
+        tick = rng.randint(1, ticks[-1])
+        _, landing, _ = evaluate_ticks(position, motion, [tick], version, offset)[0]
+        destination = Space3D(landing.x + rng.uniform(-30.0, 30.0), 0.0, landing.z + rng.uniform(-30.0, 30.0))
+    elif aim < 0.7:
+        # 目标恰好在某个 tick 的落点上
+        tick = rng.choice(ticks)
+        _, landing, _ = evaluate_ticks(position, motion, [tick], version, offset)[0]
+        destination = Space3D(landing.x, 0.0, landing.z)
+    else:
+        destination = Space3D(position.x + rng.uniform(-2e4, 2e4), 0.0, position.z + rng.uniform(-2e4, 2e4))
+
+    max_distance_sq = rng.choice([50.0 ** 2, 5.0 ** 2, 1e12])
+    return GeneralData(pearl_position=position, pearl_motion=motion, tnt_charges=[]), offset, destination, ticks, max_distance_sq
+
+
+def same_hit(a: Optional[SimResult], b: Optional[SimResult]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return (
+        a.tick == b.tick
+        and a.distance == b.distance
+        and (a.position.x, a.position.y, a.position.z) == (b.position.x, b.position.y, b.position.z)
+        and (a.motion.x, a.motion.y, a.motion.z) == (b.motion.x, b.motion.y, b.motion.z)
+    )
+
+
+def close(a: Space3D, b: Space3D) -> bool:
+    return all(
+        abs(x - y) <= TRAJECTORY_TOLERANCE * max(1.0, abs(x), abs(y))
+        for x, y in ((a.x, b.x), (a.y, b.y), (a.z, b.z))
+    )
+
+
+def check_trajectory(data: GeneralData, offset: Space3D, version: PearlVersion) -> bool:
+    simulated = run(data, None, TRAJECTORY_TICKS, [], offset, version)
+    states = evaluate_ticks(data.pearl_position, data.pearl_motion, range(len(simulated.pearl_trace)), version, offset)
+    return all(
+        close(position, simulated.pearl_trace[tick]) and close(motion, simulated.pearl_motion_trace[tick])
+        for tick, position, motion in states
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Closed-form evaluator consistency check")
+    parser.add_argument("--flights", type=int, default=3000, help="每个版本的随机飞行数量")
+    parser.add_argument("--trajectories", type=int, default=100, help="每个版本与逐 tick 模拟比较的飞行数量")
+    parser.add_argument("--seed", type=int, default=20240601, help="随机种子")
+    args = parser.parse_args()
+
+    print("=== 闭式求解一致性检查 ===")
+
+    failures = 0
+    for version in PearlVersion:
+        rng = random.Random(f"{args.seed}:{version.value}")
+        mismatched = 0
+        hits = 0
+        for i in range(args.flights):
+            data, offset, destination, ticks, max_distance_sq = random_flight(rng, version)
+            expected = exhaustive_best_hit(data, destination, ticks, offset, version, max_distance_sq)
+            actual = _find_best_hit_without_collisions(data, destination, ticks, offset, version, max_distance_sq, False)
+            hits += expected is not None
+            if not same_hit(actual, expected):
+                mismatched += 1
+                if mismatched <= 5:
+                    print(f"   不一致 {version.name} #{i}: position={data.pearl_position} motion={data.pearl_motion}")
+                    print(f"     destination={destination} ticks={ticks[0]}..{ticks[-1]} ({len(ticks)} 个)")
+                    print(f"     find_best_tick: {actual}")
+                    print(f"     逐 tick 比较:   {expected}")
+
+            if i < args.trajectories and not check_trajectory(data, offset, version):
+                mismatched += 1
+                print(f"   轨迹不一致 {version.name} #{i}: position={data.pearl_position} motion={data.pearl_motion}")
+
+        print(f"   {version.name:<10} {args.flights} 次飞行（{hits} 次命中），不一致 {mismatched}")
+        failures += mismatched
+
+    if failures:
+        print(f"\n   共 {failures} 处不一致")
+        return 1
+    print("\n   全部一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+CannonAtlas consistency check
+
+Compares CannonAtlas.query against the first result of calculate_tnt_amount (the
+one the plugin replies with) over a fixed target grid, for every pearl version and
+for both a limited and an unlimited max TNT. Every target must give the same
+direction, tick, red and blue amounts and distance, or fall back (None) exactly
+where the live search finds nothing.
+
+Run with:
+    python utils/pearl_calculator/atlas_check.py
+    python utils/pearl_calculator/atlas_check.py --radius 20000 --step 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pearl_calculator_core import Space3D, PearlVersion, calculate_tnt_amount
+from pearl_calculator_core.calculation.atlas import CannonAtlas
+from usage import load_config, create_cannon_from_config, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS
+
+# 固定的额外目标：曾经因为把格点截断到 [0, max_tnt] 而与实时求解不一致
+REGRESSION_TARGETS = [(7152, -8662), (-5662, 10120)]
+
+
+def build_targets(radius: int, step: int, samples: int, seed: int) -> list:
+    targets = list(REGRESSION_TARGETS)
+    targets.extend((x, z) for x in range(-radius, radius + 1, step) for z in range(-radius, radius + 1, step))
+    rng = random.Random(seed)
+    targets.extend((rng.randint(-radius, radius), rng.randint(-radius, radius)) for _ in range(samples))
+    return targets
+
+
+def describe(result) -> str:
+    if result is None:
+        return "None"
+    return f"{result.direction.name} tick={result.tick} red={result.red} blue={result.blue} distance={result.distance!r}"
+
+
+def same(atlas_result, live_result) -> bool:
+    if atlas_result is None or live_result is None:
+        return atlas_result is live_result
+    return (
+        atlas_result.direction == live_result.direction
+        and atlas_result.tick == live_result.tick
+        and atlas_result.red == live_result.red
+        and atlas_result.blue == live_result.blue
+        and atlas_result.distance == live_result.distance
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CannonAtlas consistency check")
+    parser.add_argument("--radius", type=int, default=12000, help="目标网格的半径（格）")
+    parser.add_argument("--step", type=int, default=4000, help="目标网格的间距（格）")
+    parser.add_argument("--samples", type=int, default=20, help="额外随机目标的数量")
+    parser.add_argument("--seed", type=int, default=20240601, help="随机目标的种子")
+    args = parser.parse_args()
+
+    print("=== CannonAtlas 一致性检查 ===")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    cannon, config_max_tnt = create_cannon_from_config(load_config(os.path.join(script_dir, 'config.example.json')))
+    if not CannonAtlas.supports(cannon):
+        print("   跳过：需要 numpy，且炮配置不能有垂直 TNT")
+        return 0
+
+    targets = build_targets(args.radius, args.step, args.samples, args.seed)
+    failures = 0
+    for version in PearlVersion:
+        for max_tnt in (config_max_tnt, 0):
+            atlas = CannonAtlas.build(cannon, max_tnt, MAX_SIMULATION_TICKS, version)
+            started = time.perf_counter()
+            mismatched = 0
+            for x, z in targets:
+                destination = Space3D(float(x), 0.0, float(z))
+                atlas_result = atlas.query(destination, SEARCH_TOLERANCE_BLOCKS)
+                live_results = calculate_tnt_amount(
+                    cannon, destination, max_tnt, None, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS, version
+                )
+                live_result = live_results[0] if live_results else None
+                if not same(atlas_result, live_result):
+                    mismatched += 1
+                    print(f"   不一致 {version.name} max_tnt={max_tnt} ({x}, {z})")
+                    print(f"     atlas: {describe(atlas_result)}")
+                    print(f"     live:  {describe(live_result)}")
+            elapsed = time.perf_counter() - started
+            print(f"   {version.name:<10} max_tnt={max_tnt:<6} {len(targets)} 个目标，不一致 {mismatched}（{elapsed:.1f} 秒）")
+            failures += mismatched
+
+    if failures:
+        print(f"\n   共 {failures} 个目标不一致")
+        return 1
+    print("\n   全部一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+PearlCalculatorCore benchmark suite
+
+Runs a fixed corpus (example cannon config, all pearl versions, a set of targets and
+collision worlds) through the hot paths of the core library:
+
+    calculate_tnt_amount, solve_theoretical_tnt, find_best_hit_for_ticks,
+    scan_trajectory, run
+
+and reports ops/sec, p50/p99 latency and peak allocation per operation.
+Results can be saved as a JSON baseline and compared against later runs.
+
+Run with:
+    python utils/pearl_calculator/benchmark.py                       # run and print
+    python utils/pearl_calculator/benchmark.py --save baseline.json  # store a baseline
+    python utils/pearl_calculator/benchmark.py --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pearl_calculator_core import Space3D, Direction, PearlVersion, AABBBox, calculate_tnt_amount
+from pearl_calculator_core.calculation.inputs import GeneralData, TNT
+from pearl_calculator_core.calculation.simulation import find_best_hit_for_ticks, scan_trajectory, run
+from pearl_calculator_core.calculation.solver import solve_theoretical_tnt
+from pearl_calculator_core.calculation.vectors import resolve_vectors_for_direction
+from usage import load_config, create_cannon_from_config, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS
+
+# 修改语料后需要递增，旧基线不再可比
+CORPUS_VERSION = 1
+
+TARGETS = [
+    Space3D(1500.0, 0.0, 1500.0),
+    Space3D(-3200.0, 0.0, 850.0),
+    Space3D(700.0, 0.0, -5400.0),
+    Space3D(10000.0, 0.0, 40000.0),
+]
+
+# 固定的 (red, blue) 组合，用于正向模拟类基准
+TNT_PAIRS = [(120, 340), (800, 95), (1500, 1500)]
+
+
+def build_worlds() -> Dict[str, List[AABBBox]]:
+    floor = AABBBox(-2000.0, 0.0, -2000.0, 2000.0, 30.0, 2000.0)
+    pillars = [
+        AABBBox(float(x), 30.0, float(z), x + 1.0, 60.0, z + 1.0)
+        for x in range(-64, 64, 8)
+        for z in range(-64, 64, 8)
+    ]
+    return {"empty": [], "floor_pillars": [floor] + pillars}
+
+
+def build_corpus(cannon, max_tnt) -> Dict[str, List[Callable[[], object]]]:
+    """返回 {基准名: [操作...]}，每个操作是一个无参函数"""
+    worlds = build_worlds()
+    start = cannon.pearl.position + cannon.pearl.offset
+    corpus: Dict[str, List[Callable[[], object]]] = {
+        "calculate_tnt_amount": [],
+        "solve_theoretical_tnt": [],
+        "find_best_hit_for_ticks": [],
+        "scan_trajectory": [],
+        "run": [],
+    }
+
+    for version in PearlVersion:
+        for target in TARGETS:
+            corpus["calculate_tnt_amount"].append(
+                lambda target=target, version=version: calculate_tnt_amount(
+                    cannon, target, max_tnt, None, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS, version
+                )
+            )
+
+        for direction in Direction:
+            red_vec, blue_vec, vert_vec = resolve_vectors_for_direction(cannon, direction)
+            for target in TARGETS[:2]:
+                corpus["solve_theoretical_tnt"].append(
+                    lambda red_vec=red_vec, blue_vec=blue_vec, vert_vec=vert_vec, target=target, version=version:
+                        solve_theoretical_tnt(red_vec, blue_vec, vert_vec, start, cannon.pearl.motion, target, MAX_SIMULATION_TICKS, version)
+                )
+
+            for red, blue in TNT_PAIRS:
+                motion = cannon.pearl.motion + (red_vec * red) + (blue_vec * blue)
+                data = GeneralData(pearl_position=cannon.pearl.position, pearl_motion=motion, tnt_charges=[])
+                destination = run(data, None, 40, [], cannon.pearl.offset, version).landing_position
+                ticks = list(range(30, 51))
+                corpus["find_best_hit_for_ticks"].append(
+                    lambda data=data, destination=destination, ticks=ticks, version=version: find_best_hit_for_ticks(
+                        data, destination, ticks, cannon.pearl.offset, version, SEARCH_TOLERANCE_BLOCKS ** 2, False
+                    )
+                )
+
+                charged = GeneralData(
+                    pearl_position=cannon.pearl.position,
+                    pearl_motion=cannon.pearl.motion,
+                    tnt_charges=[TNT(cannon.north_west_tnt, 0), TNT(cannon.south_east_tnt, 0)]
+                )
+                for world_name, world in worlds.items():
+                    ticks_to_run = 300 if world else MAX_SIMULATION_TICKS
+                    corpus["run"].append(
+                        lambda data=data, world=world, ticks_to_run=ticks_to_run, version=version:
+                            run(data, None, ticks_to_run, world, cannon.pearl.offset, version)
+                    )
+                    corpus["scan_trajectory"].append(
+                        lambda charged=charged, destination=destination, world=world, version=version: scan_trajectory(
+                            charged, destination, 300, [True] * 301, world, cannon.pearl.offset, version,
+                            SEARCH_TOLERANCE_BLOCKS ** 2, False
+                        )
+                    )
+
+    return corpus
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(operations: List[Callable[[], object]], repeat: int) -> dict:
+    # 预热一轮，排除导入和缓存构建的影响
+    for op in operations:
+        op()
+
+    latencies: List[float] = []
+    for _ in range(repeat):
+        for op in operations:
+            start = time.perf_counter()
+            op()
+            latencies.append(time.perf_counter() - start)
+
+    # 内存单独测量一轮，tracemalloc 会拖慢计时
+    peaks: List[int] = []
+    tracemalloc.start()
+    try:
+        for op in operations:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "alloc_peak_kb": (sum(peaks) / len(peaks) / 1024) if peaks else 0.0,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[Tuple[str, str, float, float]]:
+    """返回回归列表 (基准名, 指标, 基线值, 当前值)"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1.0 - threshold):
+            regressions.append((name, "ops_per_sec", base["ops_per_sec"], current["ops_per_sec"]))
+        for metric in ("p50_ms", "p99_ms", "alloc_peak_kb"):
+            if current[metric] > base[metric] * (1.0 + threshold):
+                regressions.append((name, metric, base[metric], current[metric]))
+    return regressions
+
+
+def print_table(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print(f"   {'benchmark':<26}{'ops':>6}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'alloc KB':>11}{'vs base':>10}")
+    print("   " + "-" * 85)
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{(r['ops_per_sec'] / base['ops_per_sec'] - 1.0) * 100:+.1f}%" if base and base["ops_per_sec"] else "-"
+        print(f"   {name:<26}{r['ops']:>6}{r['ops_per_sec']:>12.2f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['alloc_peak_kb']:>11.1f}{delta:>10}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PearlCalculatorCore benchmark suite")
+    parser.add_argument("--repeat", type=int, default=3, help="每个基准重复运行语料的轮数")
+    parser.add_argument("--filter", default="", help="只运行名字包含该字符串的基准")
+    parser.add_argument("--save", metavar="PATH", help="把结果保存为 JSON 基线")
+    parser.add_argument("--compare", metavar="PATH", help="与 JSON 基线比较，出现回归时返回 1")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回归的相对阈值，默认 0.10")
+    args = parser.parse_args()
+
+    print("=== PearlCalculator 核心基准测试 ===")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    cannon, max_tnt = create_cannon_from_config(load_config(os.path.join(script_dir, 'config.example.json')))
+    corpus = build_corpus(cannon, max_tnt)
+
+    baseline: Dict[str, dict] = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("corpus_version") != CORPUS_VERSION:
+            print(f"错误：基线语料版本 {data.get('corpus_version')} 与当前版本 {CORPUS_VERSION} 不一致")
+            return 2
+        baseline = data["results"]
+
+    results: Dict[str, dict] = {}
+    for name, operations in corpus.items():
+        if args.filter and args.filter not in name:
+            continue
+        print(f"   运行 {name}（{len(operations)} 个操作 x {args.repeat} 轮）...")
+        results[name] = measure(operations, args.repeat)
+
+    print()
+    print_table(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                "corpus_version": CORPUS_VERSION,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n   基线已保存到 {args.save}")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n   发现 {len(regressions)} 项回归（阈值 {args.threshold:.0%}）:")
+            for name, metric, base, current in regressions:
+                print(f"     {name}.{metric}: {base:.3f} -> {current:.3f}")
+            return 1
+        print(f"\n   没有超过 {args.threshold:.0%} 的回归")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
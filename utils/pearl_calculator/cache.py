@@ -0,0 +1,71 @@
+import copy
+import hashlib
+from typing import Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+
+from pearl_calculator_core import Cannon, PearlVersion
+
+DEFAULT_CACHE_SIZE = 128
+
+
+def hash_config(config_str: str) -> str:
+    """计算珍珠炮配置的哈希值"""
+    return hashlib.sha256((config_str or "").encode("utf-8")).hexdigest()
+
+
+class PearlResultCache:
+    """/zz 计算结果缓存
+
+    - 结果按 (配置哈希, 游戏版本, 目标 x, 目标 z) 缓存，LRU 淘汰，可选 TTL（秒）
+    - 解析后的 Cannon 按配置哈希缓存，避免每次重新解析 JSON
+    - 只在事件循环线程中访问，不需要加锁
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = None):
+        maxsize = max(1, maxsize)
+        if ttl:
+            self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        else:
+            self._results = LRUCache(maxsize=maxsize)
+        self._cannons = LRUCache(maxsize=4)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(config_hash: str, version: PearlVersion, target_x: int, target_z: int) -> tuple:
+        return config_hash, version.value, target_x, target_z
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """获取缓存结果，返回副本，未命中返回 None"""
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key: tuple, result: dict) -> None:
+        self._results[key] = copy.deepcopy(result)
+
+    def get_cannon(self, config_hash: str) -> Optional[Tuple[Cannon, int]]:
+        return self._cannons.get(config_hash)
+
+    def put_cannon(self, config_hash: str, cannon: Cannon, max_tnt: int) -> None:
+        self._cannons[config_hash] = (cannon, max_tnt)
+
+    def clear(self) -> None:
+        """清空缓存（配置变化时调用）"""
+        self._results.clear()
+        self._cannons.clear()
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._results),
+            "maxsize": self._results.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
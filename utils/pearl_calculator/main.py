@@ -19,12 +19,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pearl_calculator_core import (
     Space3D, Direction, PearlVersion, Cannon, Pearl, CannonMode, LayoutDirection,
-    calculate_tnt_amount, calculate_pearl_trace
+    calculate_tnt_amount, calculate_pearl_trace, SearchExecutor, CannonAtlas
 )
+from pearl_calculator_core.calculation.parallel import EXECUTOR_MODES
+from .cache import PearlResultCache, DEFAULT_CACHE_SIZE, hash_config
 
 MAX_SIMULATION_TICKS = 10000
 SEARCH_TOLERANCE_BLOCKS = 50.0
 MAX_TICK_LIMIT = 100  # Maximum tick limit for finding solutions
+ATLAS_DIR = './data/pearl_atlas'
 
 
 def load_config(config_str: str) -> dict:
@@ -92,6 +95,19 @@ def get_pearl_version(config_version: str):
     return "UNKNOWN"
 
 
+def create_search_executor(config: dict) -> SearchExecutor:
+    """根据插件配置创建珍珠炮计算执行器"""
+    mode = config.get('pearl_executor') or "thread"
+    if mode not in EXECUTOR_MODES:
+        print(f"Warning: 未知的珍珠炮执行器 {mode}，使用 thread")
+        mode = "thread"
+    try:
+        workers = int(config.get('pearl_workers') or 0)
+    except (TypeError, ValueError):
+        workers = 0
+    return SearchExecutor(mode=mode, max_workers=workers if workers > 0 else None)
+
+
 def process_bit_config(bit_config: str) -> list[int]:
     # 处理空值情况
     if not bit_config or bit_config.strip() == "":
@@ -142,38 +158,118 @@ def calculate_bit_encoding(value: int, bit_counts: list[int]) -> str:
 
     return ''.join(['1' if selected[i] else '0' for i in range(len(bit_counts))])
 
+# 影响 /zz 结果的插件配置项，任意一项变化都会清空结果缓存
+RESULT_CONFIG_KEYS = (
+    'pearl_config', 'pearl_version', 'red_bit_count', 'blue_bit_count',
+    'direction_bit', 'real_red_color', 'real_blue_color', 'enable_pearl_atlas',
+)
+
+
+def create_result_cache(config: dict) -> PearlResultCache:
+    """根据插件配置创建 /zz 结果缓存"""
+    try:
+        size = int(config.get('pearl_cache_size') or DEFAULT_CACHE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_CACHE_SIZE
+    try:
+        ttl = float(config.get('pearl_cache_ttl') or 0)
+    except (TypeError, ValueError):
+        ttl = 0
+    return PearlResultCache(maxsize=size, ttl=ttl if ttl > 0 else None)
+
+
+def load_or_build_atlas(cannon: Cannon, max_tnt: int, version: PearlVersion, config_hash: str):
+    """读取磁盘上的落点图集，不存在或已过期时重新生成并保存，不支持的炮返回 None"""
+    if not CannonAtlas.supports(cannon):
+        return None
+    fingerprint = f"{config_hash}:{max_tnt}:{MAX_SIMULATION_TICKS}"
+    path = os.path.join(ATLAS_DIR, f"{config_hash[:16]}_{version.value}.npz")
+    atlas = CannonAtlas.load(path, fingerprint)
+    if atlas is None:
+        atlas = CannonAtlas.build(cannon, max_tnt, MAX_SIMULATION_TICKS, version, fingerprint)
+        try:
+            os.makedirs(ATLAS_DIR, exist_ok=True)
+            atlas.save(path)
+        except OSError as e:
+            print(f"Warning: 落点图集保存失败 {e}")
+    return atlas
+
+
 class PearlCalculatorUtils:
     def __init__(self, config: dict):
+        self.plugin_config = config
+        self.executor = create_search_executor(config)
+        self.cache = create_result_cache(config)
+        self._config_fingerprint = None
+        self._refresh_config()
+
+    def _refresh_config(self):
+        """插件配置变化时重新读取配置并清空缓存"""
+        fingerprint = tuple(str(self.plugin_config.get(key)) for key in RESULT_CONFIG_KEYS)
+        if fingerprint == self._config_fingerprint:
+            return
+        config = self.plugin_config
         self.config = config.get('pearl_config')
+        self.config_hash = hash_config(self.config)
         self.pearl_version = get_pearl_version(config.get('pearl_version'))
         self.red_bit_count = process_bit_config(config.get('red_bit_count'))
         self.blue_bit_count = process_bit_config(config.get('blue_bit_count'))
         self.direction_dict = process_direction_bit(config.get('direction_bit'))
         self.real_red_color = config.get('real_red_color')
-        self.real_blue_color = config.get('real_red_color')
+        self.real_blue_color = config.get('real_blue_color')
+        self.enable_atlas = bool(config.get('enable_pearl_atlas'))
+        self.atlas = None
+        self.cache.clear()
+        self._config_fingerprint = fingerprint
 
     async def pearl_calculator(self, target_x: int, target_z: int) -> dict:
-        """
-
-        """
+        """计算珍珠炮落点（优先读取缓存，计算在事件循环之外执行，避免阻塞机器人）"""
+        self._refresh_config()
         # 校验珍珠版本
         if self.pearl_version == "UNKNOWN":
             return {"data": None, "msg": "游戏版本识别失败喵～"}
-        # 加载配置文件
-        pearl_config = load_config(self.config)
-        if pearl_config["msg"] != "success":
-            return {"data": None, "msg": pearl_config["msg"]}
-        pearl_config = pearl_config["data"]
-        cannon, max_tnt = create_cannon_from_config(pearl_config)
 
-        # 计算TNT当量
+        key = self.cache.make_key(self.config_hash, self.pearl_version, target_x, target_z)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 加载配置文件
+        cannon_entry = self.cache.get_cannon(self.config_hash)
+        if cannon_entry is None:
+            pearl_config = load_config(self.config)
+            if pearl_config["msg"] != "success":
+                return {"data": None, "msg": pearl_config["msg"]}
+            cannon_entry = create_cannon_from_config(pearl_config["data"])
+            self.cache.put_cannon(self.config_hash, *cannon_entry)
+        cannon, max_tnt = cannon_entry
+
+        if self.enable_atlas and self.atlas is None:
+            self.atlas = await self.executor.run(load_or_build_atlas, cannon, max_tnt, self.pearl_version, self.config_hash)
+
+        result = await self.executor.run(self._pearl_calculator, cannon, max_tnt, target_x, target_z)
+        self.cache.put(key, result)
+        return result
+
+    def cache_stats(self) -> dict:
+        """/zz 结果缓存命中统计"""
+        return self.cache.stats()
+
+    def close(self):
+        """关闭计算线程池/进程池"""
+        self.executor.shutdown()
+
+    def _pearl_calculator(self, cannon: Cannon, max_tnt: int, target_x: int, target_z: int) -> dict:
         destination = Space3D(target_x, 0.0, target_z)
-        results = calculate_tnt_amount(cannon, destination, max_tnt, None, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS, self.pearl_version,)
-        if not results:
-            return {"data": None, "msg": "算不出来喵呜˃̣̣̥᷄⌓˂̣̣̥᷅"}
+        # 优先查询落点图集，图集中没有足够近的落点时再实时计算TNT当量
+        best = self.atlas.query(destination, SEARCH_TOLERANCE_BLOCKS) if self.atlas is not None else None
+        if best is None:
+            results = self.executor.calculate_tnt_amount(cannon, destination, max_tnt, None, MAX_SIMULATION_TICKS, SEARCH_TOLERANCE_BLOCKS, self.pearl_version,)
+            if not results:
+                return {"data": None, "msg": "算不出来喵呜˃̣̣̥᷄⌓˂̣̣̥᷅"}
+            best = results[0]
 
         # 拼装基础响应数据
-        best = results[0]
         result = dict()
         result["redTNT"] = best.red
         result["blueTNT"] = best.blue
@@ -4,11 +4,16 @@ PearlCalculatorCore - Python port of PearlCalculatorRS core library
 A high-performance Minecraft vector pearl cannon calculator.
 """
 
-from .physics import Space3D, Direction, LayoutDirection, PearlVersion, AABBBox
+from .physics import Space3D, Trajectory, Direction, LayoutDirection, PearlVersion, AABBBox, CollisionIndex
 from .physics.constants.constants import *
-from .calculation import calculate_tnt_amount, calculate_pearl_trace, calculate_raw_trace
+from .calculation import (
+    calculate_tnt_amount, calculate_pearl_trace, calculate_raw_trace, iter_pearl_trace, iter_raw_trace,
+    stop_below, stop_within, stop_when_landed
+)
 from .calculation.inputs import Cannon, Pearl, GeneralData, TNT
-from .calculation.results import TNTResult, CalculationResult
+from .calculation.results import TNTResult, CalculationResult, TracePoint
+from .calculation.parallel import SearchExecutor
+from .calculation.atlas import CannonAtlas
 from .settings import CannonMode, CannonSettings
 from .api import (
     CalculationInput,
@@ -24,19 +29,29 @@ from .api import (
 __version__ = "2.2.0"
 __all__ = [
     "Space3D",
+    "Trajectory",
     "Direction",
     "LayoutDirection",
     "PearlVersion",
     "AABBBox",
+    "CollisionIndex",
     "calculate_tnt_amount",
     "calculate_pearl_trace",
     "calculate_raw_trace",
+    "iter_pearl_trace",
+    "iter_raw_trace",
+    "stop_below",
+    "stop_within",
+    "stop_when_landed",
     "Cannon",
     "Pearl",
     "GeneralData",
     "TNT",
     "TNTResult",
     "CalculationResult",
+    "TracePoint",
+    "SearchExecutor",
+    "CannonAtlas",
     "CannonMode",
     "CannonSettings",
     "CalculationInput",
@@ -12,6 +12,8 @@ from .calculation.trace import calculate_pearl_trace, calculate_raw_trace
 from .calculation.results import TNTResult, CalculationResult
 from .settings.types import CannonMode
 
+DEFAULT_TRACE_TICKS = 10000
+
 
 @dataclass
 class Space3DInput:
@@ -75,6 +77,7 @@ class PearlTraceInput:
     version: str
     vertical_tnt: Optional[Space3DInput]
     mode: Optional[str]
+    max_ticks: Optional[int] = None
 
 
 @dataclass
@@ -95,6 +98,7 @@ class RawTraceInput:
     pearl_motion_z: float
     tnt_groups: List[TntGroupInput]
     version: str
+    max_ticks: Optional[int] = None
 
 
 def parse_version(s: str) -> PearlVersion:
@@ -234,7 +238,7 @@ def calculate_pearl_trace_api(input: PearlTraceInput) -> Optional[CalculationRes
         input.red_tnt, input.blue_tnt,
         input.vertical_tnt_amount or 0,
         flight_direction,
-        10000,
+        input.max_ticks or DEFAULT_TRACE_TICKS,
         [],
         version
     )
@@ -250,5 +254,5 @@ def calculate_raw_trace_api(input: RawTraceInput) -> Optional[CalculationResult]
 
     return calculate_raw_trace(
         pearl_pos, pearl_motion, tnt_charges,
-        10000, [], version
+        input.max_ticks or DEFAULT_TRACE_TICKS, [], version
     )
\ No newline at end of file
@@ -1,4 +1,7 @@
 from .calculation import calculate_tnt_amount
-from .trace import calculate_pearl_trace, calculate_raw_trace
+from .trace import (
+    calculate_pearl_trace, calculate_raw_trace, iter_pearl_trace, iter_raw_trace,
+    stop_below, stop_within, stop_when_landed
+)
 from .inputs import Cannon, Pearl, GeneralData, TNT
-from .results import TNTResult, CalculationResult
\ No newline at end of file
+from .results import TNTResult, CalculationResult, TracePoint
\ No newline at end of file
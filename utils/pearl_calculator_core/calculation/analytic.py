@@ -0,0 +1,167 @@
+from __future__ import annotations
+import math
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+from ..physics.world.space import Space3D
+from ..physics.constants.constants import (
+    FLOAT_PRECISION_EPSILON, PEARL_DRAG_MULTIPLIER, PEARL_GRAVITY_ACCELERATION
+)
+from ..physics.entities.movement import PearlVersion
+
+# 距离误差上界的相对系数，远大于实际的舍入误差，只用于圈定需要逐个比较的 tick 窗口
+_DISTANCE_ERROR_FACTOR = 1e-9
+
+
+def no_collision_factors(version: PearlVersion, tick: int) -> Tuple[float, float, float, float]:
+    """返回无碰撞、无 TNT 飞行第 tick 刻的闭式系数
+
+    (pos_factor, vel_factor, grav_factor, vel_y_gravity)，满足:
+        position = start + motion * pos_factor - (0, grav_factor, 0)
+        motion_t = motion * vel_factor - (0, vel_y_gravity, 0)
+    """
+    drag = PEARL_DRAG_MULTIPLIER
+    gravity = PEARL_GRAVITY_ACCELERATION
+    one_minus_drag = 1.0 - drag
+
+    vel_factor = drag ** tick
+    geom_sum = (1.0 - vel_factor) / one_minus_drag
+    if version is PearlVersion.Post1212:
+        drag_gravity_factor = drag * gravity / one_minus_drag
+        pos_factor = drag * geom_sum
+        return (
+            pos_factor,
+            vel_factor,
+            drag_gravity_factor * (tick - pos_factor),
+            drag_gravity_factor * (1.0 - vel_factor)
+        )
+
+    gravity_factor = gravity / one_minus_drag
+    return (
+        geom_sum,
+        vel_factor,
+        gravity_factor * (tick - geom_sum),
+        gravity_factor * (1.0 - vel_factor)
+    )
+
+
+def evaluate_ticks(
+    position: Space3D,
+    motion: Space3D,
+    ticks: Iterable[int],
+    version: PearlVersion,
+    offset: Optional[Space3D] = None
+) -> List[Tuple[int, Space3D, Space3D]]:
+    """计算任意 tick 集合上的珍珠位置与速度，每个 tick 为 O(1)"""
+    off_x = offset.x if offset else 0.0
+    off_y = offset.y if offset else 0.0
+    off_z = offset.z if offset else 0.0
+
+    states: List[Tuple[int, Space3D, Space3D]] = []
+    for tick in ticks:
+        pos_factor, vel_factor, grav_factor, vel_y_gravity = no_collision_factors(version, tick)
+        states.append((
+            tick,
+            Space3D(
+                position.x + (motion.x * pos_factor) + off_x,
+                position.y + (motion.y * pos_factor) - grav_factor + off_y,
+                position.z + (motion.z * pos_factor) + off_z
+            ),
+            Space3D(
+                motion.x * vel_factor,
+                (motion.y * vel_factor) - vel_y_gravity,
+                motion.z * vel_factor
+            )
+        ))
+    return states
+
+
+def optimal_tick(motion: Space3D, start: Space3D, destination: Space3D, version: PearlVersion) -> float:
+    """水平距离最小的连续 tick（飞不到时返回 inf）"""
+    motion_sq = motion.x * motion.x + motion.z * motion.z
+    if motion_sq < FLOAT_PRECISION_EPSILON:
+        return 0.0
+
+    # 水平轨迹是沿 motion 方向的射线，位移 = motion * pos_factor(tick)
+    best_factor = ((destination.x - start.x) * motion.x + (destination.z - start.z) * motion.z) / motion_sq
+    if best_factor <= 0.0:
+        return 0.0
+
+    drag = PEARL_DRAG_MULTIPLIER
+    scale = drag if version is PearlVersion.Post1212 else 1.0
+    remaining = 1.0 - best_factor * (1.0 - drag) / scale
+    if remaining <= 0.0:
+        return math.inf
+    return math.log(remaining) / math.log(drag)
+
+
+def find_best_tick(
+    position: Space3D,
+    motion: Space3D,
+    destination: Space3D,
+    ticks: List[int],
+    offset: Space3D,
+    version: PearlVersion,
+    max_distance_sq: float
+) -> Optional[Tuple[int, float, float]]:
+    """在升序 ticks 中寻找水平距离最近的 tick，返回 (tick, dist_sq, distance)
+
+    先用连续最优解定位，再只逐个比较浮点误差范围内可能并列的 tick，
+    结果与逐个计算所有 tick 再取最小值（相同距离取更早 tick）完全一致。
+    """
+    if not ticks:
+        return None
+
+    start_x = position.x + offset.x
+    start_z = position.z + offset.z
+
+    def distance_at(tick: int) -> Tuple[float, float]:
+        pos_factor = no_collision_factors(version, tick)[0]
+        dx = position.x + (motion.x * pos_factor) + offset.x - destination.x
+        dz = position.z + (motion.z * pos_factor) + offset.z - destination.z
+        dist_sq = dx * dx + dz * dz
+        return dist_sq, math.sqrt(dist_sq)
+
+    target = optimal_tick(motion, Space3D(start_x, 0.0, start_z), destination, version)
+    centre = bisect_left(ticks, target) if math.isfinite(target) else len(ticks)
+    nearest = [i for i in (centre - 1, centre) if 0 <= i < len(ticks)]
+    reference = min(distance_at(ticks[i])[1] for i in nearest)
+
+    max_pos_factor = no_collision_factors(version, ticks[-1])[0]
+    magnitude = (
+        abs(position.x) + abs(position.z) + abs(offset.x) + abs(offset.z)
+        + abs(destination.x) + abs(destination.z)
+        + (abs(motion.x) + abs(motion.z)) * max_pos_factor
+    )
+    threshold = reference + 3.0 * _DISTANCE_ERROR_FACTOR * (1.0 + magnitude)
+
+    def is_close(index: int) -> bool:
+        return distance_at(ticks[index])[1] <= threshold
+
+    # 精确距离关于 tick 单峰，向两侧二分出可能并列最小值的窗口
+    low, high = 0, nearest[0]
+    while low < high:
+        mid = (low + high) // 2
+        if is_close(mid):
+            high = mid
+        else:
+            low = mid + 1
+    first = low
+
+    low, high = nearest[-1], len(ticks) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if is_close(mid):
+            low = mid
+        else:
+            high = mid - 1
+    last = low
+
+    best: Optional[Tuple[int, float, float]] = None
+    for index in range(first, last + 1):
+        tick = ticks[index]
+        dist_sq, distance = distance_at(tick)
+        if dist_sq > max_distance_sq:
+            continue
+        if best is None or distance < best[2]:
+            best = (tick, dist_sq, distance)
+    return best
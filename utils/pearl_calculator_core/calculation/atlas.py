@@ -0,0 +1,347 @@
+from __future__ import annotations
+import json
+import math
+import os
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # 没有 numpy 时不提供落点图集
+    np = None
+
+from ..physics.world.space import Space3D
+from ..physics.world.direction import Direction
+from ..physics.constants.constants import FLOAT_PRECISION_EPSILON, PEARL_DRAG_MULTIPLIER
+from ..physics.entities.movement import PearlVersion
+from ..settings.types import CannonMode
+from .inputs import Cannon
+from .results import TNTResult
+from .simulation import _ensure_no_collision_factors
+from .vectors import resolve_vectors_for_direction
+
+ATLAS_FORMAT_VERSION = 2
+
+# 与 plan_direction_search 的候选邻域半径一致
+LATTICE_SEARCH_RADIUS = 5
+# 每批展开的 tick 数，限制临时数组的内存占用
+QUERY_CHUNK_TICKS = 1024
+
+# 查询结果无法与实时求解保持一致，需要回退
+_FALLBACK = object()
+
+_DIRECTIONS = (Direction.North, Direction.South, Direction.East, Direction.West)
+
+
+class CannonAtlas:
+    """珍珠炮落点图集
+
+    对固定的炮配置，同一方向、同一 tick 的所有落点构成一个仿射格点:
+        position = start + (motion + red * R + blue * B) * pos_factor(tick) + offset
+    图集保存每个方向的 TNT 基向量 (R, B)、每个 tick 的闭式系数表和 solve_theoretical_tnt
+    的逐 tick 递推量，等价于枚举了全部 (red, blue, direction, tick) 落点，但只占用
+    O(max_ticks) 的空间。查询时按与实时求解相同的规则生成候选并批量计算距离，
+    不需要逐 tick 模拟。仅支持没有垂直 TNT 的二维炮。
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        version: PearlVersion,
+        max_tnt: int,
+        accumulation: bool,
+        pearl_position: Space3D,
+        pearl_motion: Space3D,
+        pearl_offset: Space3D,
+        vectors: "np.ndarray",
+        factors: "np.ndarray",
+        steps: "np.ndarray"
+    ):
+        self.fingerprint = fingerprint
+        self.version = version
+        self.max_tnt = max_tnt
+        self.accumulation = accumulation
+        self.pearl_position = pearl_position
+        self.pearl_motion = pearl_motion
+        self.pearl_offset = pearl_offset
+        # vectors: (方向, red/blue, xyz)；factors: (tick, 4)，与 no_collision_factors 一致
+        self.vectors = vectors
+        self.factors = factors
+        # steps: (tick, 3)，solve_theoretical_tnt 中的 (sim_motion_pos.x, sim_motion_pos.z, divider)
+        self.steps = steps
+
+    @property
+    def max_ticks(self) -> int:
+        return len(self.factors) - 1
+
+    @classmethod
+    def supports(cls, cannon: Cannon) -> bool:
+        return np is not None and cannon.vertical_tnt is None
+
+    @classmethod
+    def build(
+        cls,
+        cannon: Cannon,
+        max_tnt: int,
+        max_ticks: int,
+        version: PearlVersion,
+        fingerprint: str = ""
+    ) -> CannonAtlas:
+        if not cls.supports(cannon):
+            raise ValueError("Cannon atlas requires numpy and a cannon without vertical TNT")
+
+        vectors = np.zeros((len(_DIRECTIONS), 2, 3), dtype=np.float64)
+        for i, direction in enumerate(_DIRECTIONS):
+            red_vec, blue_vec, _ = resolve_vectors_for_direction(cannon, direction)
+            vectors[i, 0] = (red_vec.x, red_vec.y, red_vec.z)
+            vectors[i, 1] = (blue_vec.x, blue_vec.y, blue_vec.z)
+
+        factors = np.array(_ensure_no_collision_factors(version, max_ticks)[:max_ticks + 1], dtype=np.float64)
+        steps = _solver_steps(cannon.pearl.motion, max_ticks, version)
+
+        return cls(
+            fingerprint=fingerprint,
+            version=version,
+            max_tnt=max_tnt,
+            accumulation=cannon.mode == CannonMode.Accumulation,
+            pearl_position=cannon.pearl.position.copy(),
+            pearl_motion=cannon.pearl.motion.copy(),
+            pearl_offset=cannon.pearl.offset.copy(),
+            vectors=vectors,
+            factors=factors,
+            steps=steps
+        )
+
+    # ==================== 持久化 ====================
+
+    def save(self, path: str) -> None:
+        meta = {
+            "format": ATLAS_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "version": self.version.value,
+            "max_tnt": self.max_tnt,
+            "accumulation": self.accumulation,
+            "pearl": [
+                [self.pearl_position.x, self.pearl_position.y, self.pearl_position.z],
+                [self.pearl_motion.x, self.pearl_motion.y, self.pearl_motion.z],
+                [self.pearl_offset.x, self.pearl_offset.y, self.pearl_offset.z],
+            ],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), vectors=self.vectors, factors=self.factors, steps=self.steps)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None) -> Optional[CannonAtlas]:
+        """从磁盘加载图集，文件不存在、格式过期或指纹不一致时返回 None"""
+        if np is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"]
+                factors = data["factors"]
+                steps = data["steps"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if meta.get("format") != ATLAS_FORMAT_VERSION:
+            return None
+        if fingerprint is not None and meta.get("fingerprint") != fingerprint:
+            return None
+
+        position, motion, offset = (Space3D(*values) for values in meta["pearl"])
+        return cls(
+            fingerprint=meta["fingerprint"],
+            version=PearlVersion(meta["version"]),
+            max_tnt=meta["max_tnt"],
+            accumulation=meta["accumulation"],
+            pearl_position=position,
+            pearl_motion=motion,
+            pearl_offset=offset,
+            vectors=vectors,
+            factors=factors,
+            steps=steps
+        )
+
+    # ==================== 查询 ====================
+
+    def query(self, destination: Space3D, max_distance: float) -> Optional[TNTResult]:
+        """查询目标的落点，返回 calculate_tnt_amount 结果中的第一个
+
+        没有 max_distance 以内的落点、或者该配置下实时求解无法给出结果时返回 None（应回退到实时求解）。
+        候选与实时求解完全相同：每个 tick 的理论解四舍五入后取 LATTICE_SEARCH_RADIUS 邻域，
+        丢弃负数和超过 max_tnt 的组合（不截断到边界）；每个组合取距离最近的 tick（相同时取更早的），
+        再按飞行方向的顺序取 (tick, distance) 最小的组合。
+        """
+        start = self.pearl_position + self.pearl_offset
+        max_distance_sq = max_distance * max_distance
+        for direction in _flight_directions(start, destination):
+            hit = self._query_direction(direction, destination, max_distance_sq)
+            if hit is _FALLBACK:
+                return None
+            if hit is not None:
+                dist_sq, tick, red, blue = hit
+                return self._make_result(direction, tick, red, blue, math.sqrt(dist_sq))
+        return None
+
+    def _query_direction(self, direction: Direction, destination: Space3D, max_distance_sq: float):
+        vectors = self.vectors[_DIRECTIONS.index(direction)]
+        red_x, _, red_z = vectors[0].tolist()
+        blue_x, _, blue_z = vectors[1].tolist()
+
+        # 与 solve_theoretical_tnt 相同的运算，保证每个 tick 的中心逐位一致
+        denominator = red_z * blue_x - blue_z * red_x
+        if abs(denominator) < FLOAT_PRECISION_EPSILON:
+            return None
+        if blue_x == 0.0:
+            return _FALLBACK
+
+        start = self.pearl_position + self.pearl_offset
+        true_x = destination.x - start.x
+        true_z = destination.z - start.z
+        compensated_x = true_x - self.steps[1:, 0]
+        compensated_z = true_z - self.steps[1:, 1]
+        divider = self.steps[1:, 2]
+        true_red = (compensated_z * blue_x - compensated_x * blue_z) / denominator
+        true_blue = (compensated_x - true_red * red_x) / blue_x
+        # round() 与 np.rint 都是四舍六入五成双
+        center_red = np.rint(true_red / divider)
+        center_blue = np.rint(true_blue / divider)
+        if not (np.isfinite(center_red).all() and np.isfinite(center_blue).all()):
+            return _FALLBACK
+
+        span = np.arange(-LATTICE_SEARCH_RADIUS, LATTICE_SEARCH_RADIUS + 1, dtype=np.float64)
+        red_offsets, blue_offsets = (grid.ravel() for grid in np.meshgrid(span, span, indexing="ij"))
+        limited = self.max_tnt > 0 and not self.accumulation
+        position = self.pearl_position
+        motion = self.pearl_motion
+        offset = self.pearl_offset
+
+        hit_ticks, hit_red, hit_blue, hit_dist_sq = [], [], [], []
+        for first in range(0, len(divider), QUERY_CHUNK_TICKS):
+            rows = slice(first, first + QUERY_CHUNK_TICKS)
+            valid = (center_red[rows] >= 0) & (center_blue[rows] >= 0)
+            red = center_red[rows, None] + red_offsets
+            blue = center_blue[rows, None] + blue_offsets
+            # 与 generate_candidates 相同的过滤规则
+            keep = valid[:, None] & (red >= 0) & (blue >= 0)
+            if limited:
+                keep &= np.maximum(red, blue) <= self.max_tnt
+
+            # 与 validate_candidates_batch 相同的运算顺序
+            pos_factor = self.factors[first + 1:first + 1 + len(valid), 0, None]
+            motion_x = motion.x + (red_x * red) + (blue_x * blue)
+            motion_z = motion.z + (red_z * red) + (blue_z * blue)
+            dx = position.x + (motion_x * pos_factor) + offset.x - destination.x
+            dz = position.z + (motion_z * pos_factor) + offset.z - destination.z
+            dist_sq = dx * dx + dz * dz
+
+            row_index, col_index = np.nonzero(keep & (dist_sq <= max_distance_sq))
+            if row_index.size:
+                hit_ticks.append(row_index + first + 1)
+                hit_red.append(red[row_index, col_index])
+                hit_blue.append(blue[row_index, col_index])
+                hit_dist_sq.append(dist_sq[row_index, col_index])
+
+        if not hit_ticks:
+            return None
+        ticks = np.concatenate(hit_ticks)
+        red = np.concatenate(hit_red).astype(np.int64)
+        blue = np.concatenate(hit_blue).astype(np.int64)
+        dist_sq = np.concatenate(hit_dist_sq)
+        distance = np.sqrt(dist_sq)
+
+        # 每个组合取距离最近的 tick，距离相同时取更早的 tick
+        order = np.lexsort((ticks, distance, blue, red))
+        is_first = np.ones(order.size, dtype=bool)
+        is_first[1:] = (red[order][1:] != red[order][:-1]) | (blue[order][1:] != blue[order][:-1])
+        best = order[is_first]
+
+        # 再取 (tick, distance) 最小的组合；完全并列时按候选的生成顺序
+        order = np.lexsort((distance[best], ticks[best]))
+        winner = best[order[0]]
+        tied = best[(ticks[best] == ticks[winner]) & (distance[best] == distance[winner])]
+        if tied.size > 1:
+            ranks = [self._candidate_rank(center_red, center_blue, int(red[i]), int(blue[i])) for i in tied]
+            winner = tied[ranks.index(min(ranks))]
+        return (float(dist_sq[winner]), int(ticks[winner]), int(red[winner]), int(blue[winner]))
+
+    @staticmethod
+    def _candidate_rank(center_red: "np.ndarray", center_blue: "np.ndarray", red: int, blue: int) -> tuple:
+        """组合在 generate_candidates 输出中的位置：(所在中心首次出现的 tick, 邻域内的序号)"""
+        near = np.flatnonzero(
+            (center_red >= 0) & (center_blue >= 0)
+            & (np.abs(center_red - red) <= LATTICE_SEARCH_RADIUS)
+            & (np.abs(center_blue - blue) <= LATTICE_SEARCH_RADIUS)
+        )
+        # 最早包含该组合的中心，它首次出现的 tick 也最早
+        row = int(near[0])
+        first_row = int(np.flatnonzero((center_red == center_red[row]) & (center_blue == center_blue[row]))[0])
+        side = 2 * LATTICE_SEARCH_RADIUS + 1
+        red_offset = red - int(center_red[row]) + LATTICE_SEARCH_RADIUS
+        blue_offset = blue - int(center_blue[row]) + LATTICE_SEARCH_RADIUS
+        return (first_row, red_offset * side + blue_offset)
+
+    def _make_result(self, direction: Direction, tick: int, red: int, blue: int, distance: float) -> TNTResult:
+        vectors = self.vectors[_DIRECTIONS.index(direction)].tolist()
+        red_vec = Space3D(*vectors[0])
+        blue_vec = Space3D(*vectors[1])
+        pos_factor, vel_factor, grav_factor, vel_y_gravity = self.factors[tick].tolist()
+
+        position = self.pearl_position
+        offset = self.pearl_offset
+        motion_x = self.pearl_motion.x + (red_vec.x * red) + (blue_vec.x * blue)
+        motion_y = self.pearl_motion.y + (red_vec.y * red) + (blue_vec.y * blue)
+        motion_z = self.pearl_motion.z + (red_vec.z * red) + (blue_vec.z * blue)
+
+        end_pos = Space3D(
+            position.x + (motion_x * pos_factor) + offset.x,
+            position.y + (motion_y * pos_factor) - grav_factor + offset.y,
+            position.z + (motion_z * pos_factor) + offset.z
+        )
+        flight_x = end_pos.x - (position.x + offset.x)
+        flight_y = end_pos.y - (position.y + offset.y)
+        flight_z = end_pos.z - (position.z + offset.z)
+        h_dist = math.sqrt((flight_x * flight_x) + (flight_z * flight_z))
+
+        return TNTResult(
+            distance=distance,
+            tick=tick,
+            blue=blue,
+            red=red,
+            vertical=0,
+            yaw=math.atan2(-flight_x, flight_z) * 180.0 / math.pi,
+            pitch=math.atan2(-flight_y, h_dist) * 180.0 / math.pi,
+            total=red + blue,
+            pearl_end_pos=end_pos,
+            pearl_end_motion=Space3D(
+                motion_x * vel_factor,
+                (motion_y * vel_factor) - vel_y_gravity,
+                motion_z * vel_factor
+            ),
+            direction=direction
+        )
+
+
+def _solver_steps(motion: Space3D, max_ticks: int, version: PearlVersion) -> "np.ndarray":
+    """按 solve_theoretical_tnt 的递推计算每个 tick 的 (sim_motion_pos.x, sim_motion_pos.z, divider)"""
+    drag = PEARL_DRAG_MULTIPLIER
+    denominator_constant = 1.0 - drag
+    projection = version.get_projection_multiplier(drag)
+    steps = np.zeros((max_ticks + 1, 3), dtype=np.float64)
+    velocity_x, velocity_z = motion.x, motion.z
+    pos_x = pos_z = 0.0
+    for tick in range(1, max_ticks + 1):
+        velocity_x, dx = version.apply_motion_tick(velocity_x, drag)
+        velocity_z, dz = version.apply_motion_tick(velocity_z, drag)
+        pos_x += dx
+        pos_z += dz
+        steps[tick] = (pos_x, pos_z, projection * (1.0 - math.pow(drag, tick)) / denominator_constant)
+    return steps
+
+
+def _flight_directions(start: Space3D, destination: Space3D) -> List[Direction]:
+    if (destination - start).length_sq() < FLOAT_PRECISION_EPSILON:
+        return []
+    return Direction.from_angle_with_fallbacks(start.angle_to_yaw(destination))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+import math
+import threading
+from itertools import chain
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 不可用时回退到逐个候选的纯 Python 实现
+    np = None
+
+from ..physics.world.space import Space3D
+from ..physics.world.direction import Direction
+from ..physics.constants.constants import FLOAT_PRECISION_EPSILON
+from ..physics.entities.movement import PearlVersion
+from .results import TNTResult
+from .simulation import _ensure_no_collision_factors
+
+HAS_NUMPY = np is not None
+
+# 单批次最多展开的 (candidate, tick) 数量，限制临时数组的内存占用
+BATCH_MAX_PAIRS = 1 << 20
+
+_FACTOR_ARRAY_CACHE: Dict[PearlVersion, "np.ndarray"] = {}
+# 线程模式下多个分片会同时扩展缓存
+_FACTOR_ARRAY_LOCK = threading.Lock()
+
+
+def validate_candidates_batch(
+    candidates: List[Tuple[Tuple[int, int, int], List[int]]],
+    red_vec: Space3D,
+    blue_vec: Space3D,
+    vert_vec: Space3D,
+    pearl_position: Space3D,
+    pearl_motion: Space3D,
+    pearl_offset: Space3D,
+    destination: Space3D,
+    max_distance_sq: float,
+    version: PearlVersion,
+    calculation_direction: Direction
+) -> List[TNTResult]:
+    if np is None:
+        from .trace import validate_candidates
+        return validate_candidates(
+            candidates, red_vec, blue_vec, vert_vec,
+            pearl_position, pearl_motion, pearl_offset,
+            destination, max_distance_sq, version, calculation_direction
+        )
+
+    # Tick lists are expected in ascending order (as produced by generate_candidates),
+    # so "first minimum" here matches the tie-breaking of find_best_hit_for_ticks.
+    keys: List[Tuple[int, int, int]] = []
+    tick_lists: List[List[int]] = []
+    for key, ticks in candidates:
+        if ticks:
+            keys.append(key)
+            tick_lists.append(ticks)
+
+    if not keys:
+        return []
+
+    max_tick = max(ticks[-1] for ticks in tick_lists)
+    factors = _factor_array(version, max_tick)
+    check_3d = vert_vec.length_sq() > FLOAT_PRECISION_EPSILON
+
+    raw_results: List[TNTResult] = []
+    start = 0
+    while start < len(keys):
+        end = start
+        pairs = 0
+        while end < len(keys) and (end == start or pairs + len(tick_lists[end]) <= BATCH_MAX_PAIRS):
+            pairs += len(tick_lists[end])
+            end += 1
+
+        raw_results.extend(_validate_chunk(
+            keys[start:end], tick_lists[start:end], pairs, factors,
+            red_vec, blue_vec, vert_vec,
+            pearl_position, pearl_motion, pearl_offset,
+            destination, max_distance_sq, check_3d, calculation_direction
+        ))
+        start = end
+
+    return sorted(raw_results, key=lambda x: (x.tick, x.distance))
+
+
+def _factor_array(version: PearlVersion, max_tick: int) -> "np.ndarray":
+    cached = _FACTOR_ARRAY_CACHE.get(version)
+    if cached is not None and max_tick < len(cached):
+        return cached
+    with _FACTOR_ARRAY_LOCK:
+        cached = _FACTOR_ARRAY_CACHE.get(version)
+        if cached is not None and max_tick < len(cached):
+            return cached
+        factors = np.array(_ensure_no_collision_factors(version, max_tick), dtype=np.float64)
+        _FACTOR_ARRAY_CACHE[version] = factors
+        return factors
+
+
+def _validate_chunk(
+    keys: List[Tuple[int, int, int]],
+    tick_lists: List[List[int]],
+    pair_count: int,
+    factors: "np.ndarray",
+    red_vec: Space3D,
+    blue_vec: Space3D,
+    vert_vec: Space3D,
+    pearl_position: Space3D,
+    pearl_motion: Space3D,
+    pearl_offset: Space3D,
+    destination: Space3D,
+    max_distance_sq: float,
+    check_3d: bool,
+    calculation_direction: Direction
+) -> List[TNTResult]:
+    counts = np.fromiter((len(ticks) for ticks in tick_lists), dtype=np.int64, count=len(tick_lists))
+    ticks = np.fromiter(chain.from_iterable(tick_lists), dtype=np.int64, count=pair_count)
+    owner = np.repeat(np.arange(len(keys), dtype=np.int64), counts)
+
+    amounts = np.array(keys, dtype=np.float64)
+    r = amounts[:, 0]
+    b = amounts[:, 1]
+    v = amounts[:, 2]
+
+    # 与 validate_candidates 保持相同的运算顺序，保证逐位一致
+    motion_x = pearl_motion.x + (red_vec.x * r) + (blue_vec.x * b) + (vert_vec.x * v)
+    motion_y = pearl_motion.y + (red_vec.y * r) + (blue_vec.y * b) + (vert_vec.y * v)
+    motion_z = pearl_motion.z + (red_vec.z * r) + (blue_vec.z * b) + (vert_vec.z * v)
+
+    tick_factors = factors[ticks]
+    pos_factor = tick_factors[:, 0]
+
+    cur_x = pearl_position.x + (motion_x[owner] * pos_factor) + pearl_offset.x
+    cur_z = pearl_position.z + (motion_z[owner] * pos_factor) + pearl_offset.z
+    cur_y = pearl_position.y + (motion_y[owner] * pos_factor) - tick_factors[:, 2] + pearl_offset.y
+
+    dx = cur_x - destination.x
+    dz = cur_z - destination.z
+    if check_3d:
+        dy = cur_y - destination.y
+        dist_sq = dx * dx + dy * dy + dz * dz
+    else:
+        dist_sq = dx * dx + dz * dz
+
+    hit_index = np.nonzero(dist_sq <= max_distance_sq)[0]
+    if hit_index.size == 0:
+        return []
+
+    hit_owner = owner[hit_index]
+    hit_distance = np.sqrt(dist_sq[hit_index])
+
+    # 每个候选取距离最小的命中，距离相同时取更早的 tick
+    order = np.lexsort((hit_index, hit_distance, hit_owner))
+    sorted_owner = hit_owner[order]
+    is_first = np.ones(sorted_owner.size, dtype=bool)
+    is_first[1:] = sorted_owner[1:] != sorted_owner[:-1]
+    best = order[is_first]
+
+    start_abs_x = pearl_position.x + pearl_offset.x
+    start_abs_y = pearl_position.y + pearl_offset.y
+    start_abs_z = pearl_position.z + pearl_offset.z
+
+    results: List[TNTResult] = []
+    for i in best.tolist():
+        pair = int(hit_index[i])
+        candidate = int(hit_owner[i])
+        r_u32, b_u32, v_u32 = keys[candidate]
+        _, vel_factor, _, vel_y_gravity = factors[ticks[pair]].tolist()
+        mx = float(motion_x[candidate])
+        my = float(motion_y[candidate])
+        mz = float(motion_z[candidate])
+
+        position = Space3D(float(cur_x[pair]), float(cur_y[pair]), float(cur_z[pair]))
+        flight_x = position.x - start_abs_x
+        flight_y = position.y - start_abs_y
+        flight_z = position.z - start_abs_z
+        h_dist = math.sqrt((flight_x * flight_x) + (flight_z * flight_z))
+        yaw = math.atan2(-flight_x, flight_z) * 180.0 / math.pi
+        pitch = math.atan2(-flight_y, h_dist) * 180.0 / math.pi
+
+        results.append(TNTResult(
+            distance=float(hit_distance[i]),
+            tick=int(ticks[pair]),
+            blue=b_u32,
+            red=r_u32,
+            vertical=v_u32,
+            total=r_u32 + b_u32 + v_u32,
+            pearl_end_pos=position,
+            pearl_end_motion=Space3D(
+                mx * vel_factor,
+                (my * vel_factor) - vel_y_gravity,
+                mz * vel_factor
+            ),
+            direction=calculation_direction,
+            yaw=yaw,
+            pitch=pitch
+        ))
+
+    return results
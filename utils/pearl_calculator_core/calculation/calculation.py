@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from ..physics.world.space import Space3D
 from ..physics.world.direction import Direction
 from ..physics.constants.constants import FLOAT_PRECISION_EPSILON
@@ -9,9 +10,19 @@ from .results import TNTResult
 from .solver import solve_theoretical_tnt
 from .optimizer import generate_candidates, SearchParams
 from .trace import validate_candidates
+from .batch import validate_candidates_batch, HAS_NUMPY
 from .vectors import resolve_vectors_for_direction
 
 
+@dataclass
+class DirectionSearch:
+    direction: Direction
+    red_vec: Space3D
+    blue_vec: Space3D
+    vert_vec: Space3D
+    candidates: List[Tuple[Tuple[int, int, int], List[int]]]
+
+
 def calculate_tnt_amount(
     cannon: Cannon,
     destination: Space3D,
@@ -19,8 +30,46 @@ def calculate_tnt_amount(
     max_vertical_tnt: Optional[int],
     max_ticks: int,
     max_distance: float,
-    version: PearlVersion
+    version: PearlVersion,
+    backend: str = "auto"
 ) -> List[TNTResult]:
+    validate = resolve_backend(backend)
+    max_distance_sq = max_distance * max_distance
+    all_results: List[TNTResult] = []
+
+    for search in plan_direction_searches(cannon, destination, max_tnt, max_vertical_tnt, max_ticks, version):
+        results = validate(
+            search.candidates,
+            search.red_vec, search.blue_vec, search.vert_vec,
+            cannon.pearl.position,
+            cannon.pearl.motion,
+            cannon.pearl.offset,
+            destination,
+            max_distance_sq,
+            version,
+            search.direction
+        )
+
+        all_results.extend(results)
+
+    return all_results
+
+
+def plan_direction_searches(
+    cannon: Cannon,
+    destination: Space3D,
+    max_tnt: int,
+    max_vertical_tnt: Optional[int],
+    max_ticks: int,
+    version: PearlVersion
+) -> List[DirectionSearch]:
+    return [
+        plan_direction_search(cannon, destination, flight_direction, max_tnt, max_vertical_tnt, max_ticks, version)
+        for flight_direction in resolve_flight_directions(cannon, destination)
+    ]
+
+
+def resolve_flight_directions(cannon: Cannon, destination: Space3D) -> List[Direction]:
     pearl_start_absolute_pos = cannon.pearl.position + cannon.pearl.offset
     true_distance = destination - pearl_start_absolute_pos
 
@@ -28,48 +77,57 @@ def calculate_tnt_amount(
         return []
 
     yaw = pearl_start_absolute_pos.angle_to_yaw(destination)
-    flight_directions = Direction.from_angle_with_fallbacks(yaw)
-
-    max_distance_sq = max_distance * max_distance
-    all_results: List[TNTResult] = []
+    return Direction.from_angle_with_fallbacks(yaw)
 
-    for flight_direction in flight_directions:
-        red_vec, blue_vec, vert_vec = resolve_vectors_for_direction(cannon, flight_direction)
 
-        theoretical_groups = solve_theoretical_tnt(
-            red_vec, blue_vec, vert_vec,
-            pearl_start_absolute_pos,
-            cannon.pearl.motion,
-            destination,
-            max_ticks,
-            version
-        )
+def plan_direction_search(
+    cannon: Cannon,
+    destination: Space3D,
+    flight_direction: Direction,
+    max_tnt: int,
+    max_vertical_tnt: Optional[int],
+    max_ticks: int,
+    version: PearlVersion
+) -> DirectionSearch:
+    pearl_start_absolute_pos = cannon.pearl.position + cannon.pearl.offset
+    red_vec, blue_vec, vert_vec = resolve_vectors_for_direction(cannon, flight_direction)
 
-        is_valid_3d = vert_vec.length_sq() > FLOAT_PRECISION_EPSILON
+    theoretical_groups = solve_theoretical_tnt(
+        red_vec, blue_vec, vert_vec,
+        pearl_start_absolute_pos,
+        cannon.pearl.motion,
+        destination,
+        max_ticks,
+        version
+    )
 
-        search_params = SearchParams(
-            max_tnt=max_tnt,
-            max_vertical_tnt=max_vertical_tnt,
-            search_radius=5,
-            has_vertical=cannon.vertical_tnt is not None,
-            is_valid_3d=is_valid_3d,
-            cannon_mode=cannon.mode
-        )
+    is_valid_3d = vert_vec.length_sq() > FLOAT_PRECISION_EPSILON
 
-        candidates = generate_candidates(theoretical_groups, search_params)
+    search_params = SearchParams(
+        max_tnt=max_tnt,
+        max_vertical_tnt=max_vertical_tnt,
+        search_radius=5,
+        has_vertical=cannon.vertical_tnt is not None,
+        is_valid_3d=is_valid_3d,
+        cannon_mode=cannon.mode
+    )
 
-        results = validate_candidates(
-            candidates,
-            red_vec, blue_vec, vert_vec,
-            cannon.pearl.position,
-            cannon.pearl.motion,
-            cannon.pearl.offset,
-            destination,
-            max_distance_sq,
-            version,
-            flight_direction
-        )
+    return DirectionSearch(
+        direction=flight_direction,
+        red_vec=red_vec,
+        blue_vec=blue_vec,
+        vert_vec=vert_vec,
+        candidates=generate_candidates(theoretical_groups, search_params)
+    )
 
-        all_results.extend(results)
 
-    return all_results
\ No newline at end of file
+def resolve_backend(backend: str):
+    if backend == "python":
+        return validate_candidates
+    if backend == "numpy":
+        if not HAS_NUMPY:
+            raise ValueError("numpy backend requested but numpy is not installed")
+        return validate_candidates_batch
+    if backend == "auto":
+        return validate_candidates_batch if HAS_NUMPY else validate_candidates
+    raise ValueError(f"Invalid validation backend: {backend}")
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Tuple, TypeVar
+from ..physics.world.space import Space3D
+from ..physics.world.direction import Direction
+from ..physics.entities.movement import PearlVersion
+from .inputs import Cannon
+from .results import TNTResult
+from .calculation import plan_direction_search, resolve_backend, resolve_flight_directions
+
+T = TypeVar("T")
+
+EXECUTOR_MODES = ("none", "thread", "process")
+DEFAULT_SHARD_SIZE = 2048
+
+
+class SearchExecutor:
+    """calculate_tnt_amount 的并行执行层
+
+    各飞行方向的候选生成并行执行，每个方向的候选集再切分成分片交给线程池或进程池验证，
+    最后按方向顺序归并结果。每个方向内的结果仍按 (tick, distance) 稳定排序，与串行版本一致。
+    mode 为 "none" 时在调用线程内串行执行。
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Invalid executor mode: {mode}")
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self.mode == "none":
+            return None
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pearl-search")
+        return self._pool
+
+    def calculate_tnt_amount(
+        self,
+        cannon: Cannon,
+        destination: Space3D,
+        max_tnt: int,
+        max_vertical_tnt: Optional[int],
+        max_ticks: int,
+        max_distance: float,
+        version: PearlVersion,
+        backend: str = "auto"
+    ) -> List[TNTResult]:
+        resolve_backend(backend)
+        max_distance_sq = max_distance * max_distance
+        pool = self._get_pool()
+
+        plans = [
+            partial(plan_direction_search, cannon, destination, flight_direction, max_tnt, max_vertical_tnt, max_ticks, version)
+            for flight_direction in resolve_flight_directions(cannon, destination)
+        ]
+        if pool is None:
+            searches = [plan() for plan in plans]
+        else:
+            searches = [future.result() for future in [pool.submit(plan) for plan in plans]]
+
+        pending: List[List[Future]] = []
+        shard_results: List[List[List[TNTResult]]] = []
+        for search in searches:
+            shards = [
+                search.candidates[i:i + self.shard_size]
+                for i in range(0, len(search.candidates), self.shard_size)
+            ]
+            jobs = [
+                partial(
+                    _validate_shard,
+                    backend, shard,
+                    search.red_vec, search.blue_vec, search.vert_vec,
+                    cannon.pearl.position, cannon.pearl.motion, cannon.pearl.offset,
+                    destination, max_distance_sq, version, search.direction
+                )
+                for shard in shards
+            ]
+            if pool is None:
+                shard_results.append([job() for job in jobs])
+            else:
+                pending.append([pool.submit(job) for job in jobs])
+
+        if pool is not None:
+            shard_results = [[future.result() for future in futures] for futures in pending]
+
+        all_results: List[TNTResult] = []
+        for results in shard_results:
+            # 分片按候选顺序排列，heapq.merge 对相同 key 保持输入顺序，等价于整体稳定排序
+            all_results.extend(heapq.merge(*results, key=lambda x: (x.tick, x.distance)))
+        return all_results
+
+    async def calculate_tnt_amount_async(self, *args, **kwargs) -> List[TNTResult]:
+        """在后台线程中编排计算，避免阻塞事件循环"""
+        return await self.run(self.calculate_tnt_amount, *args, **kwargs)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """在事件循环之外执行任意同步函数"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _validate_shard(
+    backend: str,
+    candidates: List[Tuple[Tuple[int, int, int], List[int]]],
+    red_vec: Space3D,
+    blue_vec: Space3D,
+    vert_vec: Space3D,
+    pearl_position: Space3D,
+    pearl_motion: Space3D,
+    pearl_offset: Space3D,
+    destination: Space3D,
+    max_distance_sq: float,
+    version: PearlVersion,
+    calculation_direction: Direction
+) -> List[TNTResult]:
+    validate = resolve_backend(backend)
+    return validate(
+        candidates, red_vec, blue_vec, vert_vec,
+        pearl_position, pearl_motion, pearl_offset,
+        destination, max_distance_sq, version, calculation_direction
+    )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List
+from typing import NamedTuple
 from ..physics.world.space import Space3D
+from ..physics.world.trajectory import Trajectory
 from ..physics.world.direction import Direction
 
 
@@ -23,9 +24,15 @@ class TNTResult:
 @dataclass
 class CalculationResult:
     landing_position: Space3D
-    pearl_trace: List[Space3D]
-    pearl_motion_trace: List[Space3D]
+    pearl_trace: Trajectory
+    pearl_motion_trace: Trajectory
     is_successful: bool
     tick: int
     final_motion: Space3D
-    distance: float
\ No newline at end of file
+    distance: float
+
+
+class TracePoint(NamedTuple):
+    tick: int
+    position: Space3D
+    motion: Space3D
@@ -1,9 +1,12 @@
 from __future__ import annotations
 import math
-from typing import List, Optional, Tuple
+import threading
+from typing import Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from ..physics.world.space import Space3D
+from ..physics.world.trajectory import Trajectory
 from ..physics.aabb.aabb_box import AABBBox
+from ..physics.aabb.collision_index import CollisionIndex
 from ..physics.constants.constants import (
     FLOAT_PRECISION_EPSILON, PEARL_EXPLOSION_Y_FACTOR, PEARL_HEIGHT,
     TNT_ENTITY_Y_OFFSET, TNT_EXPLOSION_RADIUS, PEARL_DRAG_MULTIPLIER,
@@ -14,6 +17,11 @@ from ..physics.entities.pearl_entities import PearlEntity
 from ..physics.entities.tnt_entities import TNTEntity
 from .inputs import GeneralData
 from .results import CalculationResult
+from .analytic import no_collision_factors, find_best_tick
+
+
+# (tick, x, y, z, motion_x, motion_y, motion_z)
+RawTick = Tuple[int, float, float, float, float, float, float]
 
 
 @dataclass
@@ -30,6 +38,7 @@ _MOVEMENT_MAP = {
     PearlVersion.Post1212: MovementPost1212,
 }
 
+_NO_COLLISION_FACTOR_LOCK = threading.Lock()
 _NO_COLLISION_FACTOR_CACHE: dict[PearlVersion, list[tuple[float, float, float, float]]] = {
     PearlVersion.Legacy: [(0.0, 1.0, 0.0, 0.0)],
     PearlVersion.Post1205: [(0.0, 1.0, 0.0, 0.0)],
@@ -49,34 +58,45 @@ def run(
     return run_internal(movement, data, destination, max_ticks, world_collisions, offset)
 
 
-def run_internal(
-    movement,
+def iter_run(
     data: GeneralData,
-    destination: Optional[Space3D],
     max_ticks: int,
     world_collisions: List[AABBBox],
-    offset: Optional[Space3D]
-) -> Optional[CalculationResult]:
-    if not world_collisions:
-        return _run_without_collisions(data, destination, max_ticks, offset, movement is MovementPost1212)
+    version: PearlVersion
+) -> Iterator[RawTick]:
+    """Lazily simulate the pearl, yielding (tick, x, y, z, motion_x, motion_y, motion_z) from tick 0.
 
-    pearl = PearlEntity.create(data.pearl_position, data.pearl_motion)
-    tnt_entities = [TNTEntity.create(tnt.position, tnt.fuse) for tnt in data.tnt_charges]
+    Positions do not include the cannon offset. Stop iterating to stop simulating.
+    """
+    return iter_run_internal(_MOVEMENT_MAP[version], data, max_ticks, world_collisions)
 
-    traces: List[Space3D] = [pearl.data.position.copy()]
-    motion_traces: List[Space3D] = [pearl.data.motion.copy()]
 
-    for tick in range(max_ticks):
-        for tnt in tnt_entities:
-            if tnt.fuse == tick:
-                pearl.data.motion += calculate_tnt_motion(pearl.data.position, tnt.data.position)
+def iter_run_internal(
+    movement,
+    data: GeneralData,
+    max_ticks: int,
+    world_collisions: List[AABBBox]
+) -> Iterator[RawTick]:
+    if not world_collisions:
+        return _iter_without_collisions(data, max_ticks, movement is MovementPost1212)
+    return _iter_with_collisions(movement, data, max_ticks, world_collisions)
 
-        movement.run_tick_sequence(pearl, world_collisions)
 
-        traces.append(pearl.data.position.copy())
-        motion_traces.append(pearl.data.motion.copy())
+def run_internal(
+    movement,
+    data: GeneralData,
+    destination: Optional[Space3D],
+    max_ticks: int,
+    world_collisions: List[AABBBox],
+    offset: Optional[Space3D]
+) -> Optional[CalculationResult]:
+    traces = Trajectory()
+    motion_traces = Trajectory()
+    for _, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z in iter_run_internal(movement, data, max_ticks, world_collisions):
+        traces.append_xyz(pos_x, pos_y, pos_z)
+        motion_traces.append_xyz(motion_x, motion_y, motion_z)
 
-    final_landing_pos = pearl.data.position
+    final_landing_pos = Space3D(pos_x, pos_y, pos_z)
 
     distance_to_dest = 0.0
     is_success = False
@@ -84,12 +104,12 @@ def run_internal(
         distance_to_dest = final_landing_pos.distance_2d(destination)
         is_success = distance_to_dest <= 0.25
 
-    final_traces = _deduplicate(traces)
-    final_motion_traces = _deduplicate(motion_traces)
+    final_traces = traces.deduplicated()
+    final_motion_traces = motion_traces.deduplicated()
 
     if offset:
         final_landing_pos = final_landing_pos + offset
-        final_traces = [pos + offset for pos in final_traces]
+        final_traces = final_traces.translated(offset)
 
     return CalculationResult(
         landing_position=final_landing_pos,
@@ -97,11 +117,37 @@ def run_internal(
         pearl_motion_trace=final_motion_traces,
         is_successful=is_success,
         tick=max_ticks,
-        final_motion=pearl.data.motion,
+        final_motion=Space3D(motion_x, motion_y, motion_z),
         distance=distance_to_dest
     )
 
 
+def _iter_with_collisions(
+    movement,
+    data: GeneralData,
+    max_ticks: int,
+    world_collisions: List[AABBBox]
+) -> Iterator[RawTick]:
+    world = CollisionIndex.of(world_collisions)
+    pearl = PearlEntity.create(data.pearl_position, data.pearl_motion)
+    tnt_entities = [TNTEntity.create(tnt.position, tnt.fuse) for tnt in data.tnt_charges]
+    position = pearl.data.position
+    motion = pearl.data.motion
+
+    yield 0, position.x, position.y, position.z, motion.x, motion.y, motion.z
+
+    for tick in range(max_ticks):
+        for tnt in tnt_entities:
+            if tnt.fuse == tick:
+                pearl.data.motion += calculate_tnt_motion(pearl.data.position, tnt.data.position)
+
+        movement.run_tick_sequence(pearl, world)
+
+        position = pearl.data.position
+        motion = pearl.data.motion
+        yield tick + 1, position.x, position.y, position.z, motion.x, motion.y, motion.z
+
+
 def scan_trajectory(
     data: GeneralData,
     destination: Space3D,
@@ -169,6 +215,7 @@ def scan_internal(
         )
 
     results: List[SimResult] = []
+    world = CollisionIndex.of(world_collisions)
     pearl = PearlEntity.create(data.pearl_position, data.pearl_motion)
     tnt_entities = [TNTEntity.create(tnt.position, tnt.fuse) for tnt in data.tnt_charges]
 
@@ -177,7 +224,7 @@ def scan_internal(
             if tnt.fuse == tick - 1:
                 pearl.data.motion += calculate_tnt_motion(pearl.data.position, tnt.data.position)
 
-        movement.run_tick_sequence(pearl, world_collisions)
+        movement.run_tick_sequence(pearl, world)
 
         current_pos = pearl.data.position + offset
 
@@ -198,36 +245,29 @@ def scan_internal(
 
 
 def calculate_tnt_motion(pearl_pos: Space3D, tnt_pos: Space3D) -> Space3D:
-    tnt_pos_adjusted = Space3D(tnt_pos.x, tnt_pos.y + TNT_ENTITY_Y_OFFSET, tnt_pos.z)
+    tnt_y = tnt_pos.y + TNT_ENTITY_Y_OFFSET
 
-    distance_vec = pearl_pos - tnt_pos_adjusted
-    distance_scalar = distance_vec.length()
+    distance_x = pearl_pos.x - tnt_pos.x
+    distance_y = pearl_pos.y - tnt_y
+    distance_z = pearl_pos.z - tnt_pos.z
+    distance_scalar = math.sqrt(distance_x ** 2 + distance_y ** 2 + distance_z ** 2)
 
     if distance_scalar >= TNT_EXPLOSION_RADIUS:
         return Space3D()
 
-    explosion_vec = Space3D(
-        distance_vec.x,
-        pearl_pos.y + (PEARL_EXPLOSION_Y_FACTOR * PEARL_HEIGHT) - tnt_pos_adjusted.y,
-        distance_vec.z
-    )
+    explosion_y = pearl_pos.y + (PEARL_EXPLOSION_Y_FACTOR * PEARL_HEIGHT) - tnt_y
 
-    explosion_vec_len = explosion_vec.length()
+    explosion_vec_len = math.sqrt(distance_x ** 2 + explosion_y ** 2 + distance_z ** 2)
     if abs(explosion_vec_len) < FLOAT_PRECISION_EPSILON:
         return Space3D()
 
-    explosion_vec = explosion_vec / explosion_vec_len
     explosion_strength = 1.0 - (distance_scalar / TNT_EXPLOSION_RADIUS)
 
-    return explosion_vec * explosion_strength
-
-
-def _deduplicate(lst: List[Space3D]) -> List[Space3D]:
-    result: List[Space3D] = []
-    for item in lst:
-        if not result or item != result[-1]:
-            result.append(item)
-    return result
+    return Space3D(
+        (distance_x / explosion_vec_len) * explosion_strength,
+        (explosion_y / explosion_vec_len) * explosion_strength,
+        (distance_z / explosion_vec_len) * explosion_strength
+    )
 
 
 def _advance_motion(x: float, y: float, z: float, post1212: bool) -> Tuple[float, float, float, float, float, float]:
@@ -272,13 +312,11 @@ def _apply_tnt_charges(
     return motion_x, motion_y, motion_z
 
 
-def _run_without_collisions(
+def _iter_without_collisions(
     data: GeneralData,
-    destination: Optional[Space3D],
     max_ticks: int,
-    offset: Optional[Space3D],
     post1212: bool
-) -> CalculationResult:
+) -> Iterator[RawTick]:
     pos_x = data.pearl_position.x
     pos_y = data.pearl_position.y
     pos_z = data.pearl_position.z
@@ -286,29 +324,27 @@ def _run_without_collisions(
     motion_y = data.pearl_motion.y
     motion_z = data.pearl_motion.z
 
-    traces: List[Space3D] = [Space3D(pos_x, pos_y, pos_z)]
-    motion_traces: List[Space3D] = [Space3D(motion_x, motion_y, motion_z)]
+    yield 0, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z
+
     if not data.tnt_charges:
         if post1212:
-            for _ in range(max_ticks):
+            for tick in range(1, max_ticks + 1):
                 motion_y = (motion_y - PEARL_GRAVITY_ACCELERATION) * PEARL_DRAG_MULTIPLIER
                 motion_x *= PEARL_DRAG_MULTIPLIER
                 motion_z *= PEARL_DRAG_MULTIPLIER
                 pos_x += motion_x
                 pos_y += motion_y
                 pos_z += motion_z
-                traces.append(Space3D(pos_x, pos_y, pos_z))
-                motion_traces.append(Space3D(motion_x, motion_y, motion_z))
+                yield tick, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z
         else:
-            for _ in range(max_ticks):
+            for tick in range(1, max_ticks + 1):
                 pos_x += motion_x
                 pos_y += motion_y
                 pos_z += motion_z
                 motion_x *= PEARL_DRAG_MULTIPLIER
                 motion_y = (motion_y * PEARL_DRAG_MULTIPLIER) - PEARL_GRAVITY_ACCELERATION
                 motion_z *= PEARL_DRAG_MULTIPLIER
-                traces.append(Space3D(pos_x, pos_y, pos_z))
-                motion_traces.append(Space3D(motion_x, motion_y, motion_z))
+                yield tick, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z
     else:
         charges_by_tick = _group_tnt_charges(data.tnt_charges)
         for tick in range(max_ticks):
@@ -321,37 +357,7 @@ def _run_without_collisions(
             pos_x += dx
             pos_y += dy
             pos_z += dz
-            traces.append(Space3D(pos_x, pos_y, pos_z))
-            motion_traces.append(Space3D(motion_x, motion_y, motion_z))
-
-    final_landing_pos = Space3D(pos_x, pos_y, pos_z)
-    distance_to_dest = 0.0
-    is_success = False
-    if destination:
-        dx = pos_x - destination.x
-        dz = pos_z - destination.z
-        distance_to_dest = math.sqrt(dx * dx + dz * dz)
-        is_success = distance_to_dest <= 0.25
-
-    final_traces = _deduplicate(traces)
-    final_motion_traces = _deduplicate(motion_traces)
-
-    if offset:
-        ox = offset.x
-        oy = offset.y
-        oz = offset.z
-        final_landing_pos = Space3D(pos_x + ox, pos_y + oy, pos_z + oz)
-        final_traces = [Space3D(pos.x + ox, pos.y + oy, pos.z + oz) for pos in final_traces]
-
-    return CalculationResult(
-        landing_position=final_landing_pos,
-        pearl_trace=final_traces,
-        pearl_motion_trace=final_motion_traces,
-        is_successful=is_success,
-        tick=max_ticks,
-        final_motion=Space3D(motion_x, motion_y, motion_z),
-        distance=distance_to_dest
-    )
+            yield tick + 1, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z
 
 
 def _scan_without_collisions(
@@ -503,11 +509,35 @@ def _find_best_hit_without_collisions(
     dest_y = destination.y
     dest_z = destination.z
 
+    if not check_3d:
+        best_tick = find_best_tick(
+            data.pearl_position, data.pearl_motion, destination, ticks,
+            offset, version, max_distance_sq
+        )
+        if best_tick is None:
+            return None
+        tick, _, distance = best_tick
+        pos_factor, vel_factor, grav_factor, vel_y_gravity = no_collision_factors(version, tick)
+        return SimResult(
+            tick=tick,
+            position=Space3D(
+                pos_x + (motion_x * pos_factor) + off_x,
+                pos_y + (motion_y * pos_factor) - grav_factor + off_y,
+                pos_z + (motion_z * pos_factor) + off_z
+            ),
+            motion=Space3D(
+                motion_x * vel_factor,
+                (motion_y * vel_factor) - vel_y_gravity,
+                motion_z * vel_factor
+            ),
+            distance=distance
+        )
+
     best_result: Optional[SimResult] = None
-    no_collision_factors = _ensure_no_collision_factors(version, ticks[-1])
+    factors = _ensure_no_collision_factors(version, ticks[-1])
 
     for tick in ticks:
-        pos_factor, vel_factor, grav_factor, vel_y_gravity = no_collision_factors[tick]
+        pos_factor, vel_factor, grav_factor, vel_y_gravity = factors[tick]
 
         cur_x = pos_x + (motion_x * pos_factor) + off_x
         cur_z = pos_z + (motion_z * pos_factor) + off_z
@@ -552,34 +582,10 @@ def _ensure_no_collision_factors(
     if tick < len(cache):
         return cache
 
-    drag = PEARL_DRAG_MULTIPLIER
-    gravity = PEARL_GRAVITY_ACCELERATION
-    one_minus_drag = 1.0 - drag
-
-    if version is PearlVersion.Post1212:
-        drag_gravity_factor = drag * gravity / one_minus_drag
-        while len(cache) <= tick:
-            current_tick = len(cache)
-            vel_factor = drag ** current_tick
-            geom_sum = (1.0 - vel_factor) / one_minus_drag
-            pos_factor = drag * geom_sum
-            cache.append((
-                pos_factor,
-                vel_factor,
-                drag_gravity_factor * (current_tick - pos_factor),
-                drag_gravity_factor * (1.0 - vel_factor)
-            ))
-    else:
-        gravity_factor = gravity / one_minus_drag
+    # 线程模式下同一次搜索的多个分片会同时扩展缓存，必须加锁，
+    # 否则两个线程读到相同的 len(cache) 后各追加一次，之后的每一项都会错位一个 tick
+    with _NO_COLLISION_FACTOR_LOCK:
         while len(cache) <= tick:
-            current_tick = len(cache)
-            vel_factor = drag ** current_tick
-            geom_sum = (1.0 - vel_factor) / one_minus_drag
-            cache.append((
-                geom_sum,
-                vel_factor,
-                gravity_factor * (current_tick - geom_sum),
-                gravity_factor * (1.0 - vel_factor)
-            ))
+            cache.append(no_collision_factors(version, len(cache)))
 
     return cache
@@ -38,6 +38,7 @@ def solve_theoretical_tnt(
 
     sim_motion_vel = start_motion.copy()
     sim_motion_pos = Space3D()
+    compensated_distance = Space3D()
 
     for tick in range(1, max_ticks + 1):
         sim_grav_vel = version.apply_grav_drag_tick(sim_grav_vel, gravity, drag_multiplier)
@@ -46,13 +47,13 @@ def solve_theoretical_tnt(
         new_vx, dx = version.apply_motion_tick(sim_motion_vel.x, drag_multiplier)
         new_vy, dy = version.apply_motion_tick(sim_motion_vel.y, drag_multiplier)
         new_vz, dz = version.apply_motion_tick(sim_motion_vel.z, drag_multiplier)
-        sim_motion_vel = Space3D(new_vx, new_vy, new_vz)
-        sim_motion_pos += Space3D(dx, dy, dz)
+        sim_motion_vel.set(new_vx, new_vy, new_vz)
+        sim_motion_pos.x += dx
+        sim_motion_pos.y += dy
+        sim_motion_pos.z += dz
 
-        compensated_distance = true_distance.copy()
-        compensated_distance.y -= sim_grav_pos + sim_motion_pos.y
-        compensated_distance.x -= sim_motion_pos.x
-        compensated_distance.z -= sim_motion_pos.z
+        true_distance.sub_into(sim_motion_pos, compensated_distance)
+        compensated_distance.y = true_distance.y - (sim_grav_pos + sim_motion_pos.y)
 
         numerator = 1.0 - math.pow(drag_multiplier, tick)
         divider = version.get_projection_multiplier(drag_multiplier) * numerator / denominator_constant
@@ -1,13 +1,13 @@
 import math
-from typing import List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 from ..physics.world.space import Space3D
 from ..physics.world.direction import Direction
 from ..physics.aabb.aabb_box import AABBBox
 from ..physics.constants.constants import FLOAT_PRECISION_EPSILON
 from ..physics.entities.movement import PearlVersion
 from .inputs import Cannon, GeneralData
-from .results import TNTResult, CalculationResult
-from .simulation import find_best_hit_for_ticks, run
+from .results import TNTResult, CalculationResult, TracePoint
+from .simulation import find_best_hit_for_ticks, run, iter_run, calculate_tnt_motion
 from .vectors import resolve_vectors_for_direction
 
 
@@ -99,14 +99,9 @@ def calculate_pearl_trace(
     world_collisions: List[AABBBox],
     version: PearlVersion
 ) -> Optional[CalculationResult]:
-    red_vec, blue_vec, vert_vec = resolve_vectors_for_direction(cannon, direction)
-    
-    total_tnt_motion = (red_vec * red_tnt) + (blue_vec * blue_tnt) + (vert_vec * vertical_tnt)
-    final_motion = cannon.pearl.motion + total_tnt_motion
-
     return run_trace_internal(
         cannon.pearl.position,
-        final_motion,
+        _pearl_trace_motion(cannon, red_tnt, blue_tnt, vertical_tnt, direction),
         cannon.pearl.offset,
         max_ticks,
         world_collisions,
@@ -122,16 +117,9 @@ def calculate_raw_trace(
     world_collisions: List[AABBBox],
     version: PearlVersion
 ) -> Optional[CalculationResult]:
-    from .simulation import calculate_tnt_motion
-
-    total_explosion_motion = Space3D()
-    for tnt_pos, count in tnt_charges:
-        if count > 0:
-            total_explosion_motion += calculate_tnt_motion(pearl_position, tnt_pos) * count
-
     return run_trace_internal(
         pearl_position,
-        pearl_motion + total_explosion_motion,
+        pearl_motion + _raw_explosion_motion(pearl_position, tnt_charges),
         None,
         max_ticks,
         world_collisions,
@@ -139,6 +127,14 @@ def calculate_raw_trace(
     )
 
 
+def _raw_explosion_motion(pearl_position: Space3D, tnt_charges: List[Tuple[Space3D, int]]) -> Space3D:
+    total_explosion_motion = Space3D()
+    for tnt_pos, count in tnt_charges:
+        if count > 0:
+            total_explosion_motion += calculate_tnt_motion(pearl_position, tnt_pos) * count
+    return total_explosion_motion
+
+
 def run_trace_internal(
     position: Space3D,
     motion: Space3D,
@@ -154,3 +150,134 @@ def run_trace_internal(
     )
 
     return run(data, None, max_ticks, world_collisions, offset, version)
+
+
+def _pearl_trace_motion(cannon: Cannon, red_tnt: int, blue_tnt: int, vertical_tnt: int, direction: Direction) -> Space3D:
+    red_vec, blue_vec, vert_vec = resolve_vectors_for_direction(cannon, direction)
+
+    total_tnt_motion = (red_vec * red_tnt) + (blue_vec * blue_tnt) + (vert_vec * vertical_tnt)
+    return cannon.pearl.motion + total_tnt_motion
+
+
+# ==================== Streaming traces ====================
+
+StopPredicate = Callable[[TracePoint], bool]
+
+
+def iter_pearl_trace(
+    cannon: Cannon,
+    red_tnt: int,
+    blue_tnt: int,
+    vertical_tnt: int,
+    direction: Direction,
+    max_ticks: int,
+    world_collisions: List[AABBBox],
+    version: PearlVersion,
+    stop: Optional[StopPredicate] = None,
+    every: int = 1
+) -> Iterator[TracePoint]:
+    """Lazy counterpart of calculate_pearl_trace, yielding one TracePoint per tick from tick 0"""
+    return iter_trace_internal(
+        cannon.pearl.position,
+        _pearl_trace_motion(cannon, red_tnt, blue_tnt, vertical_tnt, direction),
+        cannon.pearl.offset,
+        max_ticks,
+        world_collisions,
+        version,
+        stop,
+        every
+    )
+
+
+def iter_raw_trace(
+    pearl_position: Space3D,
+    pearl_motion: Space3D,
+    tnt_charges: List[Tuple[Space3D, int]],
+    max_ticks: int,
+    world_collisions: List[AABBBox],
+    version: PearlVersion,
+    stop: Optional[StopPredicate] = None,
+    every: int = 1
+) -> Iterator[TracePoint]:
+    """Lazy counterpart of calculate_raw_trace, yielding one TracePoint per tick from tick 0"""
+    return iter_trace_internal(
+        pearl_position,
+        pearl_motion + _raw_explosion_motion(pearl_position, tnt_charges),
+        None,
+        max_ticks,
+        world_collisions,
+        version,
+        stop,
+        every
+    )
+
+
+def iter_trace_internal(
+    position: Space3D,
+    motion: Space3D,
+    offset: Optional[Space3D],
+    max_ticks: int,
+    world_collisions: List[AABBBox],
+    version: PearlVersion,
+    stop: Optional[StopPredicate] = None,
+    every: int = 1
+) -> Iterator[TracePoint]:
+    """Simulate tick by tick, only as far as the consumer iterates.
+
+    Positions include the cannon offset. When `stop` returns True the point is yielded and
+    the simulation ends. With `every` > 1 only every n-th tick is yielded, plus the stopping
+    tick and the last tick.
+    """
+    if every < 1:
+        raise ValueError("every must be at least 1")
+
+    data = GeneralData(
+        pearl_position=position,
+        pearl_motion=motion,
+        tnt_charges=[]
+    )
+    off_x, off_y, off_z = (offset.x, offset.y, offset.z) if offset else (0.0, 0.0, 0.0)
+
+    for tick, pos_x, pos_y, pos_z, motion_x, motion_y, motion_z in iter_run(data, max_ticks, world_collisions, version):
+        point = TracePoint(
+            tick,
+            Space3D(pos_x + off_x, pos_y + off_y, pos_z + off_z) if offset else Space3D(pos_x, pos_y, pos_z),
+            Space3D(motion_x, motion_y, motion_z)
+        )
+        if stop is not None and stop(point):
+            yield point
+            return
+        if tick % every == 0 or tick == max_ticks:
+            yield point
+
+
+def stop_below(y: float) -> StopPredicate:
+    """Stop once the pearl falls below the given height"""
+    return lambda point: point.position.y < y
+
+
+def stop_within(destination: Space3D, max_distance: float, check_3d: bool = False) -> StopPredicate:
+    """Stop once the pearl is within max_distance of the destination"""
+    max_distance_sq = max_distance * max_distance
+    if check_3d:
+        return lambda point: point.position.distance_sq(destination) <= max_distance_sq
+    return lambda point: point.position.distance_2d_sq(destination) <= max_distance_sq
+
+
+def stop_when_landed() -> StopPredicate:
+    """Stop once the pearl was falling and its height stopped changing (blocked by a collision box)"""
+    state = {"y": None, "falling": False}
+
+    def landed(point: TracePoint) -> bool:
+        last_y = state["y"]
+        y = point.position.y
+        if last_y is None:
+            state["y"] = y
+            return False
+        if y == last_y:
+            return state["falling"]
+        state["y"] = y
+        state["falling"] = y < last_y
+        return False
+
+    return landed
@@ -1,6 +1,8 @@
 from .constants.constants import *
 from .world.space import Space3D
+from .world.trajectory import Trajectory
 from .world.direction import Direction
 from .world.layout_direction import LayoutDirection
 from .entities.movement import PearlVersion
-from .aabb.aabb_box import AABBBox
\ No newline at end of file
+from .aabb.aabb_box import AABBBox
+from .aabb.collision_index import CollisionIndex
\ No newline at end of file
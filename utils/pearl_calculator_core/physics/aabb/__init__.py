@@ -1 +1,2 @@
-from .aabb_box import AABBBox
\ No newline at end of file
+from .aabb_box import AABBBox
+from .collision_index import CollisionIndex
\ No newline at end of file
@@ -29,6 +29,16 @@ class AABBBox:
             self.max_z + z
         )
 
+    def expand_towards(self, x: float, y: float, z: float) -> AABBBox:
+        return AABBBox(
+            self.min_x + x if x < 0.0 else self.min_x,
+            self.min_y + y if y < 0.0 else self.min_y,
+            self.min_z + z if z < 0.0 else self.min_z,
+            self.max_x + x if x > 0.0 else self.max_x,
+            self.max_y + y if y > 0.0 else self.max_y,
+            self.max_z + z if z > 0.0 else self.max_z
+        )
+
     def y_offset(self, other: AABBBox, offset_y: float) -> float:
         if other.max_x <= self.min_x or other.min_x >= self.max_x:
             return offset_y
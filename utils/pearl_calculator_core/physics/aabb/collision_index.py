@@ -0,0 +1,93 @@
+from __future__ import annotations
+import math
+from typing import Dict, Iterable, List, Tuple, Union
+from .aabb_box import AABBBox
+
+DEFAULT_CELL_SIZE: float = 4.0
+# Boxes covering more cells than this are kept in a separate list and returned by every query
+LARGE_BOX_CELLS: int = 64
+# Query boxes are widened slightly so that rounding in the narrow phase can never drop a box
+QUERY_MARGIN: float = 1e-7
+
+
+class CollisionIndex:
+    """Uniform voxel grid over static world collision boxes.
+
+    `query` returns every box whose closed range intersects the given box, in the
+    original list order, so the narrow phase in `EntityData.move_entity` sees a
+    superset of the boxes that can clip the movement and produces identical offsets.
+    """
+
+    def __init__(self, boxes: Iterable[AABBBox], cell_size: float = DEFAULT_CELL_SIZE):
+        if cell_size <= 0.0:
+            raise ValueError("cell_size must be positive")
+        self.boxes: List[AABBBox] = list(boxes)
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self._large: List[int] = []
+
+        for index, box in enumerate(self.boxes):
+            lo, hi = self._cell_range(box, 0.0)
+            cells = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+            if cells > LARGE_BOX_CELLS:
+                self._large.append(index)
+                continue
+            for ix in range(lo[0], hi[0] + 1):
+                for iy in range(lo[1], hi[1] + 1):
+                    for iz in range(lo[2], hi[2] + 1):
+                        self._cells.setdefault((ix, iy, iz), []).append(index)
+
+    @classmethod
+    def of(cls, world_collisions: Union[CollisionIndex, List[AABBBox]]) -> CollisionIndex:
+        if isinstance(world_collisions, CollisionIndex):
+            return world_collisions
+        return cls(world_collisions)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __bool__(self) -> bool:
+        return bool(self.boxes)
+
+    def _cell_range(self, box: AABBBox, margin: float) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+        size = self.cell_size
+        lo = (
+            math.floor((box.min_x - margin) / size),
+            math.floor((box.min_y - margin) / size),
+            math.floor((box.min_z - margin) / size),
+        )
+        hi = (
+            math.floor((box.max_x + margin) / size),
+            math.floor((box.max_y + margin) / size),
+            math.floor((box.max_z + margin) / size),
+        )
+        return lo, hi
+
+    def query(self, box: AABBBox) -> List[AABBBox]:
+        lo, hi = self._cell_range(box, QUERY_MARGIN)
+        cells = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if cells >= len(self.boxes):
+            return self.boxes
+
+        found = set(self._large)
+        grid = self._cells
+        for ix in range(lo[0], hi[0] + 1):
+            for iy in range(lo[1], hi[1] + 1):
+                for iz in range(lo[2], hi[2] + 1):
+                    bucket = grid.get((ix, iy, iz))
+                    if bucket:
+                        found.update(bucket)
+
+        boxes = self.boxes
+        min_x = box.min_x - QUERY_MARGIN
+        min_y = box.min_y - QUERY_MARGIN
+        min_z = box.min_z - QUERY_MARGIN
+        max_x = box.max_x + QUERY_MARGIN
+        max_y = box.max_y + QUERY_MARGIN
+        max_z = box.max_z + QUERY_MARGIN
+        return [
+            boxes[i] for i in sorted(found)
+            if boxes[i].max_x >= min_x and boxes[i].min_x <= max_x
+            and boxes[i].max_y >= min_y and boxes[i].min_y <= max_y
+            and boxes[i].max_z >= min_z and boxes[i].min_z <= max_z
+        ]
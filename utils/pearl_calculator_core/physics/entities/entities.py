@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Union
 from ..world.space import Space3D
 from ..aabb.aabb_box import AABBBox
+from ..aabb.collision_index import CollisionIndex
 
 
 @dataclass
@@ -15,12 +16,16 @@ class EntityData:
     is_collided_vertically: bool = False
     is_gravity: bool = False
 
-    def move_entity(self, xa: float, ya: float, za: float, world_collisions: List[AABBBox]) -> None:
+    def move_entity(self, xa: float, ya: float, za: float, world_collisions: Union[CollisionIndex, List[AABBBox]]) -> None:
         original_xa = xa
         original_ya = ya
         original_za = za
 
         bb = self.bounding_box
+        if isinstance(world_collisions, CollisionIndex):
+            # Broad phase: only boxes touching the swept bounding box can clip this tick's movement
+            world_collisions = world_collisions.query(bb.expand_towards(xa, ya, za))
+
         for aabb in world_collisions:
             ya = aabb.y_offset(bb, ya)
         bb = bb.offset(0.0, ya, 0.0)
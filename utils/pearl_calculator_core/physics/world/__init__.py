@@ -1,3 +1,4 @@
 from .space import Space3D
 from .direction import Direction
-from .layout_direction import LayoutDirection
\ No newline at end of file
+from .layout_direction import LayoutDirection
+from .trajectory import Trajectory
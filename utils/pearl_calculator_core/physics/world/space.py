@@ -3,7 +3,7 @@ import math
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Space3D:
     x: float = 0.0
     y: float = 0.0
@@ -27,6 +27,12 @@ class Space3D:
         self.z += other.z
         return self
 
+    def __isub__(self, other: Space3D) -> Space3D:
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
+
     def __imul__(self, scalar: float) -> Space3D:
         self.x *= scalar
         self.y *= scalar
@@ -39,6 +45,34 @@ class Space3D:
         self.z /= scalar
         return self
 
+    # In-place fused operations, used on hot paths to avoid allocating temporaries
+
+    def set(self, x: float, y: float, z: float) -> Space3D:
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
+
+    def copy_from(self, other: Space3D) -> Space3D:
+        self.x = other.x
+        self.y = other.y
+        self.z = other.z
+        return self
+
+    def add_scaled(self, other: Space3D, scalar: float) -> Space3D:
+        """self += other * scalar"""
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+        self.z += other.z * scalar
+        return self
+
+    def sub_into(self, other: Space3D, out: Space3D) -> Space3D:
+        """out = self - other"""
+        out.x = self.x - other.x
+        out.y = self.y - other.y
+        out.z = self.z - other.z
+        return out
+
     def distance(self, other: Space3D) -> float:
         return math.sqrt(self.distance_sq(other))
 
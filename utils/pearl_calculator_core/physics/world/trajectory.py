@@ -0,0 +1,95 @@
+from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator, Sequence, Union, overload
+from .space import Space3D
+
+
+class Trajectory(Sequence[Space3D]):
+    """Struct-of-arrays container for a sequence of points.
+
+    Coordinates are stored in three contiguous float arrays instead of one Space3D object
+    per tick. It behaves like a read-only List[Space3D]: indexing and iteration build
+    Space3D values on demand, and it compares equal to any sequence of equal points.
+    """
+
+    __slots__ = ("xs", "ys", "zs")
+
+    def __init__(self, points: Iterable[Space3D] = ()):
+        self.xs = array("d")
+        self.ys = array("d")
+        self.zs = array("d")
+        for point in points:
+            self.append(point)
+
+    def append(self, point: Space3D) -> None:
+        self.xs.append(point.x)
+        self.ys.append(point.y)
+        self.zs.append(point.z)
+
+    def append_xyz(self, x: float, y: float, z: float) -> None:
+        self.xs.append(x)
+        self.ys.append(y)
+        self.zs.append(z)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    @overload
+    def __getitem__(self, index: int) -> Space3D: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Trajectory: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Space3D, Trajectory]:
+        if isinstance(index, slice):
+            result = Trajectory()
+            result.xs = self.xs[index]
+            result.ys = self.ys[index]
+            result.zs = self.zs[index]
+            return result
+        return Space3D(self.xs[index], self.ys[index], self.zs[index])
+
+    def __iter__(self) -> Iterator[Space3D]:
+        for x, y, z in zip(self.xs, self.ys, self.zs):
+            yield Space3D(x, y, z)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Trajectory):
+            return self.xs == other.xs and self.ys == other.ys and self.zs == other.zs
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Trajectory({list(self)!r})"
+
+    def __getstate__(self):
+        return self.xs, self.ys, self.zs
+
+    def __setstate__(self, state) -> None:
+        self.xs, self.ys, self.zs = state
+
+    def deduplicated(self) -> Trajectory:
+        """Drop points equal to the point immediately before them"""
+        result = Trajectory()
+        last = None
+        for point in zip(self.xs, self.ys, self.zs):
+            if point != last:
+                result.xs.append(point[0])
+                result.ys.append(point[1])
+                result.zs.append(point[2])
+                last = point
+        return result
+
+    def translated(self, offset: Space3D) -> Trajectory:
+        result = Trajectory()
+        ox = offset.x
+        oy = offset.y
+        oz = offset.z
+        result.xs = array("d", [x + ox for x in self.xs])
+        result.ys = array("d", [y + oy for y in self.ys])
+        result.zs = array("d", [z + oz for z in self.zs])
+        return result
+
+    def to_list(self) -> list[Space3D]:
+        return list(self)
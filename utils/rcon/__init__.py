@@ -1,9 +1,25 @@
 from .main import (
     rcon_send
 )
+from .pool import (
+    RconPool,
+    RconError,
+    RconConnectionError,
+    RconStaleConnectionError,
+    RconAuthError,
+    configure_rcon_pools,
+    close_rcon_pools,
+)
 
 __all__ = [
-    "rcon_send"
+    "rcon_send",
+    "RconPool",
+    "RconError",
+    "RconConnectionError",
+    "RconStaleConnectionError",
+    "RconAuthError",
+    "configure_rcon_pools",
+    "close_rcon_pools",
 ]
 
 
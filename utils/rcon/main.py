@@ -1,7 +1,5 @@
-from rcon.source import rcon
+from .pool import get_rcon_pool
 
 async def rcon_send(host, port, passwd, command, timeout=3):
-    return await rcon(
-        command,
-        host=host, port=port, passwd=passwd, timeout=timeout
-    )
\ No newline at end of file
+    """通过连接池发送 RCON 命令，复用已认证的长连接"""
+    return await get_rcon_pool(host, port, passwd).command(command, timeout)
@@ -0,0 +1,328 @@
+import asyncio
+import itertools
+import socket
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+# Source RCON 数据包类型
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# Minecraft 单个响应包最多 4096 个字符，达到该长度说明后面可能还有分片
+FRAGMENT_SIZE = 4096
+
+# 每个服务器的默认连接数和最大并发命令数
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_CONCURRENCY = 4
+# 连接空闲超过该时间（秒）后重新连接，避免使用已被中间设备断开的连接
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class RconError(Exception):
+    """RCON 错误基类"""
+
+
+class RconConnectionError(RconError):
+    """连接失败或连接中断"""
+
+
+class RconStaleConnectionError(RconConnectionError):
+    """连接在发送命令前已经断开，命令没有发出，可以换连接重试"""
+
+
+class RconAuthError(RconError):
+    """RCON 密码错误"""
+
+
+def _encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    payload = struct.pack('<ii', request_id, packet_type) + body.encode('utf-8') + b'\x00\x00'
+    return struct.pack('<i', len(payload)) + payload
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, int, str]:
+    size, = struct.unpack('<i', await reader.readexactly(4))
+    data = await reader.readexactly(size)
+    request_id, packet_type = struct.unpack('<ii', data[:8])
+    return request_id, packet_type, data[8:-2].decode('utf-8', errors='replace')
+
+
+class _PendingCommand:
+    """等待响应的命令，响应可能分成多个包"""
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.parts: list[str] = []
+        self.marker_id: Optional[int] = None
+
+
+class RconConnection:
+    """一个已认证的 RCON 长连接
+
+    同一连接上可以同时发出多个命令，后台任务按请求 ID 把响应分发给对应的命令
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, _PendingCommand] = {}
+        self._closed = False
+        # 不再分配新命令，进行中的命令全部结束后关闭
+        self._retired = False
+        self._reader_task: Optional[asyncio.Task] = None
+        self.last_used = time.monotonic()
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: str, timeout: float) -> 'RconConnection':
+        """建立连接并认证"""
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RconConnectionError(f"连接 {host}:{port} 失败: {e}") from e
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            # 开启 TCP keepalive，及时发现被断开的空闲连接
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        connection = cls(reader, writer)
+        try:
+            await asyncio.wait_for(connection._authenticate(password), timeout)
+        except BaseException as e:
+            await connection.close()
+            if isinstance(e, RconError):
+                raise
+            if isinstance(e, (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError)):
+                raise RconConnectionError(f"{host}:{port} 认证失败: {e!r}") from e
+            raise
+        connection._reader_task = asyncio.create_task(connection._read_loop())
+        return connection
+
+    def _next_id(self) -> int:
+        request_id = next(self._ids)
+        if request_id >= 2 ** 31 - 1:
+            self._ids = itertools.count(1)
+            request_id = next(self._ids)
+        return request_id
+
+    async def _authenticate(self, password: str):
+        request_id = self._next_id()
+        self._writer.write(_encode_packet(request_id, SERVERDATA_AUTH, password))
+        await self._writer.drain()
+        while True:
+            response_id, packet_type, _ = await _read_packet(self._reader)
+            if packet_type != SERVERDATA_AUTH_RESPONSE:
+                continue
+            if response_id == -1:
+                raise RconAuthError("RCON 密码错误")
+            if response_id == request_id:
+                return
+
+    async def _read_loop(self):
+        try:
+            while True:
+                response_id, _, body = await _read_packet(self._reader)
+                pending = self._pending.get(response_id)
+                if pending is None or pending.future.done():
+                    continue
+                if response_id == pending.marker_id:
+                    # 标记命令的响应到达，说明前面的分片已经全部收到
+                    self._finish(pending, ''.join(pending.parts))
+                    continue
+                pending.parts.append(body)
+                if len(body) < FRAGMENT_SIZE:
+                    if pending.marker_id is None:
+                        self._finish(pending, ''.join(pending.parts))
+                elif pending.marker_id is None:
+                    # 响应可能还有分片：服务器按顺序处理请求，再发一个空命令作为结束标记
+                    pending.marker_id = self._next_id()
+                    self._pending[pending.marker_id] = pending
+                    self._writer.write(_encode_packet(pending.marker_id, SERVERDATA_EXECCOMMAND, ''))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail_all(RconConnectionError(f"连接中断: {e!r}"))
+        finally:
+            self._closed = True
+
+    def _finish(self, pending: _PendingCommand, result: str):
+        for request_id in [k for k, v in self._pending.items() if v is pending]:
+            del self._pending[request_id]
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    def _fail_all(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for item in pending.values():
+            if not item.future.done():
+                item.future.set_exception(error)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed or self._writer.is_closing()
+
+    @property
+    def reusable(self) -> bool:
+        return not self._retired and not self.closed
+
+    @property
+    def in_flight(self) -> int:
+        return len({id(p) for p in self._pending.values()})
+
+    async def command(self, command: str, timeout: float) -> str:
+        if not self.reusable:
+            raise RconStaleConnectionError("连接已关闭")
+        self.last_used = time.monotonic()
+        request_id = self._next_id()
+        pending = _PendingCommand(asyncio.get_running_loop().create_future())
+        self._pending[request_id] = pending
+        try:
+            self._writer.write(_encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+            await self._writer.drain()
+            return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+        except asyncio.TimeoutError:
+            # 超时后连接状态不可信：不再分配新命令，但同一连接上已经发出的其他命令继续等待响应
+            self._retired = True
+            raise
+        except (OSError, asyncio.IncompleteReadError) as e:
+            await self.close()
+            raise RconConnectionError(f"发送命令失败: {e!r}") from e
+        finally:
+            self._pending.pop(request_id, None)
+            if pending.marker_id is not None:
+                self._pending.pop(pending.marker_id, None)
+            if pending.future.done() and not pending.future.cancelled():
+                # 取出异常，避免超时后关闭连接时出现未处理异常的警告
+                pending.future.exception()
+            self.last_used = time.monotonic()
+            if self._retired and self.in_flight == 0:
+                await self.close()
+
+    async def close(self):
+        if self._reader_task is not None and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._closed = True
+        self._fail_all(RconConnectionError("连接已关闭"))
+        try:
+            self._writer.close()
+            await self._writer.wait_closed()
+        except Exception:
+            pass
+
+
+class RconPool:
+    """单个服务器的 RCON 连接池
+
+    - 保持最多 pool_size 个已认证的长连接，按需创建，空闲过久或出错后重新连接
+    - 最多同时执行 max_concurrency 条命令
+    - 复用的连接在发送前已经断开时自动换新连接重试一次；命令发出后连接中断不重试，避免命令被执行两次
+    - 命令超时后连接不再分配新命令，同一连接上其他已发出的命令完成后再关闭
+    """
+
+    def __init__(self, host: str, port: int, password: str,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.pool_size = max(1, pool_size)
+        self.idle_timeout = idle_timeout
+        self._connections: list[RconConnection] = []
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._connect_lock = asyncio.Lock()
+
+    async def _acquire(self, timeout: float) -> Tuple[RconConnection, bool]:
+        """选择一个连接，返回 (连接, 是否为复用的旧连接)"""
+        now = time.monotonic()
+        for connection in list(self._connections):
+            if not connection.reusable:
+                # 停用的连接等进行中的命令结束后自行关闭
+                self._connections.remove(connection)
+                if connection.in_flight == 0:
+                    await connection.close()
+            elif connection.in_flight == 0 and now - connection.last_used > self.idle_timeout:
+                self._connections.remove(connection)
+                await connection.close()
+
+        idle = [c for c in self._connections if c.in_flight == 0]
+        if idle:
+            return idle[0], True
+        if len(self._connections) >= self.pool_size:
+            # 连接都在使用中，复用负载最小的连接（同一连接可以同时发多个命令）
+            return min(self._connections, key=lambda c: c.in_flight), True
+
+        async with self._connect_lock:
+            if len(self._connections) < self.pool_size:
+                connection = await RconConnection.open(self.host, self.port, self.password, timeout)
+                self._connections.append(connection)
+                return connection, False
+        return min(self._connections, key=lambda c: c.in_flight), True
+
+    async def command(self, command: str, timeout: float) -> str:
+        async with self._semaphore:
+            for attempt in range(2):
+                connection, reused = await self._acquire(timeout)
+                try:
+                    return await connection.command(command, timeout)
+                except asyncio.TimeoutError:
+                    # 连接已停用，等其他命令结束后自行关闭
+                    self._discard(connection)
+                    raise
+                except RconConnectionError as e:
+                    self._discard(connection)
+                    # 停用的连接上可能还有其他命令在等待响应
+                    if not isinstance(e, RconStaleConnectionError) or connection.in_flight == 0:
+                        await connection.close()
+                    # 命令可能已经写入，服务器也许已经执行过，只有确定没有发出时才重试
+                    if not reused or attempt > 0 or not isinstance(e, RconStaleConnectionError):
+                        raise
+                    # 复用的连接可能已被服务器关闭，通过 _acquire 换一个连接重试一次
+                    logger.debug(f"RCON 连接 {self.host}:{self.port} 已断开，重新连接")
+            raise RuntimeError("unreachable")
+
+    def _discard(self, connection: RconConnection):
+        if connection in self._connections:
+            self._connections.remove(connection)
+
+    async def close(self):
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
+
+
+# (host, port, password) -> RconPool
+_pools: Dict[Tuple[str, int, str], RconPool] = {}
+_pool_options = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "max_concurrency": DEFAULT_MAX_CONCURRENCY,
+}
+
+
+def configure_rcon_pools(pool_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+    """设置之后新建连接池的参数"""
+    if pool_size:
+        _pool_options["pool_size"] = pool_size
+    if max_concurrency:
+        _pool_options["max_concurrency"] = max_concurrency
+
+
+def get_rcon_pool(host: str, port: int, password: str) -> RconPool:
+    """获取服务器对应的连接池，不存在时创建"""
+    key = (host, int(port), password)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = RconPool(host, int(port), password, **_pool_options)
+        _pools[key] = pool
+    return pool
+
+
+async def close_rcon_pools():
+    """关闭所有连接池（插件卸载时调用）"""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
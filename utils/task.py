@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from cachetools import TTLCache
@@ -8,6 +9,7 @@ import os
 import httpx
 from astrbot.core.platform import AstrMessageEvent
 from .config_utils import ConfigUtils
+from .db.database import AsyncDatabase
 import sqlite3
 from .media.image import ImageUtils
 from .fileparse.main import FileParser
@@ -23,10 +25,10 @@ class MaterialConstants:
 
 
 class TaskUtils:
-    def __init__(self, config_utils: ConfigUtils, conn: sqlite3.Connection, image_utils: ImageUtils = None):
+    def __init__(self, config_utils: ConfigUtils, db: AsyncDatabase, image_utils: ImageUtils = None):
         self.image_utils = image_utils if image_utils is not None else ImageUtils(config_utils)
         self.config_utils = config_utils
-        self.conn = conn
+        self.db = db
         self.file_parser = FileParser()
         self.output = os.path.join(self.config_utils.get_plugin_path(), "data")
 
@@ -43,20 +45,21 @@ class TaskUtils:
             return f"{task_create_user_name}才不是你的喵~"
         return None
     
-    def _execute_sql_with_transaction(self, operations: list) -> tuple[bool, str]:
+    async def _execute_sql_with_transaction(self, operations: list) -> tuple[bool, str]:
         """执行带事务的 SQL 操作"""
-        try:
+        def run(conn: sqlite3.Connection):
             for sql, params in operations:
-                self.conn.execute(sql, params)
-            self.conn.commit()
+                conn.execute(sql, params)
+
+        try:
+            await self.db.transaction(run)
             return True, None
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"SQL 操作失败: {e}")
             return False, str(e)
     
-    def remove_task(self, name, event: AstrMessageEvent):
-        task = self.get_task_by_name(name)
+    async def remove_task(self, name, event: AstrMessageEvent):
+        task = await self.get_task_by_name(name)
         if task["code"] != 200:
             return f"没找到{name}喵~"
 
@@ -69,14 +72,14 @@ class TaskUtils:
             ("DELETE FROM material WHERE task_id = ?", (task["msg"][0][0],))
         ]
         
-        success, error = self._execute_sql_with_transaction(operations)
+        success, error = await self._execute_sql_with_transaction(operations)
         if success:
             return f"把{name}删掉了喵~"
         return f"呜哇！报错了喵！\n{error}"
 
-    def get_task_list(self):
+    async def get_task_list(self):
         sql = "select name from task"
-        sql_res = self.conn.execute(sql).fetchall()
+        sql_res = await self.db.fetchall(sql)
         res = "服务器工程列表\n"
         for row in sql_res:
             res += f"\t-{row[0]}\n"
@@ -85,33 +88,32 @@ class TaskUtils:
     def export_task(self):
         pass
 
-    def get_task_by_name(self, name) -> dict:
+    async def get_task_by_name(self, name) -> dict:
         sql = "select * from task where name = ?"
-        sql_res = self.conn.execute(sql, (name,)).fetchall()
+        sql_res = await self.db.fetchall(sql, (name,))
         if sql_res:
             return {"code": 200, "msg": sql_res}
         else:
             return {"code": 500, "msg": f"没找到{name}喵~"}
 
-    def get_material_list_by_task_id(self, task_id) -> dict:
+    async def get_material_list_by_task_id(self, task_id) -> dict:
         sql = "SELECT * FROM material WHERE task_id = ?"
-        sql_res = self.conn.execute(sql, (task_id,)).fetchall()
+        sql_res = await self.db.fetchall(sql, (task_id,))
         if sql_res:
             return {"code": 200, "msg": sql_res}
         else:
             return {"code": 500, "msg": f"没找到材料喵~"}
 
-    async def render(self, task, materia_list, filename='task.png', use_big_image=True):
+    async def render(self, task, materia_list, use_big_image=True):
         """渲染任务材料列表图片
 
         Args:
             task: 任务数据
             materia_list: 材料列表
-            filename: 输出文件名，默认为 'task.png'
             use_big_image: 是否使用大图模式（并列显示多列），默认为 True
 
         Returns:
-            str: 生成的图片文件路径
+            bytes: PNG 图片数据
         """
         # 准备任务数据
         task_data = {
@@ -123,18 +125,15 @@ class TaskUtils:
         }
         
         # 使用 image_utils 生成图片
-        path = await self.image_utils.generate_materia_image(
+        return await self.image_utils.generate_materia_image(
             task_data=task_data,
             materia_list=materia_list,
-            filename=filename,
             use_big_image=use_big_image
         )
-        
-        return path
 
-    def set_task(self, location, dimension, original_name, name, event):
+    async def set_task(self, location, dimension, original_name, name, event):
         """修改任务信息"""
-        task = self.get_task_by_name(original_name)
+        task = await self.get_task_by_name(original_name)
         if task["code"] != 200:
             return f"没有{original_name}喵~"
 
@@ -143,7 +142,7 @@ class TaskUtils:
             return permission_error
 
         # 校验新名字是否存在
-        new_task = self.get_task_by_name(name)
+        new_task = await self.get_task_by_name(name)
         if new_task["code"] == 200:
             return f"已经有{name}了喵~"
 
@@ -152,7 +151,7 @@ class TaskUtils:
              (name, location, dimension, original_name))
         ]
         
-        success, error = self._execute_sql_with_transaction(operations)
+        success, error = await self._execute_sql_with_transaction(operations)
         if success:
             return "修改成功喵~"
         return f"呜哇！报错了喵！\n{error}"
@@ -173,40 +172,33 @@ class TaskUtils:
             logger.error(f"文件下载失败: {url}, 错误: {e}")
             return False
 
-    def task_material(self, url, file_name, session_id: str, task_temp: TTLCache):
+    async def task_material(self, url, file_name, session_id: str, task_temp: TTLCache):
         """处理材料文件上传"""
         try:
             # 获取任务信息
             task_temp_info = task_temp[session_id]
             
-            # 创建任务记录
-            task_id = self._create_task(task_temp_info)
-            if not task_id:
-                return "创建任务记录失败喵~"
-            
-            # 处理材料文件
-            material_list = self._process_material_file(url, file_name, task_id)
+            # 下载并解析材料文件（在线程中执行，不阻塞事件循环）
+            material_list = await asyncio.to_thread(self._process_material_file, url, file_name)
             if not material_list:
-                self.conn.rollback()
                 return "处理材料文件失败喵~"
             
-            # 插入材料数据
-            self._insert_material_data(material_list)
+            # 创建任务记录并插入材料数据（同一个事务）
+            await self.db.transaction(self._create_task_with_materials, task_temp_info, material_list)
             
-            # 提交事务并清理缓存
-            self.conn.commit()
+            # 清理缓存
             task_temp.pop(session_id)
             return "上传材料列表成功喵~"
             
         except KeyError:
             return "会话已过期喵~"
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"task_material 处理失败: {e}")
             return f"报错了喵~ \n {e}"
     
-    def _create_task(self, task_temp_info: dict) -> int:
-        """创建任务记录"""
+    @staticmethod
+    def _create_task_with_materials(conn: sqlite3.Connection, task_temp_info: dict, material_list: list) -> int:
+        """创建任务记录并插入材料数据（在数据库写线程中执行）"""
         task_data = (
             task_temp_info["name"],
             task_temp_info["location"], 
@@ -216,18 +208,24 @@ class TaskUtils:
         )
         
         sql = "INSERT INTO task(name,location,dimension,create_user,create_user_id) VALUES (?, ?, ?, ?, ?)"
-        cursor = self.conn.execute(sql, task_data)
-        return cursor.lastrowid
+        task_id = conn.execute(sql, task_data).lastrowid
+        
+        # 材料数据最后一项是任务ID，解析时还没有任务ID，这里替换为新任务的ID
+        material_list = [material[:-1] + (task_id,) for material in material_list]
+        sql = "INSERT INTO material(name,name_id,total, recipient,commit_count,number,task_id) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        conn.executemany(sql, material_list)
+        return task_id
     
-    def _process_material_file(self, url: str, file_name: str, task_id: int) -> list:
-        """处理材料文件"""
+    def _process_material_file(self, url: str, file_name: str) -> list:
+        """下载并解析材料文件"""
         file_path = os.path.join(self.config_utils.get_plugin_path(), "data", file_name)
         if not self.download_file(url, file_path):
             logger.error("文件下载失败")
             return None
         
         try:
-            parse_result = self.file_parser.parse(file_path, int(task_id))
+            # 任务ID在写入数据库时替换
+            parse_result = self.file_parser.parse(file_path, 0)
             if parse_result["code"] != 200:
                 logger.error(parse_result['msg'])
                 return None
@@ -237,21 +235,16 @@ class TaskUtils:
             # 确保临时文件被删除
             if os.path.exists(file_path):
                 os.remove(file_path)
-    
-    def _insert_material_data(self, material_list: list):
-        """插入材料数据"""
-        sql = "INSERT INTO material(name,name_id,total, recipient,commit_count,number,task_id) VALUES (?, ?, ?, ?, ?, ?, ?)"
-        self.conn.executemany(sql, material_list)
 
-    def update_material(self, task_name, material_number, event: AstrMessageEvent):
+    async def update_material(self, task_name, material_number, event: AstrMessageEvent):
         """领取材料"""
-        task_res = self.get_task_by_name(task_name)
+        task_res = await self.get_task_by_name(task_name)
         if task_res['code'] != 200:
             return f"没找到{task_name}喵~"
             
         task = task_res["msg"]
         sql = "SELECT * FROM material WHERE task_id = ? and number = ?"
-        sql_res = self.conn.execute(sql, (task[0][0], material_number)).fetchall()
+        sql_res = await self.db.fetchall(sql, (task[0][0], material_number))
         
         if not sql_res:
             return f"没找到{task_name}里面的{material_number}号喵~"
@@ -261,20 +254,20 @@ class TaskUtils:
              (event.get_sender_name(), sql_res[0][0]))
         ]
         
-        success, error = self._execute_sql_with_transaction(operations)
+        success, error = await self._execute_sql_with_transaction(operations)
         if success:
             return "领取成功喵~"
         return f"呜哇！出错了喵！\n{error}"
 
-    def commit_material(self, task_name, material_number, location, count, group, box):
+    async def commit_material(self, task_name, material_number, location, count, group, box):
         """提交材料"""
-        task_res = self.get_task_by_name(task_name)
+        task_res = await self.get_task_by_name(task_name)
         if task_res['code'] != 200:
             return f"没找到{task_name}喵~"
             
         task = task_res["msg"]
         sql = "SELECT * FROM material WHERE task_id = ? and number = ?"
-        sql_res = self.conn.execute(sql, (task[0][0], material_number)).fetchall()
+        sql_res = await self.db.fetchall(sql, (task[0][0], material_number))
         
         if not sql_res:
             return f"没找到{task_name}里面的{material_number}号喵~"
@@ -304,12 +297,11 @@ class TaskUtils:
                  (commit_count, json.dumps(locations, ensure_ascii=False), material[0]))
             ]
             
-            success, error = self._execute_sql_with_transaction(operations)
+            success, error = await self._execute_sql_with_transaction(operations)
             if success:
                 return "提交成功！谢谢喵~"
             return f"呜哇！出错了喵！\n{error}"
             
         except (json.JSONDecodeError, ValueError, KeyError) as e:
             logger.error(f"提交材料失败: {e}")
-            self.conn.rollback()
             return f"呜哇！出错了喵！\n{e}"
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+from cachetools import TTLCache
+
+from astrbot.core import logger
+
+# 接口地址
+MOJANG_PROFILES_API = "https://api.mojang.com/profiles/minecraft"
+MOJANG_USER_API = "https://api.mojang.com/users/profiles/minecraft"
+HISTORY_ID_API = "https://mcapi.zxqblog.cn/histroy"
+
+# 请求超时（秒）
+REQUEST_TIMEOUT = 10
+# 每个主机同时打开的连接数
+LIMIT_PER_HOST = 4
+# 429 / 5xx / 连接错误时的重试次数和初始退避时间（秒），之后每次翻倍；超时不重试
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+# 一次查询（包括所有重试和等待）最多花费的时间（秒），超过后不再重试
+RETRY_BUDGET = 15
+# Retry-After 最多等待的时间（秒），避免一次查询阻塞太久
+MAX_RETRY_AFTER = 30
+# 查询结果缓存时间（秒）和条数
+CACHE_TTL = 600
+CACHE_SIZE = 2048
+
+# 缓存中表示"查询过但不存在"的值
+_NOT_FOUND = object()
+
+
+class ProfileApiClient:
+    """Mojang / 历史用户名接口客户端
+
+    - 整个插件生命周期共用一个 aiohttp 会话，复用 DNS、TCP 和 TLS 连接
+    - 按主机限制并发连接数，429、5xx 和连接错误时按 Retry-After 或指数退避重试；
+      请求超时不重试，所有重试的总耗时不超过 retry_budget，避免 /list 长时间阻塞
+    - 查询结果（包括"用户不存在"）按 TTL 缓存，同一用户名短时间内不会重复请求
+    - 接口地址可以替换，便于指向本地的测试服务器
+    """
+
+    def __init__(self,
+                 profiles_api: str = MOJANG_PROFILES_API,
+                 user_api: str = MOJANG_USER_API,
+                 history_api: str = HISTORY_ID_API,
+                 timeout: float = REQUEST_TIMEOUT,
+                 limit_per_host: int = LIMIT_PER_HOST,
+                 max_retries: int = MAX_RETRIES,
+                 retry_backoff: float = RETRY_BACKOFF,
+                 retry_budget: float = RETRY_BUDGET,
+                 cache_ttl: float = CACHE_TTL,
+                 cache_size: int = CACHE_SIZE):
+        self.profiles_api = profiles_api
+        self.user_api = user_api.rstrip('/')
+        self.history_api = history_api.rstrip('/')
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_budget = retry_budget
+        self._session: Optional[aiohttp.ClientSession] = None
+        # (类型, 小写用户名) -> 查询结果
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """首次使用时在当前事件循环中创建会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def _retry_delay(self, attempt: int, response: Optional[aiohttp.ClientResponse] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), MAX_RETRY_AFTER)
+        return self.retry_backoff * (2 ** attempt)
+
+    async def _request(self, method: str, url: str, payload: Any = None) -> Tuple[int, Any]:
+        """发送请求，返回 (状态码, JSON 数据)；重试用尽后抛出最后一次的异常"""
+        session = self._get_session()
+        deadline = time.monotonic() + self.retry_budget
+
+        def can_retry(attempt: int, delay: float) -> bool:
+            # 等待后再发一次请求（最坏情况到超时）仍在预算内才重试
+            return attempt < self.max_retries and time.monotonic() + delay + self.timeout <= deadline
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.request(method, url, json=payload) as response:
+                    delay = self._retry_delay(attempt, response)
+                    if (response.status == 429 or response.status >= 500) and can_retry(attempt, delay):
+                        logger.debug(f"请求 {url} 返回 {response.status}，{delay:.1f} 秒后重试")
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status != 200:
+                        return response.status, None
+                    return response.status, await response.json(content_type=None)
+            except asyncio.TimeoutError:
+                # 接口响应慢时重试只会让调用方等得更久（aiohttp 的读取超时同时也是 ClientError）
+                raise
+            except aiohttp.ClientError as e:
+                delay = self._retry_delay(attempt)
+                if not can_retry(attempt, delay):
+                    raise
+                logger.debug(f"请求 {url} 失败: {e!r}，{delay:.1f} 秒后重试")
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def _cached(self, kind: str, username: str) -> Any:
+        return self._cache.get((kind, username.lower()))
+
+    def _store(self, kind: str, username: str, value: Any):
+        self._cache[(kind, username.lower())] = _NOT_FOUND if value is None else value
+
+    # ==================== 接口方法 ====================
+
+    async def fetch_profiles(self, usernames: Iterable[str]) -> list[dict]:
+        """批量获取 UUID（一次最多 10 个用户名），返回 [{"id", "name"}, ...]"""
+        usernames = list(dict.fromkeys(usernames))
+        profiles, missing = [], []
+        for username in usernames:
+            cached = self._cached('profile', username)
+            if cached is None:
+                missing.append(username)
+            elif cached is not _NOT_FOUND:
+                profiles.append(cached)
+        if not missing:
+            return profiles
+        try:
+            status, data = await self._request('POST', self.profiles_api, missing)
+        except Exception as e:
+            logger.error(f"请求 UUID 接口失败: {e!r}, 批次: {missing}")
+            return profiles
+        if status != 200 or not isinstance(data, list):
+            logger.warning(f"获取 UUID 失败，状态码: {status}, 批次: {missing}")
+            return profiles
+        found = {}
+        for item in data:
+            if item and item.get("name") and item.get("id"):
+                found[item["name"].lower()] = item
+        for username in missing:
+            # 批量接口不返回不存在的用户名，同样缓存下来
+            self._store('profile', username, found.get(username.lower()))
+        profiles.extend(found.values())
+        return profiles
+
+    async def fetch_profile(self, username: str) -> Optional[dict]:
+        """根据用户名获取 UUID，不存在或请求失败时返回 None"""
+        cached = self._cached('profile', username)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+        try:
+            status, data = await self._request('GET', f"{self.user_api}/{username}")
+        except Exception as e:
+            logger.error(f"获取用户 UUID 失败: {e!r}, 用户名: {username}")
+            return None
+        if status == 200 and isinstance(data, dict) and not data.get("errorMessage"):
+            self._store('profile', username, data)
+            return data
+        if status in (200, 204, 404):
+            # 用户不存在
+            self._store('profile', username, None)
+        return None
+
+    async def fetch_history_names(self, username: str) -> Optional[Dict]:
+        """获取历史用户名，请求失败时返回 None"""
+        cached = self._cached('history', username)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+        try:
+            status, data = await self._request('GET', f"{self.history_api}/{username}")
+        except Exception as e:
+            logger.error(f"获取历史用户名失败: {e!r}, username: {username}")
+            return None
+        if status == 200 and isinstance(data, dict):
+            self._store('history', username, data)
+            return data
+        if status == 404:
+            # 没有历史用户名
+            self._store('history', username, {})
+            return {}
+        return None
+
+    def is_not_found(self, username: str) -> bool:
+        """接口是否已经确认该用户名没有正版账号（请求失败时为 False）"""
+        return self._cached('profile', username) is _NOT_FOUND
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    async def close(self):
+        """关闭会话（插件卸载时调用）"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,266 +1,382 @@
 import sqlite3
-from typing import Tuple, Dict, Optional
+import time
+from typing import Tuple, Dict, Optional, Iterable
 
-import aiohttp
 import asyncio
 
 from astrbot.core import logger
+from ..db.database import AsyncDatabase
 from ..command.helpers import (
-    get_whitelist, send_command,
+    get_whitelist, reload_whitelist, invalidate_whitelist, send_command,
+)
+from .client import ProfileApiClient
+from .verdict import (
+    PlayerVerdictCache, Verdict,
+    REASON_WHITELIST, REASON_RENAMED, REASON_HISTORY, REASON_NO_PROFILE, REASON_NOT_MATCHED,
 )
 
 # 常量定义
-MOJANG_PROFILES_API = "https://api.mojang.com/profiles/minecraft"
-MOJANG_USER_API = "https://api.mojang.com/users/profiles/minecraft"
-HISTORY_ID_API = "https://mcapi.zxqblog.cn/histroy"
 BATCH_SIZE = 10
-REQUEST_TIMEOUT = 10
+# 批量判断玩家时同时进行的外部接口请求数
+LOOKUP_CONCURRENCY = 4
+# 单条 SQL 中 IN 参数的最大数量（SQLite 默认上限为 999）
+SQL_IN_CHUNK = 500
+# 初始化白名单时同时进行的批量请求数和每秒最多发起的请求数
+INIT_CONCURRENCY = 4
+INIT_REQUESTS_PER_SECOND = 5
+# 初始化白名单时每完成多少批输出一次 info 级别的进度日志
+INIT_PROGRESS_LOG_EVERY = 10
+# plugin_state 表中记录初始化状态的键，值为 running 时说明上次初始化没有完成
+INIT_STATE_KEY = "whitelist_init"
+# 初始化结果
+INIT_DONE = "done"                  # 全部导入完成
+INIT_FAILED = "failed"              # 导入途中出错，下次启动时继续
+INIT_UNAVAILABLE = "unavailable"    # 获取不到服务器白名单，数据库没有改动
+
+
+class _RateLimiter:
+    """按固定间隔放行请求"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 
 class WhitelistUtils:
 
-    def __init__(self, conn: sqlite3.Connection, servers: list[dict], bot_prefix: str):
-        self.conn = conn
+    def __init__(self, db: AsyncDatabase, servers: list[dict], bot_prefix: str,
+                 api: Optional[ProfileApiClient] = None):
+        self.db = db
         self.servers = servers
         self.bot_prefix = bot_prefix
+        # Mojang / 历史用户名接口客户端，整个插件生命周期共用
+        self.api = api or ProfileApiClient()
+        # 不在 user_profile 中的玩家的判定结果缓存
+        self.verdicts = PlayerVerdictCache(db)
+        # 初始化进度：(已完成, 总数)
+        self.init_progress: Tuple[int, int] = (0, 0)
+        self._init_task: Optional[asyncio.Task] = None
         
-        # 查询user_profile表是否有数据
-        if self._is_database_empty():
-            asyncio.create_task(self.initialize())
+        # user_profile表没有数据或上次初始化被中断时，在后台继续初始化
+        self._init_task = asyncio.create_task(self._resume_initialize())
 
     # ==================== 数据库辅助方法 ====================
     
-    def _is_database_empty(self) -> bool:
+    async def _is_database_empty(self) -> bool:
         """检查数据库是否为空"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM user_profile")
-        return cursor.fetchone()[0] == 0
+        row = await self.db.fetchone("SELECT COUNT(*) FROM user_profile")
+        return row[0] == 0
     
-    def _user_exists_in_db(self, username: str) -> bool:
-        """检查用户名是否在数据库中"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM user_profile WHERE username = ?", (username,))
-        return cursor.fetchone()[0] > 0
-    
-    def _uuid_exists_in_db(self, uuid: str) -> bool:
+    async def _uuid_exists_in_db(self, uuid: str) -> bool:
         """检查UUID是否在数据库中"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM user_profile WHERE uuid = ?", (uuid,))
-        return cursor.fetchone()[0] > 0
+        row = await self.db.fetchone("SELECT COUNT(*) FROM user_profile WHERE uuid = ?", (uuid,))
+        return row[0] > 0
     
-    def _get_user_by_uuid(self, uuid: str) -> Optional[tuple]:
-        """根据UUID查询用户"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM user_profile WHERE uuid = ?", (uuid,))
-        return cursor.fetchone()
+    async def _get_state(self, name: str) -> Optional[str]:
+        row = await self.db.fetchone("SELECT value FROM plugin_state WHERE name = ?", (name,))
+        return row[0] if row else None
+
+    async def _set_state(self, name: str, value: str) -> None:
+        await self.db.execute("INSERT OR REPLACE INTO plugin_state (name, value) VALUES (?, ?)", (name, value))
+
+    async def _select_existing(self, column: str, values: Iterable[str]) -> set[str]:
+        """批量查询 column 列中已存在的值（column 只能是 username 或 uuid）"""
+        values = list(values)
+
+        def query(conn: sqlite3.Connection) -> set[str]:
+            existing = set()
+            for i in range(0, len(values), SQL_IN_CHUNK):
+                chunk = values[i:i + SQL_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT {column} FROM user_profile WHERE {column} IN ({placeholders})", chunk
+                ).fetchall()
+                existing.update(row[0] for row in rows)
+            return existing
+
+        if not values:
+            return set()
+        return await self.db.read(query)
     
-    def _insert_user(self, uuid: Optional[str], username: str) -> None:
+    async def _insert_user(self, uuid: Optional[str], username: str) -> None:
         """插入用户到数据库"""
-        cursor = self.conn.cursor()
         if uuid:
-            cursor.execute("INSERT INTO user_profile (uuid, username) VALUES (?, ?)", (uuid, username))
+            await self.db.execute("INSERT INTO user_profile (uuid, username) VALUES (?, ?)", (uuid, username))
         else:
-            cursor.execute("INSERT INTO user_profile (username) VALUES (?)", (username,))
-        self.conn.commit()
-    
-    def _update_username(self, uuid: str, username: str) -> None:
-        """更新用户名"""
-        cursor = self.conn.cursor()
-        cursor.execute("UPDATE user_profile SET username = ? WHERE uuid = ?", (username, uuid))
-        self.conn.commit()
-    
-    def _update_user_by_history(self, uuid: str, username: str, old_username: str) -> None:
-        """通过历史用户名更新用户信息"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "UPDATE user_profile SET username = ?, uuid = ? WHERE username = ?",
-            (username, uuid, old_username)
-        )
-        self.conn.commit()
+            await self.db.execute("INSERT INTO user_profile (username) VALUES (?)", (username,))
     
-    def _delete_user(self, username: str) -> None:
+    async def _delete_user(self, username: str) -> None:
         """从数据库删除用户"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM user_profile WHERE username = ?", (username,))
-        self.conn.commit()
+        await self.db.execute("DELETE FROM user_profile WHERE username = ?", (username,))
     
     # ==================== API 调用辅助方法 ====================
     
     async def _fetch_uuid_batch(self, usernames: list[str]) -> list[dict]:
         """批量获取UUID"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    MOJANG_PROFILES_API,
-                    json=usernames,
-                    timeout=REQUEST_TIMEOUT
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data if isinstance(data, list) else []
-                    else:
-                        logger.warning(f"获取 UUID 失败，状态码: {response.status}, 批次: {usernames}")
-                        return []
-            except Exception as e:
-                logger.error(f"请求 UUID 接口失败: {e}, 批次: {usernames}")
-                return []
+        return await self.api.fetch_profiles(usernames)
     
     async def _fetch_uuid_by_username(self, username: str) -> Optional[dict]:
         """根据用户名获取UUID"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f"{MOJANG_USER_API}/{username}",
-                    timeout=REQUEST_TIMEOUT
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("errorMessage"):
-                            return None
-                        return data
-                    return None
-            except Exception as e:
-                logger.error(f"获取用户 UUID 失败: {e}, 用户名: {username}")
-                return None
+        return await self.api.fetch_profile(username)
     
     async def _fetch_history_names(self, username: str) -> Optional[dict]:
         """获取历史用户名"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f"{HISTORY_ID_API}/{username}",
-                    timeout=REQUEST_TIMEOUT
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
-            except Exception as e:
-                logger.error(f"获取历史用户名失败: {e}, username: {username}")
-                return None
+        return await self.api.fetch_history_names(username)
     
     # ==================== 业务逻辑方法 ====================
     
-    async def initialize(self):
-        """初始化白名单数据"""
+    async def initialize(self) -> str:
+        """重新初始化白名单数据（清空后重新从服务器白名单导入），返回初始化结果 INIT_*"""
+        if self._init_task is not None and not self._init_task.done():
+            # 取消后台正在进行的初始化，改为重新开始
+            self._init_task.cancel()
+            try:
+                await self._init_task
+            except asyncio.CancelledError:
+                pass
+        self._init_task = asyncio.create_task(self._initialize(resume=False))
+        return await asyncio.shield(self._init_task)
+
+    async def _resume_initialize(self):
+        """启动时检查是否需要初始化"""
+        try:
+            if await self._is_database_empty() or await self._get_state(INIT_STATE_KEY) == "running":
+                await self._initialize(resume=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"检查白名单数据失败: {e}")
+
+    async def _initialize(self, resume: bool) -> str:
+        """从服务器白名单导入用户
+
+        - 批量接口的请求并发执行，并限制并发数和请求速率
+        - 每批结果返回后立即用 executemany 写入并提交，同时更新进度，每 INIT_PROGRESS_LOG_EVERY 批输出一次日志
+        - 开始前在 plugin_state 中标记 running，完成后标记 done；
+          插件在初始化途中重启时跳过已写入的用户，继续处理剩余部分
+        - 获取不到服务器白名单时返回 INIT_UNAVAILABLE，不清空数据，也不修改初始化状态
+        """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM user_profile")
+            # 先获取服务器内白名单（不使用缓存的快照），查询失败时不改动数据库
+            whitelist = await reload_whitelist(self.servers)
+            if whitelist is None:
+                logger.error("获取服务器白名单失败，跳过白名单初始化")
+                return INIT_UNAVAILABLE
+            whitelist = list(dict.fromkeys(whitelist))
+
+            if not resume:
+                await self.db.execute("DELETE FROM user_profile")
+                await self.verdicts.invalidate()
+            self.init_progress = (0, 0)
+            await self._set_state(INIT_STATE_KEY, "running")
 
-            # 获取服务器内白名单
-            whitelist = await get_whitelist(self.servers)
             if len(whitelist) == 0:
-                self.conn.commit()
+                await self._set_state(INIT_STATE_KEY, "done")
                 logger.info("白名单为空，跳过初始化")
-                return
-
-            # 批量获取UUID
-            response_data_list = []
-            for i in range(0, len(whitelist), BATCH_SIZE):
-                batch_usernames = whitelist[i:i + BATCH_SIZE]
-                batch_data = await self._fetch_uuid_batch(batch_usernames)
-                response_data_list.extend(batch_data)
-
-            # 结果转为 name -> uuid 映射
-            resp_mapping = {
-                data.get("name"): data.get("id")
-                for data in response_data_list
-                if data and data.get("name") and data.get("id")
-            }
-
-            # 保存有UUID的用户
-            remaining = set(whitelist)
-            for username, uuid in resp_mapping.items():
-                if username in remaining:
-                    cursor.execute(
-                        "INSERT INTO user_profile (uuid, username) VALUES (?, ?)",
-                        (uuid, username)
-                    )
-                    remaining.discard(username)
-
-            # 保存没有UUID的用户（仅用户名）
-            for username in remaining:
-                cursor.execute("INSERT INTO user_profile (username) VALUES (?)", (username,))
-
-            self.conn.commit()
+                return INIT_DONE
+
+            # 跳过上次已经写入的用户
+            existing = await self._select_existing("username", whitelist)
+            pending = [u for u in whitelist if u not in existing]
+            total = len(whitelist)
+            done = total - len(pending)
+            self.init_progress = (done, total)
+            if existing:
+                logger.info(f"继续初始化白名单，已完成 {done}/{total}")
+
+            semaphore = asyncio.Semaphore(INIT_CONCURRENCY)
+            limiter = _RateLimiter(INIT_REQUESTS_PER_SECOND)
+
+            async def resolve(batch: list[str]) -> list[tuple]:
+                async with semaphore:
+                    await limiter.wait()
+                    batch_data = await self._fetch_uuid_batch(batch)
+                uuids = {
+                    data["name"].lower(): data["id"]
+                    for data in batch_data
+                    if data and data.get("name") and data.get("id")
+                }
+                # 没有查到UUID的用户只保存用户名
+                return [(uuids.get(username.lower()), username) for username in batch]
+
+            batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+            tasks = [asyncio.create_task(resolve(b)) for b in batches]
+            try:
+                for finished, next_rows in enumerate(asyncio.as_completed(tasks), 1):
+                    rows = await next_rows
+                    await self.db.executemany("INSERT INTO user_profile (uuid, username) VALUES (?, ?)", rows)
+                    done += len(rows)
+                    self.init_progress = (done, total)
+                    if finished % INIT_PROGRESS_LOG_EVERY == 0 and finished < len(tasks):
+                        logger.info(f"白名单初始化进度 {done}/{total}")
+                    else:
+                        logger.debug(f"白名单初始化进度 {done}/{total}")
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            await self._set_state(INIT_STATE_KEY, "done")
+            logger.info(f"白名单初始化完成，共 {total} 人")
+            return INIT_DONE
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"初始化白名单失败: {e}")
-            self.conn.rollback()
+            return INIT_FAILED
 
     def _is_bot_username(self, username: str) -> bool:
         """检查是否为机器人用户名（根据前缀判断）"""
         return len(username) > len(self.bot_prefix) and username[:len(self.bot_prefix)] == self.bot_prefix
     
-    async def _sync_whitelist_user_to_db(self, username: str) -> bool:
-        """同步白名单中的用户到数据库"""
-        data = await self._fetch_uuid_by_username(username)
-        if data and data.get("id"):
-            self._insert_user(data.get("id"), username)
-            return True
-        return False
-    
-    async def _verify_by_uuid(self, username: str) -> bool:
-        """通过UUID验证用户"""
-        data = await self._fetch_uuid_by_username(username)
-        if not data or not data.get("id"):
-            return False
-        
-        uuid = data.get("id")
-        # 检查UUID是否已存在数据库
-        existing_user = self._get_user_by_uuid(uuid)
-        if existing_user:
-            # 更新用户名
-            self._update_username(uuid, data.get("name"))
-            return True
-        
-        return False
-    
-    async def _verify_by_history_names(self, username: str) -> bool:
-        """通过历史用户名验证用户"""
-        data = await self._fetch_uuid_by_username(username)
-        if not data or not data.get("id"):
-            return False
-        
-        uuid = data.get("id")
-        history_data = await self._fetch_history_names(username)
-        if not history_data or not history_data.get("history_names"):
-            return False
-        
-        # 检查历史用户名是否在数据库中
-        for history in history_data.get("history_names", []):
-            # history_name = history.get("name")
-            if history and self._user_exists_in_db(history):
-                # 更新用户信息
-                self._update_user_by_history(uuid, data.get("name"), history)
-                return True
-        
-        return False
-    
-    async def real_player_verify(self, username: str) -> bool:
-        """验证是否为真实玩家"""
-        # 检查是否为机器人用户名
-        if self._is_bot_username(username):
-            return False
-
-        # 检查数据库中是否存在
-        if self._user_exists_in_db(username):
-            return True
-
-        # 检查服务器白名单（防止在游戏内添加白名单，没有存在数据库里）
-        whitelist_list = await get_whitelist(self.servers)
-        if username in whitelist_list:
-            if await self._sync_whitelist_user_to_db(username):
-                return True
-        
-        # 通过UUID验证
-        if await self._verify_by_uuid(username):
-            return True
-        
-        # 通过历史用户名验证
+    async def _fetch_profiles(self, usernames: list[str]) -> Dict[str, dict]:
+        """通过批量接口并发获取 UUID，返回 小写用户名 -> {"id", "name"}"""
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+
+        async def fetch(batch: list[str]) -> list[dict]:
+            async with semaphore:
+                return await self._fetch_uuid_batch(batch)
+
+        batches = [usernames[i:i + BATCH_SIZE] for i in range(0, len(usernames), BATCH_SIZE)]
+        profiles = {}
+        for batch_data in await asyncio.gather(*[fetch(b) for b in batches]):
+            for data in batch_data:
+                if data and data.get("name") and data.get("id"):
+                    profiles[data["name"].lower()] = data
+        return profiles
+
+    async def _match_history_names(self, candidates: Dict[str, dict]) -> Tuple[Dict[str, str], set[str]]:
+        """并发查询历史用户名
+
+        返回 (用户名 -> 数据库中匹配到的历史用户名, 查询失败的用户名)
+        """
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+
+        async def fetch(username: str) -> Tuple[str, Optional[list]]:
+            async with semaphore:
+                data = await self._fetch_history_names(username)
+            return username, None if data is None else data.get("history_names") or []
+
+        results = await asyncio.gather(*[fetch(u) for u in candidates])
+        failed = {username for username, names in results if names is None}
+        results = [(username, names) for username, names in results if names is not None]
+        history_names = {h for _, names in results for h in names if h}
+        known = await self._select_existing("username", history_names)
+        matched = {}
+        for username, names in results:
+            for history in names:
+                if history in known:
+                    matched[username] = history
+                    break
+        return matched, failed
+
+    async def classify_players(self, usernames: Iterable[str]) -> Dict[str, bool]:
+        """批量判断玩家是否为真人玩家，返回 用户名 -> 是否为真人
+
+        1. 机器人前缀直接判定为假人
+        2. 数据库中已有的用户名用一条 IN 查询判定为真人
+        3. 其余玩家一次获取服务器白名单，并通过批量接口并发获取 UUID：
+           在白名单中的写入数据库；UUID 已在数据库中的更新用户名；
+           否则查询历史用户名，匹配到数据库中的旧用户名时更新用户信息
+        4. 第 3 步的判定结果和原因写入缓存，未过期前直接使用，不再请求接口；
+           缓存为假人但已出现在服务器白名单中的玩家重新验证
+        """
+        result: Dict[str, bool] = {}
+        for username in usernames:
+            if username not in result:
+                result[username] = False
+
+        candidates = [u for u in result if not self._is_bot_username(u)]
+        for username in await self._select_existing("username", candidates):
+            result[username] = True
+        unknown = [u for u in candidates if not result[u]]
+        if not unknown:
+            return result
+
         try:
-            return await self._verify_by_history_names(username)
+            whitelist = set(await get_whitelist(self.servers))
+
+            # 使用缓存的判定结果
+            cached = await self.verdicts.get_many(unknown)
+            for username, (is_real, _) in cached.items():
+                if is_real or username not in whitelist:
+                    result[username] = is_real
+                else:
+                    # 之后在游戏内被加入了白名单
+                    del cached[username]
+            unknown = [u for u in unknown if u not in cached]
+            if not unknown:
+                return result
+
+            profiles = await self._fetch_profiles(unknown)
+            verdicts: Dict[str, Verdict] = {}
+
+            # 在服务器白名单中（游戏内添加，没有存在数据库里）
+            inserts = []
+            remaining: Dict[str, dict] = {}
+            for username in unknown:
+                data = profiles.get(username.lower())
+                if not data:
+                    if self.api.is_not_found(username):
+                        verdicts[username] = (False, REASON_NO_PROFILE)
+                    continue
+                if username in whitelist:
+                    inserts.append((data["id"], username))
+                    result[username] = True
+                    verdicts[username] = (True, REASON_WHITELIST)
+                else:
+                    remaining[username] = data
+
+            # UUID 已在数据库中，说明玩家改了名
+            known_uuids = await self._select_existing("uuid", (d["id"] for d in remaining.values()))
+            renames = []
+            for username, data in list(remaining.items()):
+                if data["id"] in known_uuids:
+                    renames.append((data["name"], data["id"]))
+                    result[username] = True
+                    verdicts[username] = (True, REASON_RENAMED)
+                    del remaining[username]
+
+            # 通过历史用户名匹配
+            history_updates = []
+            if remaining:
+                matched, failed = await self._match_history_names(remaining)
+                for username in remaining:
+                    if username in matched:
+                        data = remaining[username]
+                        history_updates.append((data["name"], data["id"], matched[username]))
+                        result[username] = True
+                        verdicts[username] = (True, REASON_HISTORY)
+                    elif username not in failed:
+                        verdicts[username] = (False, REASON_NOT_MATCHED)
+
+            def save(conn: sqlite3.Connection):
+                conn.executemany("INSERT INTO user_profile (uuid, username) VALUES (?, ?)", inserts)
+                conn.executemany("UPDATE user_profile SET username = ? WHERE uuid = ?", renames)
+                conn.executemany(
+                    "UPDATE user_profile SET username = ?, uuid = ? WHERE username = ?",
+                    history_updates
+                )
+
+            if inserts or renames or history_updates:
+                await self.db.transaction(save)
+            await self.verdicts.put_many(verdicts)
         except Exception as e:
-            logger.error(f"验证玩家失败: {e}, 用户名: {username}")
-            return False
+            logger.error(f"验证玩家失败: {e}, 用户名: {unknown}")
+        return result
+
+    async def real_player_verify(self, username: str) -> bool:
+        """验证是否为真实玩家"""
+        result = await self.classify_players([username])
+        return result.get(username, False)
 
     async def is_real_player(self, username: str) -> bool:
         """兼容方法别名，供外部调用判断是否为真人玩家"""
@@ -275,6 +391,9 @@ class WhitelistUtils:
                 pass
         
         await asyncio.gather(*[do_op(s) for s in self.servers], return_exceptions=True)
+        # 白名单已变化，之后重新查询
+        invalidate_whitelist(self.servers)
+        await self.verdicts.invalidate(username)
     
     async def _add_user_to_whitelist(self, username: str) -> Tuple[bool, str]:
         """添加用户到白名单"""
@@ -285,16 +404,16 @@ class WhitelistUtils:
         
         uuid = data.get("id")
         # 检查是否已存在
-        if self._uuid_exists_in_db(uuid):
+        if await self._uuid_exists_in_db(uuid):
             return False, '该玩家已在白名单中喵~'
         
         # 添加到数据库
-        self._insert_user(uuid, username)
+        await self._insert_user(uuid, username)
         return True, f'已将{username}添加到白名单喵~'
     
     async def _remove_user_from_whitelist(self, username: str) -> Tuple[bool, str]:
         """从白名单移除用户"""
-        self._delete_user(username)
+        await self._delete_user(username)
         return True, f'已将{username}移除白名单喵~'
 
     async def operation_whitelist(self, operation: str, username: str) -> Tuple[bool, str]:
@@ -307,3 +426,14 @@ class WhitelistUtils:
             return await self._add_user_to_whitelist(username)
         else:
             return await self._remove_user_from_whitelist(username)
+
+    async def close(self):
+        """停止后台初始化并关闭接口客户端"""
+        if self._init_task is not None and not self._init_task.done():
+            self._init_task.cancel()
+            # 等待任务真正结束，之后才能关闭数据库
+            try:
+                await self._init_task
+            except asyncio.CancelledError:
+                pass
+        await self.api.close()
@@ -0,0 +1,103 @@
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from cachetools import LRUCache
+
+from ..db.database import AsyncDatabase
+
+# 判定结果有效期（秒）：真人结果通常已经写入 user_profile，假人结果过期后重新验证
+REAL_VERDICT_TTL = 24 * 3600
+BOT_VERDICT_TTL = 6 * 3600
+# 内存中缓存的判定结果条数
+VERDICT_CACHE_SIZE = 1024
+# 单条 SQL 中 IN 参数的最大数量
+SQL_IN_CHUNK = 500
+
+# 判定原因
+REASON_WHITELIST = "whitelist"      # 在服务器白名单中
+REASON_RENAMED = "renamed"          # UUID 已在数据库中，玩家改了名
+REASON_HISTORY = "history"          # 历史用户名在数据库中
+REASON_NO_PROFILE = "no_profile"    # 没有正版账号（通常是 carpet 假人）
+REASON_NOT_MATCHED = "not_matched"  # 有正版账号但不在白名单和数据库中
+
+# (是否为真人, 原因)
+Verdict = Tuple[bool, str]
+
+
+class PlayerVerdictCache:
+    """玩家判定结果缓存
+
+    - SQLite 表 player_verdict 持久化保存判定结果、原因和过期时间，重启后仍然有效
+    - 内存 LRU 缓存最近查询过的结果，重复 /list 时只需查字典
+    """
+
+    def __init__(self, db: AsyncDatabase, cache_size: int = VERDICT_CACHE_SIZE):
+        self.db = db
+        # 用户名 -> (是否为真人, 原因, 过期时间)；None 表示数据库中也没有
+        self._cache = LRUCache(maxsize=max(1, cache_size))
+
+    async def get_many(self, usernames: Iterable[str]) -> Dict[str, Verdict]:
+        """查询未过期的判定结果"""
+        now = time.time()
+        verdicts: Dict[str, Verdict] = {}
+        missing = []
+        for username in usernames:
+            if username not in self._cache:
+                missing.append(username)
+                continue
+            entry = self._cache[username]
+            if entry is not None and entry[2] > now:
+                verdicts[username] = (entry[0], entry[1])
+
+        if missing:
+            for username, is_real, reason, expires_at in await self.db.read(self._select, missing):
+                self._cache[username] = (bool(is_real), reason, expires_at)
+                if expires_at > now:
+                    verdicts[username] = (bool(is_real), reason)
+            for username in missing:
+                if username not in self._cache:
+                    self._cache[username] = None
+        return verdicts
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, usernames: list[str]) -> list[tuple]:
+        rows = []
+        for i in range(0, len(usernames), SQL_IN_CHUNK):
+            chunk = usernames[i:i + SQL_IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(conn.execute(
+                f"SELECT username, is_real, reason, expires_at FROM player_verdict "
+                f"WHERE username IN ({placeholders})",
+                chunk
+            ).fetchall())
+        return rows
+
+    async def put_many(self, verdicts: Dict[str, Verdict]) -> None:
+        """保存判定结果，同时清理已过期的记录"""
+        if not verdicts:
+            return
+        now = time.time()
+        rows = []
+        for username, (is_real, reason) in verdicts.items():
+            expires_at = now + (REAL_VERDICT_TTL if is_real else BOT_VERDICT_TTL)
+            self._cache[username] = (is_real, reason, expires_at)
+            rows.append((username, int(is_real), reason, expires_at))
+
+        def save(conn: sqlite3.Connection):
+            conn.executemany(
+                "INSERT OR REPLACE INTO player_verdict (username, is_real, reason, expires_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("DELETE FROM player_verdict WHERE expires_at <= ?", (now,))
+
+        await self.db.transaction(save)
+
+    async def invalidate(self, username: Optional[str] = None) -> None:
+        """删除某个玩家的判定结果，不传用户名时清空全部"""
+        if username is None:
+            self._cache.clear()
+            await self.db.execute("DELETE FROM player_verdict")
+        else:
+            self._cache.pop(username, None)
+            await self.db.execute("DELETE FROM player_verdict WHERE username = ?", (username,))